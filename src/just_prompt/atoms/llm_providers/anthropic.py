@@ -5,9 +5,11 @@ Anthropic provider implementation.
 import os
 import re
 import anthropic
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import logging
 from dotenv import load_dotenv
+from ..shared.http_pool import get_http_pool
+from ..shared.rate_limiter import rate_limit_event_hooks
 
 # Load environment variables
 load_dotenv()
@@ -16,7 +18,28 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Initialize Anthropic client
-client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+# SDK retries are disabled; the router retries and rate-limits centrally.
+# Connections come from the shared, keep-alive HTTP pool.
+client = anthropic.Anthropic(
+    api_key=os.environ.get("ANTHROPIC_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().client(rate_limit_event_hooks("anthropic")),
+)
+
+# Async client for the native asyncio surface
+async_client = anthropic.AsyncAnthropic(
+    api_key=os.environ.get("ANTHROPIC_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().async_client(rate_limit_event_hooks("anthropic", asynchronous=True)),
+)
+
+# Known models returned when the Anthropic API cannot be reached
+FALLBACK_MODELS = [
+    "claude-opus-4-20250514",
+    "claude-sonnet-4-20250514",
+    "claude-3-7-sonnet-20250219",
+    "claude-3-5-haiku-20241022",
+]
 
 
 def parse_thinking_suffix(model: str) -> Tuple[str, int]:
@@ -75,6 +98,24 @@ def parse_thinking_suffix(model: str) -> Tuple[str, int]:
         return base_model, 0
 
 
+def _message_text(message) -> str:
+    """
+    Extract the first text block from a Messages API response.
+    
+    Args:
+        message: Anthropic message response
+        
+    Returns:
+        Text of the first text block (thinking blocks are skipped)
+    """
+    text_blocks = [block for block in message.content if block.type == "text"]
+    
+    if not text_blocks:
+        raise ValueError("No text content found in response")
+        
+    return text_blocks[0].text
+
+
 def prompt_with_thinking(text: str, model: str, thinking_budget: int) -> str:
     """
     Send a prompt to Anthropic Claude with thinking enabled and get a response.
@@ -105,12 +146,7 @@ def prompt_with_thinking(text: str, model: str, thinking_budget: int) -> str:
         
         # Extract the response from the message content
         # Filter out thinking blocks and only get text blocks
-        text_blocks = [block for block in message.content if block.type == "text"]
-        
-        if not text_blocks:
-            raise ValueError("No text content found in response")
-            
-        return text_blocks[0].text
+        return _message_text(message)
     except Exception as e:
         logger.error(f"Error sending prompt with thinking to Anthropic: {e}")
         raise ValueError(f"Failed to get response from Anthropic with thinking: {str(e)}")
@@ -145,21 +181,48 @@ def prompt(text: str, model: str) -> str:
 
         # Extract the response from the message content
         # Get only text blocks
-        text_blocks = [block for block in message.content if block.type == "text"]
-        
-        if not text_blocks:
-            raise ValueError("No text content found in response")
-            
-        return text_blocks[0].text
+        return _message_text(message)
     except Exception as e:
         logger.error(f"Error sending prompt to Anthropic: {e}")
         raise ValueError(f"Failed to get response from Anthropic: {str(e)}")
 
 
-def list_models() -> List[str]:
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """
+    Send a prompt to Anthropic Claude and yield the response text as it arrives.
+    
+    Handles thinking suffixes in the model name like prompt(); thinking blocks are not yielded.
+    
+    Args:
+        text: The prompt text
+        model: The model name, optionally with thinking suffix
+        
+    Yields:
+        Chunks of response text
+    """
+    base_model, thinking_budget = parse_thinking_suffix(model)
+    
+    kwargs = {"model": base_model, "max_tokens": 4096, "messages": [{"role": "user", "content": text}]}
+    if thinking_budget > 0:
+        kwargs["max_tokens"] = thinking_budget + 1000  # Adding 1000 tokens for the response
+        kwargs["thinking"] = {"type": "enabled", "budget_tokens": thinking_budget}
+    
+    try:
+        logger.info(f"Streaming prompt to Anthropic model: {base_model}")
+        with client.messages.stream(**kwargs) as stream:
+            yield from stream.text_stream
+    except Exception as e:
+        logger.error(f"Error streaming prompt to Anthropic: {e}")
+        raise ValueError(f"Failed to get response from Anthropic: {str(e)}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available Anthropic models.
     
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
     Returns:
         List of model names
     """
@@ -171,8 +234,93 @@ def list_models() -> List[str]:
         return models
     except Exception as e:
         logger.error(f"Error listing Anthropic models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Anthropic models: {str(e)}")
         # Return some known models if API fails
         logger.info("Returning hardcoded list of known Anthropic models")
-        return [
-            "claude-sonnet-4-20250514",
-        ]
\ No newline at end of file
+        return list(FALLBACK_MODELS)
+
+
+async def aprompt_with_thinking(text: str, model: str, thinking_budget: int) -> str:
+    """
+    Send a prompt to Anthropic Claude asynchronously with thinking enabled.
+    
+    Args:
+        text: The prompt text
+        model: The base model name (without thinking suffix)
+        thinking_budget: The token budget for thinking
+        
+    Returns:
+        Response string from the model
+    """
+    try:
+        max_tokens = thinking_budget + 1000  # Adding 1000 tokens for the response
+        
+        logger.info(f"Sending async prompt to Anthropic model {model} with thinking budget {thinking_budget}")
+        message = await async_client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            thinking={
+                "type": "enabled",
+                "budget_tokens": thinking_budget,
+            },
+            messages=[{"role": "user", "content": text}]
+        )
+        
+        return _message_text(message)
+    except Exception as e:
+        logger.error(f"Error sending async prompt with thinking to Anthropic: {e}")
+        raise ValueError(f"Failed to get response from Anthropic with thinking: {str(e)}")
+
+
+async def aprompt(text: str, model: str) -> str:
+    """
+    Send a prompt to Anthropic Claude asynchronously and get a response.
+    
+    Handles thinking suffixes in the model name like prompt().
+    
+    Args:
+        text: The prompt text
+        model: The model name, optionally with thinking suffix
+        
+    Returns:
+        Response string from the model
+    """
+    base_model, thinking_budget = parse_thinking_suffix(model)
+    
+    if thinking_budget > 0:
+        return await aprompt_with_thinking(text, base_model, thinking_budget)
+    
+    try:
+        logger.info(f"Sending async prompt to Anthropic model: {base_model}")
+        message = await async_client.messages.create(
+            model=base_model, max_tokens=4096, messages=[{"role": "user", "content": text}]
+        )
+        
+        return _message_text(message)
+    except Exception as e:
+        logger.error(f"Error sending async prompt to Anthropic: {e}")
+        raise ValueError(f"Failed to get response from Anthropic: {str(e)}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """
+    List available Anthropic models asynchronously.
+    
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
+    Returns:
+        List of model names
+    """
+    try:
+        logger.info("Listing Anthropic models (async)")
+        response = await async_client.models.list()
+
+        return [model.id for model in response.data]
+    except Exception as e:
+        logger.error(f"Error listing Anthropic models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Anthropic models: {str(e)}")
+        logger.info("Returning hardcoded list of known Anthropic models")
+        return list(FALLBACK_MODELS)
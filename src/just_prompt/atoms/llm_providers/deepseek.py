@@ -3,10 +3,12 @@ DeepSeek provider implementation.
 """
 
 import os
-from typing import List
+from typing import Iterator, List
 import logging
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
+from ..shared.http_pool import get_http_pool
+from ..shared.rate_limiter import rate_limit_event_hooks
 
 # Load environment variables
 load_dotenv()
@@ -15,11 +17,32 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Initialize DeepSeek client with OpenAI-compatible interface
+# SDK retries are disabled; the router retries and rate-limits centrally.
+# Connections come from the shared, keep-alive HTTP pool.
 client = OpenAI(
     api_key=os.environ.get("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com"
+    base_url="https://api.deepseek.com",
+    max_retries=0,
+    http_client=get_http_pool().client(rate_limit_event_hooks("deepseek")),
 )
 
+# Async client for the native asyncio surface
+async_client = AsyncOpenAI(
+    api_key=os.environ.get("DEEPSEEK_API_KEY"),
+    base_url="https://api.deepseek.com",
+    max_retries=0,
+    http_client=get_http_pool().async_client(rate_limit_event_hooks("deepseek", asynchronous=True)),
+)
+
+# Known models returned when the DeepSeek API cannot be reached
+FALLBACK_MODELS = [
+    "deepseek-coder",
+    "deepseek-chat",
+    "deepseek-reasoner",
+    "deepseek-coder-v2",
+    "deepseek-reasoner-lite",
+]
+
 
 def prompt(text: str, model: str) -> str:
     """
@@ -49,10 +72,45 @@ def prompt(text: str, model: str) -> str:
         raise ValueError(f"Failed to get response from DeepSeek: {str(e)}")
 
 
-def list_models() -> List[str]:
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """
+    Send a prompt to DeepSeek and yield the response text as it arrives.
+    
+    Args:
+        text: The prompt text
+        model: The model name
+        
+    Yields:
+        Chunks of response text
+    """
+    try:
+        logger.info(f"Streaming prompt to DeepSeek model: {model}")
+        
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": text}],
+            stream=True,
+        )
+        
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closing this generator does not close the SDK stream; release its connection here
+            stream.close()
+    except Exception as e:
+        logger.error(f"Error streaming prompt to DeepSeek: {e}")
+        raise ValueError(f"Failed to get response from DeepSeek: {str(e)}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available DeepSeek models.
     
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
     Returns:
         List of model names
     """
@@ -66,12 +124,57 @@ def list_models() -> List[str]:
         return models
     except Exception as e:
         logger.error(f"Error listing DeepSeek models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list DeepSeek models: {str(e)}")
         # Return some known models if API fails
         logger.info("Returning hardcoded list of known DeepSeek models")
-        return [
-            "deepseek-coder",
-            "deepseek-chat",
-            "deepseek-reasoner",
-            "deepseek-coder-v2",
-            "deepseek-reasoner-lite"
-        ]
\ No newline at end of file
+        return list(FALLBACK_MODELS)
+
+
+async def aprompt(text: str, model: str) -> str:
+    """
+    Send a prompt to DeepSeek asynchronously and get a response.
+    
+    Args:
+        text: The prompt text
+        model: The model name
+        
+    Returns:
+        Response string from the model
+    """
+    try:
+        logger.info(f"Sending async prompt to DeepSeek model: {model}")
+        
+        response = await async_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": text}],
+            stream=False,
+        )
+        
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error sending async prompt to DeepSeek: {e}")
+        raise ValueError(f"Failed to get response from DeepSeek: {str(e)}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """
+    List available DeepSeek models asynchronously.
+    
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
+    Returns:
+        List of model names
+    """
+    try:
+        logger.info("Listing DeepSeek models (async)")
+        response = await async_client.models.list()
+        
+        return [model.id for model in response.data]
+    except Exception as e:
+        logger.error(f"Error listing DeepSeek models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list DeepSeek models: {str(e)}")
+        logger.info("Returning hardcoded list of known DeepSeek models")
+        return list(FALLBACK_MODELS)
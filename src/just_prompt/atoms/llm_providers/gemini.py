@@ -4,10 +4,11 @@ Google Gemini provider implementation.
 
 import os
 import re
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import logging
 from dotenv import load_dotenv
 from google import genai
+from ..shared.http_pool import get_http_pool
 
 # Load environment variables
 load_dotenv()
@@ -15,12 +16,26 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Initialize Gemini client
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# Initialize Gemini client on the shared, keep-alive HTTP pool; google-genai
+# sends requests without a timeout unless given one (in milliseconds)
+client = genai.Client(
+    api_key=os.environ.get("GEMINI_API_KEY"),
+    http_options=genai.types.HttpOptions(
+        client_args={"transport": get_http_pool().transport()},
+        async_client_args={"transport": get_http_pool().async_transport()},
+        timeout=int(get_http_pool().timeout.read * 1000),
+    ),
+)
 
 # Models that support thinking_budget
 THINKING_ENABLED_MODELS = ["gemini-2.5-pro-preview-04-17", "gemini-2.5-flash-preview-04-17"]
 
+# Known models returned when the Gemini API cannot be reached
+FALLBACK_MODELS = [
+    "gemini-2.5-pro-preview-04-17",
+    "gemini-2.5-flash-preview-04-17",
+]
+
 
 def parse_thinking_suffix(model: str) -> Tuple[str, int]:
     """
@@ -157,10 +172,51 @@ def prompt(text: str, model: str) -> str:
         raise ValueError(f"Failed to get response from Gemini: {str(e)}")
 
 
-def list_models() -> List[str]:
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """
+    Send a prompt to Google Gemini and yield the response text as it arrives.
+    
+    Handles thinking suffixes in the model name like prompt().
+    
+    Args:
+        text: The prompt text
+        model: The model name, optionally with thinking suffix
+        
+    Yields:
+        Chunks of response text
+    """
+    base_model, thinking_budget = parse_thinking_suffix(model)
+    
+    config = None
+    if thinking_budget > 0:
+        config = genai.types.GenerateContentConfig(
+            thinking_config=genai.types.ThinkingConfig(
+                thinking_budget=thinking_budget
+            )
+        )
+    
+    try:
+        logger.info(f"Streaming prompt to Gemini model: {base_model}")
+        
+        for chunk in client.models.generate_content_stream(
+            model=base_model,
+            contents=text,
+            config=config
+        ):
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        logger.error(f"Error streaming prompt to Gemini: {e}")
+        raise ValueError(f"Failed to get response from Gemini: {str(e)}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available Google Gemini models.
     
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
     Returns:
         List of model names
     """
@@ -180,9 +236,95 @@ def list_models() -> List[str]:
         return formatted_models
     except Exception as e:
         logger.error(f"Error listing Gemini models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Gemini models: {str(e)}")
         # Return some known models if API fails
         logger.info("Returning hardcoded list of known Gemini models")
-        return [
-            "gemini-2.5-pro-preview-04-17",
-            "gemini-2.5-flash-preview-04-17"
-        ]
\ No newline at end of file
+        return list(FALLBACK_MODELS)
+
+
+async def aprompt_with_thinking(text: str, model: str, thinking_budget: int) -> str:
+    """
+    Send a prompt to Google Gemini asynchronously with thinking enabled.
+    
+    Args:
+        text: The prompt text
+        model: The base model name (without thinking suffix)
+        thinking_budget: The token budget for thinking
+        
+    Returns:
+        Response string from the model
+    """
+    try:
+        logger.info(f"Sending async prompt to Gemini model {model} with thinking budget {thinking_budget}")
+        
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=text,
+            config=genai.types.GenerateContentConfig(
+                thinking_config=genai.types.ThinkingConfig(
+                    thinking_budget=thinking_budget
+                )
+            )
+        )
+        
+        return response.text
+    except Exception as e:
+        logger.error(f"Error sending async prompt with thinking to Gemini: {e}")
+        raise ValueError(f"Failed to get response from Gemini with thinking: {str(e)}")
+
+
+async def aprompt(text: str, model: str) -> str:
+    """
+    Send a prompt to Google Gemini asynchronously and get a response.
+    
+    Handles thinking suffixes in the model name like prompt().
+    
+    Args:
+        text: The prompt text
+        model: The model name, optionally with thinking suffix
+        
+    Returns:
+        Response string from the model
+    """
+    base_model, thinking_budget = parse_thinking_suffix(model)
+    
+    if thinking_budget > 0:
+        return await aprompt_with_thinking(text, base_model, thinking_budget)
+    
+    try:
+        logger.info(f"Sending async prompt to Gemini model: {base_model}")
+        
+        response = await client.aio.models.generate_content(
+            model=base_model,
+            contents=text
+        )
+        
+        return response.text
+    except Exception as e:
+        logger.error(f"Error sending async prompt to Gemini: {e}")
+        raise ValueError(f"Failed to get response from Gemini: {str(e)}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """
+    List available Google Gemini models asynchronously.
+    
+    Returns:
+        List of model names
+    """
+    try:
+        logger.info("Listing Gemini models (async)")
+        
+        models = []
+        async for m in await client.aio.models.list():
+            if "generateContent" in (m.supported_actions or []):
+                models.append(m.name.replace("models/", ""))
+        
+        return models
+    except Exception as e:
+        logger.error(f"Error listing Gemini models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Gemini models: {str(e)}")
+        logger.info("Returning hardcoded list of known Gemini models")
+        return list(FALLBACK_MODELS)
@@ -3,10 +3,12 @@ Groq provider implementation.
 """
 
 import os
-from typing import List
+from typing import Iterator, List
 import logging
-from groq import Groq
+from groq import AsyncGroq, Groq
 from dotenv import load_dotenv
+from ..shared.http_pool import get_http_pool
+from ..shared.rate_limiter import rate_limit_event_hooks
 
 # Load environment variables
 load_dotenv()
@@ -15,7 +17,30 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Initialize Groq client
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+# SDK retries are disabled; the router retries and rate-limits centrally.
+# Connections come from the shared, keep-alive HTTP pool.
+client = Groq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().client(rate_limit_event_hooks("groq")),
+)
+
+# Async client for the native asyncio surface
+async_client = AsyncGroq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().async_client(rate_limit_event_hooks("groq", asynchronous=True)),
+)
+
+# Known models returned when the Groq API cannot be reached
+FALLBACK_MODELS = [
+    "llama-3.3-70b-versatile",
+    "llama-3.1-70b-versatile",
+    "llama-3.1-8b-versatile",
+    "mixtral-8x7b-32768",
+    "gemma-7b-it",
+    "qwen-2.5-32b",
+]
 
 
 def prompt(text: str, model: str) -> str:
@@ -45,10 +70,45 @@ def prompt(text: str, model: str) -> str:
         raise ValueError(f"Failed to get response from Groq: {str(e)}")
 
 
-def list_models() -> List[str]:
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """
+    Send a prompt to Groq and yield the response text as it arrives.
+    
+    Args:
+        text: The prompt text
+        model: The model name
+        
+    Yields:
+        Chunks of response text
+    """
+    try:
+        logger.info(f"Streaming prompt to Groq model: {model}")
+        
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": text}],
+            stream=True,
+        )
+        
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closing this generator does not close the SDK stream; release its connection here
+            stream.close()
+    except Exception as e:
+        logger.error(f"Error streaming prompt to Groq: {e}")
+        raise ValueError(f"Failed to get response from Groq: {str(e)}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available Groq models.
     
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
     Returns:
         List of model names
     """
@@ -62,13 +122,56 @@ def list_models() -> List[str]:
         return models
     except Exception as e:
         logger.error(f"Error listing Groq models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Groq models: {str(e)}")
         # Return some known models if API fails
         logger.info("Returning hardcoded list of known Groq models")
-        return [
-            "llama-3.3-70b-versatile",
-            "llama-3.1-70b-versatile",
-            "llama-3.1-8b-versatile",
-            "mixtral-8x7b-32768",
-            "gemma-7b-it",
-            "qwen-2.5-32b"
-        ]
\ No newline at end of file
+        return list(FALLBACK_MODELS)
+
+
+async def aprompt(text: str, model: str) -> str:
+    """
+    Send a prompt to Groq asynchronously and get a response.
+    
+    Args:
+        text: The prompt text
+        model: The model name
+        
+    Returns:
+        Response string from the model
+    """
+    try:
+        logger.info(f"Sending async prompt to Groq model: {model}")
+        
+        chat_completion = await async_client.chat.completions.create(
+            messages=[{"role": "user", "content": text}],
+            model=model,
+        )
+        
+        return chat_completion.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error sending async prompt to Groq: {e}")
+        raise ValueError(f"Failed to get response from Groq: {str(e)}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """
+    List available Groq models asynchronously.
+    
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+    
+    Returns:
+        List of model names
+    """
+    try:
+        logger.info("Listing Groq models (async)")
+        response = await async_client.models.list()
+        
+        return [model.id for model in response.data]
+    except Exception as e:
+        logger.error(f"Error listing Groq models: {e}")
+        if not fallback:
+            raise ValueError(f"Failed to list Groq models: {str(e)}")
+        logger.info("Returning hardcoded list of known Groq models")
+        return list(FALLBACK_MODELS)
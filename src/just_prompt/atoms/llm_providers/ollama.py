@@ -3,10 +3,11 @@ Ollama provider implementation.
 """
 
 import os
-from typing import List
+from typing import Iterator, List
 import logging
 import ollama
 from dotenv import load_dotenv
+from ..shared.http_pool import get_http_pool
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +15,12 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Clients read OLLAMA_HOST; connections come from the shared, keep-alive HTTP pool
+client = ollama.Client(transport=get_http_pool().transport(), timeout=get_http_pool().timeout)
+
+# Async client for the native asyncio surface
+async_client = ollama.AsyncClient(transport=get_http_pool().async_transport(), timeout=get_http_pool().timeout)
+
 
 def prompt(text: str, model: str) -> str:
     """
@@ -30,7 +37,7 @@ def prompt(text: str, model: str) -> str:
         logger.info(f"Sending prompt to Ollama model: {model}")
 
         # Create chat completion
-        response = ollama.chat(
+        response = client.chat(
             model=model,
             messages=[
                 {
@@ -47,17 +54,98 @@ def prompt(text: str, model: str) -> str:
         raise ValueError(f"Failed to get response from Ollama: {str(e)}")
 
 
-def list_models() -> List[str]:
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """
+    Send a prompt to Ollama and yield the response text as it arrives.
+
+    Args:
+        text: The prompt text
+        model: The model name
+
+    Yields:
+        Chunks of response text
+    """
+    try:
+        logger.info(f"Streaming prompt to Ollama model: {model}")
+
+        for part in client.chat(
+            model=model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": text,
+                },
+            ],
+            stream=True,
+        ):
+            if part.message.content:
+                yield part.message.content
+    except Exception as e:
+        logger.error(f"Error streaming prompt to Ollama: {e}")
+        raise ValueError(f"Failed to get response from Ollama: {str(e)}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available Ollama models.
 
+    Args:
+        fallback: Accepted for parity with the other providers; Ollama has no
+                  list of known models, so listing errors always raise
+
     Returns:
         List of model names
     """
     logger.info("Listing Ollama models")
-    response = ollama.list()
+    response = client.list()
 
     # Extract model names from the models attribute
     models = [model.model for model in response.models]
 
     return models
+
+
+async def aprompt(text: str, model: str) -> str:
+    """
+    Send a prompt to Ollama asynchronously and get a response.
+
+    Args:
+        text: The prompt text
+        model: The model name
+
+    Returns:
+        Response string from the model
+    """
+    try:
+        logger.info(f"Sending async prompt to Ollama model: {model}")
+
+        response = await async_client.chat(
+            model=model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": text,
+                },
+            ],
+        )
+
+        return response.message.content
+    except Exception as e:
+        logger.error(f"Error sending async prompt to Ollama: {e}")
+        raise ValueError(f"Failed to get response from Ollama: {str(e)}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """
+    List available Ollama models asynchronously.
+
+    Args:
+        fallback: Accepted for parity with the other providers; listing errors always raise
+
+    Returns:
+        List of model names
+    """
+    logger.info("Listing Ollama models (async)")
+    response = await async_client.list()
+
+    return [model.model for model in response.models]
@@ -16,15 +16,17 @@ basic functionality (and our tests) still work.
 import os
 import re
 import logging
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from dotenv import load_dotenv
 
 # Third‑party import guarded so that static analysis still works when the SDK
 # is absent.
-from openai import OpenAI  # type: ignore
+from openai import AsyncOpenAI, OpenAI  # type: ignore
 import logging
 from dotenv import load_dotenv
+from ..shared.http_pool import get_http_pool
+from ..shared.rate_limiter import rate_limit_event_hooks
 
 # Load environment variables
 load_dotenv()
@@ -33,7 +35,26 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client once – reused across calls.
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# SDK retries are disabled; the router retries and rate-limits centrally.
+# Connections come from the shared, keep-alive HTTP pool.
+client = OpenAI(
+    api_key=os.environ.get("OPENAI_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().client(rate_limit_event_hooks("openai")),
+)
+
+# Async client for the native asyncio surface (aprompt / alist_models).
+async_client = AsyncOpenAI(
+    api_key=os.environ.get("OPENAI_API_KEY"),
+    max_retries=0,
+    http_client=get_http_pool().async_client(rate_limit_event_hooks("openai", asynchronous=True)),
+)
+
+# Known models returned when the OpenAI API cannot be reached
+FALLBACK_MODELS = [
+    "o4-mini",
+    "o3",
+]
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -153,10 +174,74 @@ def prompt(text: str, model: str) -> str:
         raise ValueError(f"Failed to get response from OpenAI: {exc}")
 
 
-def list_models() -> List[str]:
+def _stream_chat(messages: List[dict], model: str) -> Iterator[str]:
+    """Yield text deltas from a streamed chat completion."""
+
+    stream = client.chat.completions.create(model=model, messages=messages, stream=True)
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # Closing this generator does not close the SDK stream; release its connection here
+        stream.close()
+
+
+def stream_prompt(text: str, model: str) -> Iterator[str]:
+    """Streaming counterpart of :func:`prompt`.
+
+    Yields text chunks as they arrive. Reasoning suffixes stream through the
+    Responses API when available, otherwise through chat completions.
+    """
+
+    base_model, effort = parse_reasoning_suffix(model)
+
+    try:
+        if effort:
+            logger.info(
+                "Streaming prompt to OpenAI reasoning model %s with effort '%s'", base_model, effort
+            )
+            if hasattr(client, "responses"):
+                stream = client.responses.create(
+                    model=base_model,
+                    reasoning={"effort": effort},
+                    input=[{"role": "user", "content": text}],
+                    stream=True,
+                )
+                try:
+                    for event in stream:
+                        if event.type == "response.output_text.delta":
+                            yield event.delta
+                finally:
+                    stream.close()
+                return
+
+            yield from _stream_chat(
+                [
+                    {
+                        "role": "system",
+                        "content": f"Use {effort} reasoning effort before answering.",
+                    },
+                    {"role": "user", "content": text},
+                ],
+                base_model,
+            )
+            return
+
+        logger.info("Streaming prompt to OpenAI model: %s", base_model)
+        yield from _stream_chat([{"role": "user", "content": text}], base_model)
+    except Exception as exc:
+        logger.error("Error streaming prompt to OpenAI: %s", exc)
+        raise ValueError(f"Failed to get response from OpenAI: {exc}")
+
+
+def list_models(fallback: bool = True) -> List[str]:
     """
     List available OpenAI models.
 
+    Args:
+        fallback: Return a hardcoded list of known models if the API fails, instead of raising
+
     Returns:
         List of model names
     """
@@ -169,9 +254,95 @@ def list_models() -> List[str]:
 
         return models
     except Exception as exc:
+        if not fallback:
+            raise ValueError(f"Failed to list OpenAI models: {exc}")
         # Networking errors shouldn't break the caller – return a minimal hard‑coded list.
         logger.warning("Error listing OpenAI models via API (%s). Returning fallback list.", exc)
-        return [
-            "o4-mini",
-            "o3",
-        ]
+        return list(FALLBACK_MODELS)
+
+
+# ---------------------------------------------------------------------------
+# Async surface
+# ---------------------------------------------------------------------------
+
+
+async def _aprompt_with_reasoning(text: str, model: str, effort: str) -> str:  # pragma: no cover – hits network
+    """Async counterpart of :func:`_prompt_with_reasoning`."""
+
+    if not effort:
+        raise ValueError("effort must be 'low', 'medium', or 'high'")
+
+    logger.info(
+        "Sending async prompt to OpenAI reasoning model %s with effort '%s'", model, effort
+    )
+
+    if hasattr(async_client, "responses"):
+        try:
+            response = await async_client.responses.create(
+                model=model,
+                reasoning={"effort": effort},
+                input=[{"role": "user", "content": text}],
+            )
+
+            output_text = getattr(response, "output_text", None)
+            if output_text is not None:
+                return output_text
+
+            if hasattr(response, "choices") and response.choices:
+                return response.choices[0].message.content  # type: ignore[attr-defined]
+
+            raise ValueError("Unexpected response format from OpenAI responses API")
+        except Exception as exc:  # pragma: no cover – keep behaviour consistent
+            logger.warning("Responses API failed (%s); falling back to chat", exc)
+
+    try:
+        response = await async_client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": f"Use {effort} reasoning effort before answering.",
+                },
+                {"role": "user", "content": text},
+            ],
+        )
+
+        return response.choices[0].message.content  # type: ignore[attr-defined]
+    except Exception as exc:
+        logger.error("Error sending async prompt to OpenAI (fallback chat): %s", exc)
+        raise ValueError(f"Failed to get response from OpenAI: {exc}")
+
+
+async def aprompt(text: str, model: str) -> str:
+    """Async counterpart of :func:`prompt`, built on ``AsyncOpenAI``."""
+
+    base_model, effort = parse_reasoning_suffix(model)
+
+    if effort:
+        return await _aprompt_with_reasoning(text, base_model, effort)
+
+    try:
+        logger.info("Sending async prompt to OpenAI model: %s", base_model)
+        response = await async_client.chat.completions.create(
+            model=base_model,
+            messages=[{"role": "user", "content": text}],
+        )
+
+        return response.choices[0].message.content  # type: ignore[attr-defined]
+    except Exception as exc:
+        logger.error("Error sending async prompt to OpenAI: %s", exc)
+        raise ValueError(f"Failed to get response from OpenAI: {exc}")
+
+
+async def alist_models(fallback: bool = True) -> List[str]:
+    """Async counterpart of :func:`list_models`."""
+    try:
+        logger.info("Listing OpenAI models (async)")
+        response = await async_client.models.list()
+
+        return [model.id for model in response.data]
+    except Exception as exc:
+        if not fallback:
+            raise ValueError(f"Failed to list OpenAI models: {exc}")
+        logger.warning("Error listing OpenAI models via API (%s). Returning fallback list.", exc)
+        return list(FALLBACK_MODELS)
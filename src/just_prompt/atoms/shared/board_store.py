@@ -0,0 +1,197 @@
+"""
+Stored board responses for the CEO and board workflow.
+
+The board stage is kept as an artifact per prompt: a JSON file in the cache
+directory, named by a hash of the prompt text, holding each board member's
+answer keyed by the model string it was asked as. Rerunning the same prompt
+with a different CEO, a different decision template or an extra board member
+reuses the stored answers and only calls the members that are missing. Only
+successful answers are stored, so failed or absent members are asked again.
+Like the response cache, the store is off unless enabled, and kept in memory
+only unless persisting is enabled too.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from .utils import atomic_write_text, get_cache_dir, get_env_bool, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Seconds a stored board response stays valid
+DEFAULT_BOARD_STORE_TTL = 86400.0
+
+# Maximum number of boards (prompts) held in memory
+DEFAULT_BOARD_STORE_MEMORY_ENTRIES = 64
+
+# Directory of the stored boards inside the cache directory
+BOARD_STORE_DIR_NAME = "boards"
+
+# Bump to invalidate every stored board when the key layout changes
+_KEY_VERSION = 1
+
+# Stored answer: (the "provider:model" that answered, response, time.time() it was saved)
+StoredAnswer = Tuple[str, str, float]
+
+
+def board_prompt_hash(text: str) -> str:
+    """
+    Compute the key of the board artifact for a prompt.
+
+    Args:
+        text: The prompt text put to the board
+
+    Returns:
+        Hex digest identifying the prompt
+    """
+    payload = json.dumps([_KEY_VERSION, text.replace("\r\n", "\n")], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BoardStore:
+    """
+    Thread-safe store of board answers per prompt, in memory and optionally on disk.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl: float = DEFAULT_BOARD_STORE_TTL,
+        memory_entries: int = DEFAULT_BOARD_STORE_MEMORY_ENTRIES,
+        directory: Optional[Path] = None,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.memory_entries = max(1, memory_entries)
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self._boards: "OrderedDict[str, Dict[str, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, prompt_hash: str, models: Iterable[str]) -> Dict[str, StoredAnswer]:
+        """
+        Look up the stored answers of board members.
+
+        Args:
+            prompt_hash: Key from board_prompt_hash
+            models: Model strings of the board members
+
+        Returns:
+            Dictionary mapping each member with a valid stored answer to (answered_by, response, saved_at)
+        """
+        if not self.enabled:
+            return {}
+
+        models = list(models)
+        now = time.time()
+        with self._lock:
+            board = self._board(prompt_hash)
+            found = {}
+            for model_string in models:
+                entry = board.get(model_string)
+                if entry is not None and now - entry["saved_at"] <= self.ttl:
+                    found[model_string] = (entry["answered_by"], entry["response"], entry["saved_at"])
+            self.hits += len(found)
+            self.misses += len(models) - len(found)
+            return found
+
+    def put(self, prompt_hash: str, model_string: str, answered_by: str, response: str) -> None:
+        """
+        Store a board member's answer.
+
+        Args:
+            prompt_hash: Key from board_prompt_hash
+            model_string: Model string the member was asked as
+            answered_by: The "provider:model" that answered
+            response: The member's response
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            board = self._board(prompt_hash)
+            board[model_string] = {"answered_by": answered_by, "response": response, "saved_at": time.time()}
+            if self.directory is None:
+                return
+            try:
+                atomic_write_text(self._path(prompt_hash), json.dumps({"members": board}, ensure_ascii=False))
+            except Exception as e:
+                logger.warning(f"Could not save board for prompt {prompt_hash[:12]}: {e}")
+
+    def clear(self) -> None:
+        """
+        Forget the boards held in memory and reset the counters.
+        """
+        with self._lock:
+            self._boards.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _board(self, prompt_hash: str) -> Dict[str, dict]:
+        # Caller holds the lock; loads the board from disk on a memory miss
+        board = self._boards.get(prompt_hash)
+        if board is not None:
+            self._boards.move_to_end(prompt_hash)
+            return board
+
+        board = self._load(prompt_hash)
+        self._boards[prompt_hash] = board
+        while len(self._boards) > self.memory_entries:
+            self._boards.popitem(last=False)
+        return board
+
+    def _load(self, prompt_hash: str) -> Dict[str, dict]:
+        if self.directory is None:
+            return {}
+        path = self._path(prompt_hash)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                members = json.load(f).get("members", {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable stored board {path}: {e}")
+            return {}
+        return {
+            model_string: entry
+            for model_string, entry in members.items()
+            if isinstance(entry, dict) and {"answered_by", "response", "saved_at"} <= entry.keys()
+        }
+
+    def _path(self, prompt_hash: str) -> Path:
+        return self.directory / f"{prompt_hash}.json"
+
+
+_board_store: Optional[BoardStore] = None
+_board_store_lock = threading.Lock()
+
+
+def get_board_store() -> BoardStore:
+    """
+    Get the process-wide board store, creating it from the environment on first use.
+
+    Environment variables:
+        BOARD_STORE: Reuse stored board answers when the same prompt is put to the board again (default false)
+        BOARD_STORE_TTL: Seconds a stored board answer stays valid (default 86400)
+        BOARD_STORE_MEMORY_ENTRIES: Boards held in memory (default 64)
+        BOARD_STORE_PERSIST: Keep stored boards in the cache directory across restarts (default false)
+
+    Returns:
+        The shared BoardStore
+    """
+    global _board_store
+    with _board_store_lock:
+        if _board_store is None:
+            _board_store = BoardStore(
+                enabled=get_env_bool("BOARD_STORE", False),
+                ttl=get_env_float("BOARD_STORE_TTL", DEFAULT_BOARD_STORE_TTL),
+                memory_entries=get_env_int("BOARD_STORE_MEMORY_ENTRIES", DEFAULT_BOARD_STORE_MEMORY_ENTRIES),
+                directory=get_cache_dir() / BOARD_STORE_DIR_NAME if get_env_bool("BOARD_STORE_PERSIST", False) else None,
+            )
+        return _board_store
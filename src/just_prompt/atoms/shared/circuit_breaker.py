@@ -0,0 +1,361 @@
+"""
+Circuit breakers for provider calls.
+
+Each provider and each provider:model gets a breaker. A breaker opens after a
+run of consecutive failures or a high error rate over recent calls; while it
+is open, requests fail fast (or are rerouted to a configured fallback) instead
+of waiting for the provider to time out. After a cooldown one probe request
+is let through (half-open): success closes the breaker, failure re-opens it.
+
+Only failures that say something about the provider's health count: the model
+breaker counts transient errors (connection errors, timeouts, 5xx), the
+provider breaker counts only failures to reach the provider at all. Client
+errors such as an unknown model leave both breakers closed.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from .data_types import ModelProviders
+from .retry import is_connection_error, is_retryable
+from .utils import get_env_bool, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures that open a breaker
+DEFAULT_BREAKER_FAILURES = 5
+
+# Error rate over the recent window that opens a breaker
+DEFAULT_BREAKER_ERROR_RATE = 0.5
+
+# Recent calls considered for the error rate
+DEFAULT_BREAKER_WINDOW = 20
+
+# Calls needed in the window before the error rate is used
+DEFAULT_BREAKER_MIN_CALLS = 10
+
+# Seconds an open breaker waits before letting a probe through
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(ValueError):
+    """
+    Raised instead of calling a provider or model whose breaker is open.
+    """
+
+    def __init__(self, message: str, provider_name: str, model: str):
+        super().__init__(message)
+        self.provider_name = provider_name
+        self.model = model
+
+
+def parse_fallbacks(value: str) -> Dict[str, str]:
+    """
+    Parse fallback targets for providers and models.
+
+    Args:
+        value: Comma-separated "provider=model_string" or "provider:model=model_string"
+               pairs, e.g. "anthropic=o:gpt-4o,groq:llama-3.3-70b-versatile=o:gpt-4o-mini"
+
+    Returns:
+        Dictionary mapping "provider" or "provider:model" keys (full provider names) to model strings
+    """
+    fallbacks = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, target = item.partition("=")
+        provider_prefix, _, model = name.strip().partition(":")
+        provider = ModelProviders.from_name(provider_prefix)
+        target_provider = ModelProviders.from_name(target.strip().partition(":")[0])
+        if provider is None or target_provider is None or ":" not in target:
+            logger.warning(f"Ignoring invalid circuit breaker fallback: {item.strip()}")
+            continue
+        key = f"{provider.full_name}:{model}" if model else provider.full_name
+        fallbacks[key] = target.strip()
+    return fallbacks
+
+
+class CircuitBreaker:
+    """
+    Failure tracking and state for one provider or model.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        error_rate: float = DEFAULT_BREAKER_ERROR_RATE,
+        window: int = DEFAULT_BREAKER_WINDOW,
+        min_calls: int = DEFAULT_BREAKER_MIN_CALLS,
+        cooldown: float = DEFAULT_BREAKER_COOLDOWN,
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def allow(self, now: float, claim: bool = True) -> bool:
+        """
+        Check whether a call may go through; when half-open, claim=True takes the probe.
+        """
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = claim
+            return True
+        return False
+
+    def record(self, failed: bool, now: float) -> Optional[str]:
+        """
+        Record a call outcome.
+
+        Returns:
+            The new state if it changed, otherwise None
+        """
+        self.outcomes.append(failed)
+        if not failed:
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.probing = False
+                self.outcomes.clear()
+                return CLOSED
+            return None
+
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self._tripped():
+            self.state = OPEN
+            self.opened_at = now
+            self.probing = False
+            return OPEN
+        return None
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        """
+        Get the breaker state for display.
+        """
+        failures = sum(self.outcomes)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": round(failures / len(self.outcomes), 2) if self.outcomes else 0.0,
+            "retry_in": round(max(0.0, self.opened_at + self.cooldown - now), 1) if self.state == OPEN else 0.0,
+        }
+
+    def _tripped(self) -> bool:
+        if self.state != CLOSED:
+            return False
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        return len(self.outcomes) >= self.min_calls and sum(self.outcomes) / len(self.outcomes) >= self.error_rate
+
+
+class CircuitBreakers:
+    """
+    The provider and model breakers, plus configured fallbacks.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        error_rate: float = DEFAULT_BREAKER_ERROR_RATE,
+        window: int = DEFAULT_BREAKER_WINDOW,
+        min_calls: int = DEFAULT_BREAKER_MIN_CALLS,
+        cooldown: float = DEFAULT_BREAKER_COOLDOWN,
+        fallbacks: Optional[Dict[str, str]] = None,
+    ):
+        self.enabled = enabled
+        self.fallbacks = fallbacks or {}
+        self._settings = dict(
+            failure_threshold=failure_threshold,
+            error_rate=error_rate,
+            window=window,
+            min_calls=min_calls,
+            cooldown=cooldown,
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def before_call(self, provider_name: str, model: str) -> None:
+        """
+        Let a call through, or fail fast if the provider's or model's breaker is open.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Validated model name
+
+        Raises:
+            CircuitOpenError: If either breaker is open, or half-open with its probe already in flight
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        breaker_keys = (provider_name, f"{provider_name}:{model}")
+        with self._lock:
+            for key in breaker_keys:
+                if not self._breaker(key).allow(now, claim=False):
+                    raise CircuitOpenError(
+                        f"Circuit open for {key}; failing fast until it recovers", provider_name, model
+                    )
+            # Only take half-open probes once both breakers agree
+            for key in breaker_keys:
+                self._breaker(key).allow(now)
+
+    def record(self, provider_name: str, model: str, error: Optional[BaseException] = None) -> None:
+        """
+        Record the outcome of a call let through by before_call.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Validated model name
+            error: The error the call raised, or None on success
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        outcomes = (
+            (provider_name, error is not None and is_connection_error(error)),
+            (f"{provider_name}:{model}", error is not None and is_retryable(error)),
+        )
+        with self._lock:
+            for key, failed in outcomes:
+                changed = self._breaker(key).record(failed, now)
+                if changed == OPEN:
+                    logger.warning(f"Circuit opened for {key}: {error}")
+                elif changed == CLOSED:
+                    logger.info(f"Circuit closed for {key}")
+
+    def release(self, provider_name: str, model: str) -> None:
+        """
+        Give back a call let through by before_call without recording an outcome.
+
+        Used for calls the caller cancelled, which say nothing about the
+        provider's health; a half-open breaker can take another probe.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Validated model name
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for key in (provider_name, f"{provider_name}:{model}"):
+                breaker = self._breakers.get(key)
+                if breaker is not None and breaker.state == HALF_OPEN:
+                    breaker.probing = False
+
+    def is_healthy(self, provider_name: str, model: str) -> bool:
+        """
+        Check that neither the provider's nor the model's breaker has seen recent trouble.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Validated model name
+
+        Returns:
+            True if both breakers are closed with no failures since the last success
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            return all(
+                breaker.state == CLOSED and breaker.consecutive_failures == 0
+                for breaker in (
+                    self._breakers.get(key) for key in (provider_name, f"{provider_name}:{model}")
+                )
+                if breaker is not None
+            )
+
+    def fallback_for(self, provider_name: str, model: str) -> Optional[str]:
+        """
+        Get the configured fallback for a model, or for its provider.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Validated model name
+
+        Returns:
+            Fallback model string, or None
+        """
+        return self.fallbacks.get(f"{provider_name}:{model}") or self.fallbacks.get(provider_name)
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the state of every breaker that has seen traffic.
+
+        Returns:
+            Dictionary mapping "provider" and "provider:model" keys to breaker snapshots
+        """
+        now = time.monotonic()
+        with self._lock:
+            for breaker in self._breakers.values():
+                # Report cooled-down breakers as half-open without claiming their probe
+                if breaker.state == OPEN and now - breaker.opened_at >= breaker.cooldown:
+                    breaker.state = HALF_OPEN
+                    breaker.probing = False
+            return {key: breaker.snapshot(now) for key, breaker in self._breakers.items()}
+
+    def reset(self) -> None:
+        """
+        Forget all breaker state.
+        """
+        with self._lock:
+            self._breakers.clear()
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(**self._settings)
+        return breaker
+
+
+_circuit_breakers: Optional[CircuitBreakers] = None
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """
+    Get the process-wide circuit breakers, creating them from the environment on first use.
+
+    Environment variables:
+        CIRCUIT_BREAKER: Enable circuit breakers (default true)
+        CIRCUIT_BREAKER_FAILURES: Consecutive failures that open a breaker (default 5)
+        CIRCUIT_BREAKER_ERROR_RATE: Error rate over recent calls that opens a breaker (default 0.5)
+        CIRCUIT_BREAKER_WINDOW: Recent calls considered for the error rate (default 20)
+        CIRCUIT_BREAKER_MIN_CALLS: Calls needed before the error rate applies (default 10)
+        CIRCUIT_BREAKER_COOLDOWN: Seconds before an open breaker lets a probe through (default 30)
+        CIRCUIT_BREAKER_FALLBACKS: Reroute targets while open, e.g. "anthropic=o:gpt-4o"
+
+    Returns:
+        The shared CircuitBreakers
+    """
+    global _circuit_breakers
+    with _circuit_breakers_lock:
+        if _circuit_breakers is None:
+            _circuit_breakers = CircuitBreakers(
+                enabled=get_env_bool("CIRCUIT_BREAKER", True),
+                failure_threshold=get_env_int("CIRCUIT_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES),
+                error_rate=get_env_float("CIRCUIT_BREAKER_ERROR_RATE", DEFAULT_BREAKER_ERROR_RATE),
+                window=get_env_int("CIRCUIT_BREAKER_WINDOW", DEFAULT_BREAKER_WINDOW),
+                min_calls=get_env_int("CIRCUIT_BREAKER_MIN_CALLS", DEFAULT_BREAKER_MIN_CALLS),
+                cooldown=get_env_float("CIRCUIT_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN),
+                fallbacks=parse_fallbacks(os.environ.get("CIRCUIT_BREAKER_FALLBACKS", "")),
+            )
+        return _circuit_breakers
@@ -0,0 +1,172 @@
+"""
+Memo of model name corrections for just-prompt.
+
+Remembers how a requested model name was resolved for a given provider catalog
+version, so repeated requests with the same misspelled or shorthand name skip
+correction entirely.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from .utils import atomic_write_text, get_cache_dir, get_env_bool, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of remembered corrections
+DEFAULT_MEMO_MAX_ENTRIES = 1024
+
+# File name of the persisted memo inside the cache directory
+MEMO_FILE_NAME = "model_corrections.json"
+
+MemoKey = Tuple[str, str, str]
+
+
+class CorrectionMemo:
+    """
+    Thread-safe LRU memo of (provider, requested_model, catalog_version) -> resolved model.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_MAX_ENTRIES, persist_path: Optional[Path] = None):
+        self.max_entries = max(1, max_entries)
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[MemoKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+
+        if self.persist_path is not None:
+            self.load()
+
+    def get(self, provider: str, model: str, catalog_version: str) -> Optional[str]:
+        """
+        Look up a remembered correction.
+
+        Args:
+            provider: Provider name (full name)
+            model: Requested model name
+            catalog_version: Version of the provider catalog the correction was made against
+
+        Returns:
+            The resolved model name, or None if not remembered
+        """
+        key = (provider, model, catalog_version)
+        with self._lock:
+            resolved = self._entries.get(key)
+            if resolved is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return resolved
+
+    def put(self, provider: str, model: str, catalog_version: str, resolved: str) -> None:
+        """
+        Remember a correction.
+
+        Args:
+            provider: Provider name (full name)
+            model: Requested model name
+            catalog_version: Version of the provider catalog the correction was made against
+            resolved: The resolved model name
+        """
+        with self._lock:
+            self._entries[(provider, model, catalog_version)] = resolved
+            self._entries.move_to_end((provider, model, catalog_version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        if self.persist_path is not None:
+            try:
+                self.save()
+            except Exception as e:
+                logger.warning(f"Error writing model correction memo to {self.persist_path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get memo counters.
+
+        Returns:
+            Dictionary with hits, misses and current size
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        """
+        Forget all corrections and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self) -> None:
+        """
+        Write the memo to its persist path.
+        """
+        with self._lock:
+            entries = [list(key) + [resolved] for key, resolved in self._entries.items()]
+        with self._persist_lock:
+            atomic_write_text(self.persist_path, json.dumps({"entries": entries}))
+
+    def load(self) -> int:
+        """
+        Load remembered corrections from the persist path.
+
+        Returns:
+            Number of corrections loaded
+        """
+        if self.persist_path is None or not self.persist_path.exists():
+            return 0
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model correction memo {self.persist_path}: {e}")
+            return 0
+
+        loaded = 0
+        with self._lock:
+            for entry in entries:
+                if len(entry) != 4:
+                    continue
+                provider, model, catalog_version, resolved = entry
+                self._entries[(provider, model, catalog_version)] = resolved
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return loaded
+
+
+_correction_memo: Optional[CorrectionMemo] = None
+_correction_memo_lock = threading.Lock()
+
+
+def get_correction_memo() -> CorrectionMemo:
+    """
+    Get the process-wide correction memo, creating it from the environment on first use.
+
+    Environment variables:
+        MODEL_CORRECTION_MEMO_SIZE: Maximum number of remembered corrections (default 1024)
+        MODEL_CORRECTION_MEMO_PERSIST: Persist corrections in the cache directory (default false)
+
+    Returns:
+        The shared CorrectionMemo
+    """
+    global _correction_memo
+    with _correction_memo_lock:
+        if _correction_memo is None:
+            persist_path = None
+            if get_env_bool("MODEL_CORRECTION_MEMO_PERSIST", False):
+                persist_path = get_cache_dir() / MEMO_FILE_NAME
+            _correction_memo = CorrectionMemo(
+                max_entries=get_env_int("MODEL_CORRECTION_MEMO_SIZE", DEFAULT_MEMO_MAX_ENTRIES),
+                persist_path=persist_path,
+            )
+        return _correction_memo
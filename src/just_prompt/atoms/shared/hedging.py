@@ -0,0 +1,414 @@
+"""
+Hedged requests for just-prompt.
+
+The router records how long each model takes to answer (and, when streaming,
+to send its first chunk). With hedging enabled, a request that is still
+waiting past a percentile of that recent latency gets a duplicate; whichever
+attempt answers first wins. Hedges go through the shared scheduler, so they
+count against the provider's concurrency limit, and are skipped while the
+provider has no free slot, no rate-limit budget, or a breaker reporting
+failures. The losing attempt's HTTP responses are closed, and a losing stream
+is also stopped at its next chunk. Hedges are capped at a percentage of
+traffic so a slow provider does not double the load. Async requests are
+hedged the same way with tasks on the running event loop, and the losing
+task is cancelled.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from .circuit_breaker import get_circuit_breakers
+from .http_pool import RequestScope, current_request_scope, request_scope
+from .rate_limiter import get_rate_limiter
+from .scheduler import get_scheduler
+from .utils import get_env_bool, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Latency percentile after which a duplicate request is sent
+DEFAULT_HEDGE_PERCENTILE = 95.0
+
+# Maximum share of requests that may be hedged, in percent
+DEFAULT_HEDGE_MAX_PERCENT = 5.0
+
+# Observations needed for a model before it is hedged
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+
+# Observations kept per model
+DEFAULT_LATENCY_HISTORY = 200
+
+# Latency kinds
+LATENCY_RESPONSE = "response"        # Until the complete response (non-streaming)
+LATENCY_FIRST_CHUNK = "first_chunk"  # Until the first streamed chunk
+
+ChunkHandler = Callable[[str], None]
+UpstreamCall = Callable[[Optional[ChunkHandler]], str]
+AsyncUpstreamCall = Callable[[], Awaitable[str]]
+
+
+class HedgeCancelled(Exception):
+    """
+    Raised inside a streaming attempt that lost the race, to stop reading its stream.
+    """
+
+
+class LatencyTracker:
+    """
+    Recent latencies per model spec, for percentile lookups.
+    """
+
+    def __init__(self, history: int = DEFAULT_LATENCY_HISTORY):
+        self.history = history
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_spec: str, kind: str, seconds: float) -> None:
+        """
+        Record one observed latency.
+
+        Args:
+            model_spec: "provider:model" the request went to
+            kind: LATENCY_RESPONSE or LATENCY_FIRST_CHUNK
+            seconds: Observed latency
+        """
+        with self._lock:
+            samples = self._samples.get((model_spec, kind))
+            if samples is None:
+                samples = self._samples[(model_spec, kind)] = deque(maxlen=self.history)
+            samples.append(seconds)
+
+    def percentile(self, model_spec: str, kind: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Get a latency percentile for a model.
+
+        Args:
+            model_spec: "provider:model"
+            kind: LATENCY_RESPONSE or LATENCY_FIRST_CHUNK
+            percentile: Percentile between 0 and 100
+            min_samples: Return None unless at least this many observations exist
+
+        Returns:
+            The latency in seconds, or None if there is not enough history
+        """
+        with self._lock:
+            samples = sorted(self._samples.get((model_spec, kind), ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+class _Attempt:
+    """
+    One copy of a hedged request.
+    """
+
+    def __init__(self, index: int, parent_scope: Optional[RequestScope] = None):
+        self.index = index
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.task: Optional[concurrent.futures.Future] = None
+        self.scope = RequestScope(parent_scope)
+        self.first_chunk_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+
+class _Race:
+    """
+    Runs attempts of the same request and picks the first to answer.
+
+    The first attempt runs in its own thread on behalf of the caller, which
+    waits on it and already holds its scheduler slot; hedges are submitted to
+    the scheduler under the provider. When streaming, the first attempt to
+    produce a chunk claims the stream. Once a winner is known, the other
+    attempts have their HTTP responses closed, and hedges that have not
+    started are dropped. Every attempt is also cancelled with the caller's
+    request scope.
+    """
+
+    def __init__(self, call: UpstreamCall, on_chunk: Optional[ChunkHandler], provider_name: Optional[str] = None):
+        self.call = call
+        self.provider_name = provider_name
+        self.on_chunk = on_chunk
+        self.scope = current_request_scope()
+        self.attempts: List[_Attempt] = []
+        self.winner: Optional[_Attempt] = None
+        self.progress = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, inline: bool = False) -> _Attempt:
+        """
+        Launch another attempt: the first in a new thread or (inline) in the
+        calling thread, later ones on the scheduler.
+        """
+        with self._lock:
+            attempt = _Attempt(len(self.attempts), self.scope)
+            self.attempts.append(attempt)
+        if inline:
+            self._run(attempt)
+        elif attempt.index == 0:
+            threading.Thread(
+                target=self._run, args=(attempt,), name="just-prompt-hedged-request", daemon=True
+            ).start()
+        else:
+            attempt.task = get_scheduler().submit(self._run, attempt, provider=self.provider_name)
+        return attempt
+
+    def result(self) -> Tuple[str, _Attempt]:
+        """
+        Wait for the winning attempt.
+
+        Returns:
+            Tuple of (response, winning attempt)
+
+        Raises:
+            Exception: The primary attempt's error if every attempt failed
+        """
+        while True:
+            with self._lock:
+                winner = self.winner
+                if winner is None:
+                    # Non-streaming (or an empty stream): the first successful completion wins
+                    for attempt in self.attempts:
+                        if attempt.future.done() and attempt.future.exception() is None:
+                            winner = self.winner = attempt
+                            break
+                pending = [attempt.future for attempt in self.attempts if not attempt.future.done()]
+
+            if winner is not None:
+                self._stop_others(winner)
+                return winner.future.result(), winner
+            if self.attempts[0].future.done():
+                # The first attempt failed; do not wait for hedges still queued
+                self._drop_unstarted()
+                pending = [attempt.future for attempt in self.attempts if not attempt.future.done()]
+            if not pending:
+                raise self.attempts[0].future.exception()
+            concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+    def _stop_others(self, winner: _Attempt) -> None:
+        self._drop_unstarted()
+        for attempt in self.attempts:
+            if attempt is not winner and not attempt.future.done():
+                attempt.scope.cancel()
+
+    def _drop_unstarted(self) -> None:
+        for attempt in self.attempts:
+            if attempt.task is not None and not attempt.future.done() and attempt.task.cancel():
+                attempt.future.set_exception(HedgeCancelled())
+
+    def _run(self, attempt: _Attempt) -> None:
+        def claim_chunk(chunk: str) -> None:
+            with self._lock:
+                if self.winner is None:
+                    self.winner = attempt
+                elif self.winner is not attempt:
+                    raise HedgeCancelled()
+            if attempt.first_chunk_at is None:
+                attempt.first_chunk_at = time.monotonic()
+                self.progress.set()
+            self.on_chunk(chunk)
+
+        try:
+            with request_scope(attempt.scope):
+                response = self.call(claim_chunk if self.on_chunk is not None else None)
+            attempt.finished_at = time.monotonic()
+            attempt.future.set_result(response)
+        except BaseException as e:
+            attempt.future.set_exception(e)
+        finally:
+            self.progress.set()
+
+
+class Hedger:
+    """
+    Sends a duplicate of slow requests and keeps whichever answers first.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        max_percent: float = DEFAULT_HEDGE_MAX_PERCENT,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        history: int = DEFAULT_LATENCY_HISTORY,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_percent = max_percent
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(history)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def run(self, model_spec: str, call: UpstreamCall, on_chunk: Optional[ChunkHandler] = None) -> str:
+        """
+        Run an upstream call, hedging it if it is slower than usual.
+
+        Args:
+            model_spec: "provider:model" the request goes to, used for latency history
+            call: Performs the upstream call; receives a chunk handler when streaming, else None
+            on_chunk: Optional callback receiving response text as it streams in
+
+        Returns:
+            The response of the first attempt to answer
+        """
+        started = time.monotonic()
+        kind = LATENCY_FIRST_CHUNK if on_chunk is not None else LATENCY_RESPONSE
+        with self._lock:
+            self.requests += 1
+        threshold = (
+            self.latency.percentile(model_spec, kind, self.percentile, self.min_samples) if self.enabled else None
+        )
+
+        provider_name, _, model = model_spec.partition(":")
+        race = _Race(call, on_chunk, provider_name)
+        if threshold is None:
+            # Nothing to hedge against - run in this thread and just record the latency
+            race.start(inline=True)
+        else:
+            race.start()
+            if not race.progress.wait(threshold):
+                if self._under_pressure(provider_name, model):
+                    logger.info(f"Not hedging {model_spec}: the provider is at its limits or failing")
+                elif self._take_hedge():
+                    logger.info(f"Hedging {model_spec} after {threshold:.2f}s without a {kind.replace('_', ' ')}")
+                    race.start()
+        response, winner = race.result()
+        if winner.index > 0:
+            with self._lock:
+                self.hedge_wins += 1
+
+        # Measured from the caller's request, so time spent waiting for a thread
+        # or scheduler slot counts. The history describes the primary: when a
+        # hedge wins, the primary had still not answered by then, so the
+        # elapsed time is recorded for it as the least it would have taken.
+        answered = (winner.first_chunk_at if kind == LATENCY_FIRST_CHUNK else None) or winner.finished_at
+        self.latency.record(model_spec, kind, (answered or time.monotonic()) - started)
+        return response
+
+    async def arun(self, model_spec: str, call: AsyncUpstreamCall) -> str:
+        """
+        Async variant of run for calls that do not stream; call returns an awaitable upstream call.
+
+        The attempts run as tasks on the running event loop; once one answers,
+        the other is cancelled, which closes its HTTP response.
+
+        Args:
+            model_spec: "provider:model" the request goes to, used for latency history
+            call: Starts the upstream call
+
+        Returns:
+            The response of the first attempt to answer
+
+        Raises:
+            Exception: The primary attempt's error if every attempt failed
+        """
+        started = time.monotonic()
+        with self._lock:
+            self.requests += 1
+        threshold = (
+            self.latency.percentile(model_spec, LATENCY_RESPONSE, self.percentile, self.min_samples)
+            if self.enabled
+            else None
+        )
+
+        provider_name, _, model = model_spec.partition(":")
+        attempts = [asyncio.ensure_future(call())]
+        try:
+            if threshold is not None:
+                done, _ = await asyncio.wait(attempts, timeout=threshold)
+                if not done:
+                    if self._under_pressure(provider_name, model):
+                        logger.info(f"Not hedging {model_spec}: the provider is at its limits or failing")
+                    elif self._take_hedge():
+                        logger.info(f"Hedging {model_spec} after {threshold:.2f}s without a response")
+                        attempts.append(asyncio.ensure_future(call()))
+            response, winner = await self._first_answer(attempts)
+        finally:
+            losers = [attempt for attempt in attempts if not attempt.done()]
+            for attempt in losers:
+                attempt.cancel()
+            # Collect the losers so their errors are not reported as never retrieved
+            await asyncio.gather(*losers, return_exceptions=True)
+
+        if winner > 0:
+            with self._lock:
+                self.hedge_wins += 1
+        # As in run: measured from the caller's request, and for the primary
+        self.latency.record(model_spec, LATENCY_RESPONSE, time.monotonic() - started)
+        return response
+
+    @staticmethod
+    async def _first_answer(attempts: List["asyncio.Future[str]"]) -> Tuple[str, int]:
+        # The first successful attempt wins; the primary's error is raised if every attempt failed
+        while True:
+            for index, attempt in enumerate(attempts):
+                if attempt.done() and not attempt.cancelled() and attempt.exception() is None:
+                    return attempt.result(), index
+            pending = [attempt for attempt in attempts if not attempt.done()]
+            if not pending:
+                return attempts[0].result(), 0
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hedging counters.
+
+        Returns:
+            Dictionary with requests seen, hedges sent and hedges that answered first
+        """
+        with self._lock:
+            return {"requests": self.requests, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+    @staticmethod
+    def _under_pressure(provider_name: str, model: str) -> bool:
+        # A duplicate would only add load to a provider that is queueing, throttled or failing
+        return not (
+            get_scheduler().has_capacity(provider_name)
+            and get_rate_limiter().has_budget(provider_name, model)
+            and get_circuit_breakers().is_healthy(provider_name, model)
+        )
+
+    def _take_hedge(self) -> bool:
+        # Keep hedges within max_percent of all requests
+        with self._lock:
+            if (self.hedged + 1) * 100 > self.max_percent * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """
+    Get the process-wide hedger, creating it from the environment on first use.
+
+    Environment variables:
+        HEDGE: Enable hedged requests (default false)
+        HEDGE_PERCENTILE: Latency percentile after which a duplicate is sent (default 95)
+        HEDGE_MAX_PERCENT: Maximum share of requests that may be hedged, in percent (default 5)
+        HEDGE_MIN_SAMPLES: Observations needed for a model before it is hedged (default 20)
+
+    Returns:
+        The shared Hedger
+    """
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger(
+                enabled=get_env_bool("HEDGE", False),
+                percentile=get_env_float("HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE),
+                max_percent=get_env_float("HEDGE_MAX_PERCENT", DEFAULT_HEDGE_MAX_PERCENT),
+                min_samples=get_env_int("HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES),
+            )
+        return _hedger
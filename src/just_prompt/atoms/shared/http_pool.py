@@ -0,0 +1,395 @@
+"""
+Shared HTTP connection pools for the provider clients.
+
+Every provider client is built on the same httpx transport (one for sync
+clients, and one per event loop for async clients), so connections are kept
+alive and reused across calls and clients instead of each SDK client opening
+its own pool with default limits. Async connections belong to the event loop
+that opened them, so each running loop gets its own pool behind the one async
+transport the clients share. The pool size follows the scheduler's global concurrency cap
+so a wide fan-out gets a connection per in-flight call, and idle connections
+stay open long enough to skip the TLS handshake on the next call. HTTP/2 can
+be enabled when the optional h2 package is installed.
+
+Requests made inside request_deadline() have their timeouts capped to the
+time left when they are sent. A streamed response gets that cap on each read,
+not on the whole stream.
+Requests made inside request_scope() can be cancelled from another thread,
+which closes their open responses, e.g. when a hedged attempt loses. Async
+requests are stopped by cancelling their task instead.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import httpx
+from .scheduler import DEFAULT_MAX_CONCURRENCY
+from .utils import get_env_bool, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a connection to be established
+DEFAULT_HTTP_CONNECT_TIMEOUT = 10.0
+
+# Seconds to wait for data on an open connection (reasoning models can be slow)
+DEFAULT_HTTP_READ_TIMEOUT = 600.0
+
+# Seconds an idle connection is kept open for reuse
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 120.0
+
+EventHooks = Dict[str, List[Callable[..., Any]]]
+
+# Monotonic time by which requests made in the current context must finish
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "just_prompt_request_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """
+    Cap the timeouts of HTTP requests made on the shared pool within this context.
+
+    Each timeout (connect, read, write, pool) is limited to the time left when
+    the request is sent, and requests started after the deadline fail at once
+    with a timeout. The read timeout applies to each read, so a streamed
+    response that keeps sending data is not cut off at the deadline. Nested
+    deadlines only ever shorten the time left.
+
+    Args:
+        seconds: Time allowed from now
+    """
+    deadline = time.monotonic() + max(0.0, seconds)
+    outer = _request_deadline.get()
+    token = _request_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+class RequestScope:
+    """
+    The HTTP responses of one logical request, so they can be closed from another thread.
+
+    A scope created with a parent, e.g. for one attempt of a hedged request,
+    is cancelled along with it.
+    """
+
+    def __init__(self, parent: Optional["RequestScope"] = None):
+        self.cancelled = False
+        self._responses: List[httpx.Response] = []
+        self._children: List["RequestScope"] = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._adopt(self)
+
+    def track(self, response: httpx.Response) -> None:
+        """
+        Remember an open response, closing it at once if the scope is already cancelled.
+        """
+        with self._lock:
+            if not self.cancelled:
+                self._responses.append(response)
+                return
+        response.close()
+
+    def cancel(self) -> None:
+        """
+        Close every open response and fail requests made from now on, here and in child scopes.
+        """
+        with self._lock:
+            self.cancelled = True
+            responses, self._responses = self._responses, []
+            children, self._children = self._children, []
+        for response in responses:
+            try:
+                response.close()
+            except Exception as e:
+                logger.debug(f"Error closing cancelled response: {e}")
+        for child in children:
+            child.cancel()
+
+    def _adopt(self, child: "RequestScope") -> None:
+        with self._lock:
+            if not self.cancelled:
+                self._children.append(child)
+                return
+        child.cancel()
+
+
+# Scope of the logical request the current context belongs to
+_request_scope: contextvars.ContextVar[Optional[RequestScope]] = contextvars.ContextVar(
+    "just_prompt_request_scope", default=None
+)
+
+
+@contextlib.contextmanager
+def request_scope(scope: RequestScope) -> Iterator[RequestScope]:
+    """
+    Track the HTTP requests made on the shared pool within this context in scope.
+
+    Args:
+        scope: Scope to track the requests in
+
+    Yields:
+        The scope
+    """
+    token = _request_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _request_scope.reset(token)
+
+
+def current_request_scope() -> Optional[RequestScope]:
+    """
+    Get the request scope of the current context.
+
+    Returns:
+        The scope, or None outside request_scope()
+    """
+    return _request_scope.get()
+
+
+def request_cancelled() -> bool:
+    """
+    Check whether the request scope of the current context has been cancelled.
+
+    Returns:
+        True if the current context's requests should stop
+    """
+    scope = _request_scope.get()
+    return scope is not None and scope.cancelled
+
+
+def _apply_request_context(request: httpx.Request) -> Optional[RequestScope]:
+    """
+    Apply the calling context's request_scope() and request_deadline() to a request about to be sent.
+
+    Returns:
+        The context's request scope, if any
+
+    Raises:
+        httpx.RequestError: If the scope has been cancelled
+        httpx.TimeoutException: If the deadline has passed
+    """
+    scope = _request_scope.get()
+    if scope is not None and scope.cancelled:
+        raise httpx.RequestError("Request cancelled", request=request)
+    deadline = _request_deadline.get()
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise httpx.TimeoutException("Request deadline exceeded", request=request)
+        timeout = request.extensions.get("timeout") or dict.fromkeys(("connect", "read", "write", "pool"))
+        request.extensions["timeout"] = {
+            name: remaining if value is None else min(value, remaining) for name, value in timeout.items()
+        }
+    return scope
+
+
+class _DeadlineTransport(httpx.BaseTransport):
+    """
+    Transport wrapper applying the request_deadline() and request_scope() of the calling context.
+    """
+
+    def __init__(self, transport: httpx.HTTPTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        scope = _apply_request_context(request)
+        response = self.transport.handle_request(request)
+        if scope is not None:
+            scope.track(response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class _EventLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport sending each request on the running event loop's own pool.
+
+    Applies the request_deadline() of the calling context, and fails requests
+    of a cancelled request_scope(); open async responses are not tracked, as
+    cancelling their task already closes them.
+    """
+
+    def __init__(self, pool: "HttpPool"):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_request_context(request)
+        return await self.pool.loop_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # The pools are shared by every async client; they close with their event loop
+        pass
+
+
+class HttpPool:
+    """
+    Process-wide httpx transport shared by every provider client.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONCURRENCY,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+        connect_timeout: float = DEFAULT_HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_HTTP_READ_TIMEOUT,
+        http2: bool = False,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections if max_keepalive_connections is None else max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http2 = http2 and _h2_installed()
+        self._transport: Optional[_DeadlineTransport] = None
+        self._async_transport = _EventLoopTransport(self)
+        self._loop_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def transport(self) -> httpx.BaseTransport:
+        """
+        Get the shared transport, creating it on first use.
+        """
+        with self._lock:
+            if self._transport is None:
+                self._transport = _DeadlineTransport(httpx.HTTPTransport(limits=self.limits, http2=self.http2))
+            return self._transport
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        """
+        Get the async transport shared by async clients; each event loop gets its own pool behind it.
+        """
+        return self._async_transport
+
+    def loop_transport(self) -> httpx.AsyncHTTPTransport:
+        """
+        Get the async pool of the running event loop, creating it on first use.
+
+        Raises:
+            RuntimeError: If no event loop is running
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._loop_transports.get(loop)
+            if transport is None:
+                transport = self._loop_transports[loop] = httpx.AsyncHTTPTransport(
+                    limits=self.limits, http2=self.http2
+                )
+            return transport
+
+    def client(self, event_hooks: Optional[EventHooks] = None) -> httpx.Client:
+        """
+        Build an httpx client on the shared pool, for passing to an SDK client.
+
+        Args:
+            event_hooks: Optional httpx event hooks, e.g. from rate_limit_event_hooks
+
+        Returns:
+            An httpx.Client with the pool's timeouts
+        """
+        return httpx.Client(
+            transport=self.transport(), timeout=self.timeout, follow_redirects=True, event_hooks=event_hooks
+        )
+
+    def async_client(self, event_hooks: Optional[EventHooks] = None) -> httpx.AsyncClient:
+        """
+        Build an httpx async client on the shared async pools, for passing to an SDK client.
+
+        The client can be used from any event loop; requests go to that loop's pool.
+
+        Args:
+            event_hooks: Optional async httpx event hooks, e.g. from rate_limit_event_hooks
+
+        Returns:
+            An httpx.AsyncClient with the pool's timeouts
+        """
+        return httpx.AsyncClient(
+            transport=self.async_transport(), timeout=self.timeout, follow_redirects=True, event_hooks=event_hooks
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool usage.
+
+        Returns:
+            Dictionary with open, active and idle connections and requests
+            waiting for a connection in the sync pool, the pool limit, and the
+            number of event loops with an async pool
+        """
+        with self._lock:
+            transport = self._transport
+            event_loops = len(self._loop_transports)
+        # httpcore's pool lists its connections; waiting requests are internal, so read them defensively
+        pool = getattr(getattr(transport, "transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", ()))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+            "waiting": sum(1 for request in list(getattr(pool, "_requests", ())) if request.is_queued()),
+            "max_connections": self.limits.max_connections,
+            "http2": self.http2,
+            "event_loops": event_loops,
+        }
+
+
+def _h2_installed() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP/2 requested but the h2 package is not installed (pip install 'httpx[http2]'); using HTTP/1.1")
+        return False
+    return True
+
+
+_http_pool: Optional[HttpPool] = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HttpPool:
+    """
+    Get the process-wide HTTP pool, creating it from the environment on first use.
+
+    Environment variables:
+        HTTP_MAX_CONNECTIONS: Connections per pool (default JUST_PROMPT_MAX_CONCURRENCY, else 32)
+        HTTP_MAX_KEEPALIVE_CONNECTIONS: Idle connections kept open (default HTTP_MAX_CONNECTIONS)
+        HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default 120)
+        HTTP_CONNECT_TIMEOUT: Seconds to establish a connection (default 10)
+        HTTP_READ_TIMEOUT: Seconds to wait for data on a connection (default 600)
+        HTTP2: Use HTTP/2 where the provider supports it; needs httpx[http2] (default false)
+
+    Returns:
+        The shared HttpPool
+    """
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            max_connections = get_env_int(
+                "HTTP_MAX_CONNECTIONS", get_env_int("JUST_PROMPT_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+            )
+            _http_pool = HttpPool(
+                max_connections=max_connections,
+                max_keepalive_connections=get_env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", max_connections),
+                keepalive_expiry=get_env_float("HTTP_KEEPALIVE_EXPIRY", DEFAULT_HTTP_KEEPALIVE_EXPIRY),
+                connect_timeout=get_env_float("HTTP_CONNECT_TIMEOUT", DEFAULT_HTTP_CONNECT_TIMEOUT),
+                read_timeout=get_env_float("HTTP_READ_TIMEOUT", DEFAULT_HTTP_READ_TIMEOUT),
+                http2=get_env_bool("HTTP2", False),
+            )
+        return _http_pool
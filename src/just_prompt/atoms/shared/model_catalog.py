@@ -0,0 +1,453 @@
+"""
+Model catalog cache for just-prompt.
+
+Keeps the result of each provider's ``list_models()`` in memory so that model
+validation and correction do not hit the provider APIs on every prompt. The
+catalog can also be persisted as a versioned on-disk snapshot so a restarted
+server can validate model names without any network calls.
+
+When a provider cannot be listed, its hardcoded list of known models is
+served as a degraded entry. Degraded entries are cached only for a short
+negative TTL, so a provider that is down is not asked again on every lookup,
+and they are never saved to the snapshot.
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from .utils import atomic_write_text, get_cache_dir, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Seconds a catalog entry is considered fresh
+DEFAULT_CATALOG_TTL = 300.0
+
+# Seconds after expiry during which a stale entry is still served while it is
+# refreshed in the background
+DEFAULT_CATALOG_STALE_TTL = 3600.0
+
+# Seconds a degraded entry (known models served after listing failed) is
+# cached before the provider is asked again
+DEFAULT_CATALOG_NEGATIVE_TTL = 30.0
+
+# Maximum number of provider catalogs held in memory
+DEFAULT_CATALOG_MAX_ENTRIES = 32
+
+# Bump whenever the snapshot file layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+# File name of the catalog snapshot inside the cache directory
+SNAPSHOT_FILE_NAME = "model_catalog.json"
+
+
+def _load_provider_models(provider_name: str) -> List[str]:
+    """
+    Fetch the model list straight from a provider module.
+
+    Args:
+        provider_name: Provider name (full name)
+
+    Returns:
+        List of model names
+
+    Raises:
+        ValueError: If the provider's models could not be listed
+    """
+    provider_module = importlib.import_module(f"just_prompt.atoms.llm_providers.{provider_name}")
+    return list(provider_module.list_models(fallback=False))
+
+
+def _provider_fallback_models(provider_name: str) -> List[str]:
+    """
+    Get a provider's hardcoded list of known models.
+
+    Args:
+        provider_name: Provider name (full name)
+
+    Returns:
+        List of model names (empty if the provider has none)
+    """
+    provider_module = importlib.import_module(f"just_prompt.atoms.llm_providers.{provider_name}")
+    return list(getattr(provider_module, "FALLBACK_MODELS", []))
+
+
+def catalog_version(models: List[str]) -> str:
+    """
+    Compute a stable version identifier for a list of models.
+
+    Args:
+        models: List of model names
+
+    Returns:
+        Short hash that changes whenever the set of models changes
+    """
+    digest = hashlib.sha1("\n".join(sorted(models)).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class CatalogEntry:
+    """
+    A cached provider model list.
+
+    A degraded entry holds the provider's known models because listing failed;
+    it is cached only for the negative TTL and never saved.
+    """
+
+    def __init__(self, models: List[str], fetched_at: float, degraded: bool = False):
+        self.models = list(models)
+        self.fetched_at = fetched_at
+        self.degraded = degraded
+        self.version = catalog_version(self.models)
+
+
+class ModelCatalog:
+    """
+    Thread-safe, TTL-bound cache of provider model lists.
+
+    Fresh entries are returned directly. Entries past their TTL but still inside
+    the stale window are returned immediately while a background refresh runs.
+    Entries past the stale window (or missing) are loaded synchronously.
+    Degraded entries are served until the negative TTL ends and then reloaded
+    synchronously.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CATALOG_TTL,
+        stale_ttl: float = DEFAULT_CATALOG_STALE_TTL,
+        max_entries: int = DEFAULT_CATALOG_MAX_ENTRIES,
+        negative_ttl: float = DEFAULT_CATALOG_NEGATIVE_TTL,
+        loader: Callable[[str], List[str]] = _load_provider_models,
+        fallback: Callable[[str], List[str]] = _provider_fallback_models,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max(1, max_entries)
+        self.negative_ttl = negative_ttl
+        self._loader = loader
+        self._fallback = fallback
+        self._entries: "OrderedDict[str, CatalogEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._provider_locks: Dict[str, threading.Lock] = {}
+        self._refreshing = set()
+        self.snapshot_path: Optional[Path] = None
+        self._snapshot_lock = threading.Lock()
+
+    def get(self, provider_name: str) -> List[str]:
+        """
+        Get the available models for a provider.
+
+        Args:
+            provider_name: Provider name (full name)
+
+        Returns:
+            List of model names
+        """
+        return list(self.get_entry(provider_name).models)
+
+    def version(self, provider_name: str) -> str:
+        """
+        Get the version of the cached catalog for a provider.
+
+        Args:
+            provider_name: Provider name (full name)
+
+        Returns:
+            Catalog version string
+        """
+        return self.get_entry(provider_name).version
+
+    def get_entry(self, provider_name: str) -> CatalogEntry:
+        """
+        Get the catalog entry for a provider, loading or refreshing it as needed.
+
+        Args:
+            provider_name: Provider name (full name)
+
+        Returns:
+            The catalog entry
+        """
+        entry = self._lookup(provider_name)
+        if entry is not None and entry.degraded:
+            if time.time() - entry.fetched_at <= self.negative_ttl:
+                return entry
+        elif entry is not None:
+            age = time.time() - entry.fetched_at
+            if age <= self.ttl:
+                return entry
+            if age <= self.ttl + self.stale_ttl:
+                self.refresh_in_background(provider_name)
+                return entry
+
+        # Missing or too old to serve - load synchronously, one loader per provider
+        with self._provider_lock(provider_name):
+            current = self._lookup(provider_name)
+            if current is not None and current is not entry:
+                return current
+            try:
+                return self.refresh(provider_name)
+            except Exception as e:
+                if entry is None or entry.degraded:
+                    return self._degraded_entry(provider_name, e)
+                logger.warning(f"Error refreshing model catalog for {provider_name}, serving stale entry: {e}")
+                return entry
+
+    def refresh(self, provider_name: str) -> CatalogEntry:
+        """
+        Load the model list for a provider and store it in the cache.
+
+        Args:
+            provider_name: Provider name (full name)
+
+        Returns:
+            The new catalog entry
+        """
+        logger.debug(f"Loading model catalog for {provider_name}")
+        models = self._loader(provider_name)
+        entry = self.put(provider_name, models)
+        if self.snapshot_path is not None:
+            try:
+                self.save_snapshot(self.snapshot_path)
+            except Exception as e:
+                logger.warning(f"Error writing model catalog snapshot to {self.snapshot_path}: {e}")
+        return entry
+
+    def refresh_in_background(self, provider_name: str) -> None:
+        """
+        Refresh a provider's catalog on a daemon thread, unless a refresh is already running.
+
+        Args:
+            provider_name: Provider name (full name)
+        """
+        with self._lock:
+            if provider_name in self._refreshing:
+                return
+            self._refreshing.add(provider_name)
+
+        def _run():
+            try:
+                with self._provider_lock(provider_name):
+                    self.refresh(provider_name)
+            except Exception as e:
+                logger.warning(f"Background refresh of model catalog for {provider_name} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(provider_name)
+
+        threading.Thread(
+            target=_run, name=f"catalog-refresh-{provider_name}", daemon=True
+        ).start()
+
+    def refresh_all_in_background(self, provider_names: Iterable[str]) -> None:
+        """
+        Refresh several providers' catalogs in the background.
+
+        Args:
+            provider_names: Provider names (full names)
+        """
+        for provider_name in provider_names:
+            self.refresh_in_background(provider_name)
+
+    def put(
+        self,
+        provider_name: str,
+        models: List[str],
+        fetched_at: Optional[float] = None,
+        degraded: bool = False,
+    ) -> CatalogEntry:
+        """
+        Store a model list for a provider.
+
+        Args:
+            provider_name: Provider name (full name)
+            models: List of model names
+            fetched_at: Timestamp the list was fetched at (defaults to now)
+            degraded: Whether the list holds the provider's known models because listing failed
+
+        Returns:
+            The stored catalog entry
+        """
+        entry = CatalogEntry(models, time.time() if fetched_at is None else fetched_at, degraded)
+        with self._lock:
+            self._entries[provider_name] = entry
+            self._entries.move_to_end(provider_name)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted model catalog for {evicted}")
+        return entry
+
+    def put_degraded(self, provider_name: str, models: List[str]) -> None:
+        """
+        Cache a provider's known models after its listing failed, unless a listed catalog is cached.
+
+        Args:
+            provider_name: Provider name (full name)
+            models: The provider's known models
+        """
+        entry = self._lookup(provider_name)
+        if entry is None or entry.degraded:
+            self.put(provider_name, models, degraded=True)
+
+    def recent_failure(self, provider_name: str) -> Optional[CatalogEntry]:
+        """
+        Get the degraded entry of a provider whose listing failed within the negative TTL.
+
+        Args:
+            provider_name: Provider name (full name)
+
+        Returns:
+            The degraded entry, or None if the provider should be asked again
+        """
+        entry = self._lookup(provider_name)
+        if entry is None or not entry.degraded or time.time() - entry.fetched_at > self.negative_ttl:
+            return None
+        return entry
+
+    def invalidate(self, provider_name: Optional[str] = None) -> None:
+        """
+        Drop cached catalogs.
+
+        Args:
+            provider_name: Provider to drop, or None to drop everything
+        """
+        with self._lock:
+            if provider_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(provider_name, None)
+
+    def save_snapshot(self, path: Path) -> None:
+        """
+        Write the cached catalogs to a versioned JSON snapshot.
+
+        Args:
+            path: Snapshot file path
+        """
+        with self._lock:
+            providers = {
+                provider_name: {
+                    "models": entry.models,
+                    "fetched_at": entry.fetched_at,
+                    "version": entry.version,
+                }
+                for provider_name, entry in self._entries.items()
+                if not entry.degraded
+            }
+        snapshot = {"format_version": SNAPSHOT_FORMAT_VERSION, "providers": providers}
+        with self._snapshot_lock:
+            atomic_write_text(Path(path), json.dumps(snapshot, indent=2))
+
+    def load_snapshot(self, path: Path) -> int:
+        """
+        Load catalogs from a snapshot written by save_snapshot.
+
+        Entries older than the TTL are loaded as stale, so they are served
+        immediately and revalidated in the background on first use.
+
+        Args:
+            path: Snapshot file path
+
+        Returns:
+            Number of provider catalogs loaded
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model catalog snapshot {path}: {e}")
+            return 0
+
+        if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            logger.info(f"Ignoring model catalog snapshot {path} with unsupported format version")
+            return 0
+
+        # Keep loaded entries inside the stale window so they never force a
+        # synchronous reload on the first request
+        oldest_servable = time.time() - self.ttl - self.stale_ttl / 2
+        loaded = 0
+        for provider_name, data in snapshot.get("providers", {}).items():
+            models = data.get("models")
+            if not isinstance(models, list):
+                continue
+            fetched_at = max(float(data.get("fetched_at", 0)), oldest_servable)
+            self.put(provider_name, models, fetched_at=fetched_at)
+            loaded += 1
+
+        logger.info(f"Loaded model catalog snapshot for {loaded} providers from {path}")
+        return loaded
+
+    def _degraded_entry(self, provider_name: str, error: Exception) -> CatalogEntry:
+        """
+        Cache an entry of the provider's known models, for the negative TTL, after listing failed.
+
+        Raises:
+            Exception: The listing error if the provider has no known models
+        """
+        try:
+            models = self._fallback(provider_name)
+        except Exception:
+            models = []
+        if not models:
+            raise error
+        logger.warning(f"Error loading model catalog for {provider_name}, using its known models for now: {error}")
+        return self.put(provider_name, models, degraded=True)
+
+    def _lookup(self, provider_name: str) -> Optional[CatalogEntry]:
+        with self._lock:
+            entry = self._entries.get(provider_name)
+            if entry is not None:
+                self._entries.move_to_end(provider_name)
+            return entry
+
+    def _provider_lock(self, provider_name: str) -> threading.Lock:
+        with self._lock:
+            return self._provider_locks.setdefault(provider_name, threading.Lock())
+
+
+_model_catalog: Optional[ModelCatalog] = None
+_model_catalog_lock = threading.Lock()
+
+
+def get_model_catalog() -> ModelCatalog:
+    """
+    Get the process-wide model catalog, creating it from the environment on first use.
+
+    Environment variables:
+        MODEL_CATALOG_TTL: Seconds an entry is fresh (default 300)
+        MODEL_CATALOG_STALE_TTL: Seconds a stale entry may still be served (default 3600)
+        MODEL_CATALOG_MAX_ENTRIES: Maximum number of cached provider catalogs (default 32)
+        MODEL_CATALOG_NEGATIVE_TTL: Seconds known models are served after listing failed (default 30)
+
+    Returns:
+        The shared ModelCatalog
+    """
+    global _model_catalog
+    with _model_catalog_lock:
+        if _model_catalog is None:
+            _model_catalog = ModelCatalog(
+                ttl=get_env_float("MODEL_CATALOG_TTL", DEFAULT_CATALOG_TTL),
+                stale_ttl=get_env_float("MODEL_CATALOG_STALE_TTL", DEFAULT_CATALOG_STALE_TTL),
+                max_entries=get_env_int("MODEL_CATALOG_MAX_ENTRIES", DEFAULT_CATALOG_MAX_ENTRIES),
+                negative_ttl=get_env_float("MODEL_CATALOG_NEGATIVE_TTL", DEFAULT_CATALOG_NEGATIVE_TTL),
+            )
+        return _model_catalog
+
+
+def get_snapshot_path() -> Path:
+    """
+    Get the default location of the model catalog snapshot.
+
+    Returns:
+        Path to the snapshot file inside the cache directory
+    """
+    return get_cache_dir() / SNAPSHOT_FILE_NAME
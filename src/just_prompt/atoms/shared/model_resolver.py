@@ -0,0 +1,354 @@
+"""
+Local model name resolver for just-prompt.
+
+Resolves misspelled or shorthand model names (e.g. ``4o``, ``claude-sonnet-4``,
+``gpt-4o-mnii``) against a provider's model catalog without calling an LLM.
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from .model_catalog import get_model_catalog
+
+logger = logging.getLogger(__name__)
+
+# Minimum confidence for a local resolution to be used without LLM correction
+DEFAULT_RESOLVER_THRESHOLD = 0.8
+
+# Well-known shorthands, applied only when the target exists in the catalog
+MODEL_ALIASES: Dict[str, Dict[str, str]] = {
+    "openai": {
+        "4o": "gpt-4o",
+        "4o-mini": "gpt-4o-mini",
+        "4.1": "gpt-4.1",
+        "4.1-mini": "gpt-4.1-mini",
+        "4.1-nano": "gpt-4.1-nano",
+        "4.5": "gpt-4.5-preview",
+        "o4mini": "o4-mini",
+        "o3mini": "o3-mini",
+    },
+    "deepseek": {
+        "r1": "deepseek-reasoner",
+        "v3": "deepseek-chat",
+    },
+}
+
+# Suffixes that carry reasoning effort or thinking budgets rather than model names
+_SUFFIX_PATTERN = re.compile(r"^(low|medium|high|\d+k?)$", re.IGNORECASE)
+
+# Trailing release dates: -20250514, -2024-08-06, -04-17
+_DATE_PATTERN = re.compile(r"-(\d{8}|\d{4}-\d{2}-\d{2}|\d{2}-\d{2})$")
+
+# Full release dates; a name carrying one asks for that exact snapshot
+_FULL_DATE_PATTERN = re.compile(r"-(\d{8}|\d{4}-\d{2}-\d{2})$")
+
+_TOKEN_SPLIT_PATTERN = re.compile(r"[-.:]+")
+
+# Dots inside version numbers: "3.7" and "3-7" name the same release
+_VERSION_DOT_PATTERN = re.compile(r"(?<=\d)\.(?=\d)")
+
+# Weights for the different keys a model is indexed under; the exact name
+# always wins over derived keys when scores would otherwise tie
+_NAME_WEIGHT = 1.0
+_DATE_STRIPPED_WEIGHT = 0.99
+_VENDOR_STRIPPED_WEIGHT = 0.98
+_VENDOR_AND_DATE_STRIPPED_WEIGHT = 0.97
+
+# Runner-up scores within this margin make a match ambiguous
+_AMBIGUITY_MARGIN = 0.03
+
+# Factor applied to names whose version numbers contradict each other,
+# so "sonnet-3-7" never settles on "claude-sonnet-4"
+_VERSION_MISMATCH_PENALTY = 0.6
+
+
+def normalize_model_name(name: str) -> str:
+    """
+    Normalize a model name for comparison.
+
+    Args:
+        name: Model name
+
+    Returns:
+        Lowercased name with separators collapsed to "-"
+    """
+    name = name.strip().lower()
+    if name.startswith("models/"):
+        name = name[len("models/"):]
+    name = re.sub(r"[\s_/]+", "-", name)
+    return re.sub(r"-{2,}", "-", name).strip("-")
+
+
+def _tokens(name: str) -> Set[str]:
+    return {token for token in _TOKEN_SPLIT_PATTERN.split(name) if token}
+
+
+def _compact(name: str) -> str:
+    return _TOKEN_SPLIT_PATTERN.sub("", name)
+
+
+def _canonical(name: str) -> str:
+    return _VERSION_DOT_PATTERN.sub("-", name)
+
+
+def _version(name: str) -> Tuple[Tuple[str, ...], bool]:
+    """
+    Extract the version tokens of a normalized name, ignoring a release date.
+
+    Version tokens are the tokens starting with a digit ("4", "4o", "27b").
+
+    Returns:
+        Tuple of (version tokens, whether the name ends with its version)
+    """
+    tokens = [token for token in _TOKEN_SPLIT_PATTERN.split(_DATE_PATTERN.sub("", _canonical(name))) if token]
+    version = tuple(token for token in tokens if token[0].isdigit())
+    return version, bool(tokens) and tokens[-1][0].isdigit()
+
+
+def _versions_compatible(query: str, key: str) -> bool:
+    """
+    Check whether a candidate's version can be what the query asks for.
+
+    Versions must be equal, except that a query ending in a shorter version
+    ("gemini-2", "claude-3") matches the candidates that version starts.
+    "claude-sonnet-4-5" never matches "claude-sonnet-4", nor "claude-3-haiku"
+    "claude-3-5-haiku", nor "gpt-4" "gpt-4o".
+    """
+    query_version, query_trailing = _version(query)
+    key_version, _ = _version(key)
+    if not query_version or not key_version or query_version == key_version:
+        return True
+    return query_trailing and key_version[:len(query_version)] == query_version
+
+
+def _trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+
+    Args:
+        a: First string
+        b: Second string
+
+    Returns:
+        Number of edits needed to turn a into b
+    """
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+
+def similarity(query: str, key: str) -> float:
+    """
+    Score how similar two normalized model names are.
+
+    Combines edit distance, character trigram overlap and token-set overlap
+    (which tolerates reordered names like "sonnet-3-7" vs "3-7-sonnet").
+    Dotted and dashed versions ("3.7", "3-7") compare equal, and names whose
+    versions are not compatible (see _versions_compatible) are penalized.
+
+    Args:
+        query: Normalized query name
+        key: Normalized candidate name
+
+    Returns:
+        Similarity between 0.0 and 1.0
+    """
+    if query == key:
+        return 1.0
+    penalty = 1.0 if _versions_compatible(query, key) else _VERSION_MISMATCH_PENALTY
+    if _compact(query) == _compact(key):
+        return 0.98 * penalty
+    query, key = _canonical(query), _canonical(key)
+    edit_score = 1.0 - edit_distance(query, key) / max(len(query), len(key))
+    trigram_score = _jaccard(_trigrams(query), _trigrams(key))
+    token_score = 0.95 * _jaccard(_tokens(query), _tokens(key))
+    return max(edit_score, trigram_score, token_score) * penalty
+
+
+def _derived_keys(model: str) -> List[Tuple[str, float]]:
+    """
+    Build the normalized keys a catalog model is indexed under.
+    """
+    name = normalize_model_name(model)
+    keys = [(name, _NAME_WEIGHT)]
+
+    # Ollama tags: "llama3" should find "llama3:latest"
+    if name.endswith(":latest"):
+        keys.append((name[:-len(":latest")], _DATE_STRIPPED_WEIGHT))
+
+    date_stripped = _DATE_PATTERN.sub("", name)
+    if date_stripped != name and date_stripped:
+        keys.append((date_stripped, _DATE_STRIPPED_WEIGHT))
+
+    # Drop a leading vendor/family word so "4o" finds "gpt-4o" and
+    # "3-7-sonnet" finds "claude-3-7-sonnet-20250219"
+    for base, weight in ((name, _VENDOR_STRIPPED_WEIGHT), (date_stripped, _VENDOR_AND_DATE_STRIPPED_WEIGHT)):
+        first, _, rest = base.partition("-")
+        if rest and first.isalpha():
+            keys.append((rest, weight))
+
+    return keys
+
+
+class ModelResolver:
+    """
+    Deterministic fuzzy matcher over a provider's model catalog.
+    """
+
+    def __init__(self, models: List[str], aliases: Optional[Dict[str, str]] = None):
+        self.models = list(models)
+        self._available = set(self.models)
+        self._exact: Dict[str, str] = {}
+        self._keys: List[Tuple[str, float, str]] = []
+        self._token_index: Dict[str, Set[int]] = {}
+
+        for model in self.models:
+            for key, weight in _derived_keys(model):
+                index = len(self._keys)
+                self._keys.append((key, weight, model))
+                for token in _tokens(key):
+                    self._token_index.setdefault(token, set()).add(index)
+            self._exact.setdefault(normalize_model_name(model), model)
+
+        self._aliases = {
+            normalize_model_name(alias): target
+            for alias, target in (aliases or {}).items()
+            if target in self._available
+        }
+
+    def resolve(self, model: str) -> Tuple[Optional[str], float]:
+        """
+        Resolve a requested model name to a catalog model.
+
+        Reasoning-effort and thinking-budget suffixes (":high", ":4k") are kept
+        and re-attached to the resolved base model.
+
+        Args:
+            model: Requested model name
+
+        Returns:
+            Tuple of (resolved model or None, confidence between 0.0 and 1.0)
+        """
+        if model in self._available:
+            return model, 1.0
+
+        if ":" in model:
+            base, suffix = model.rsplit(":", 1)
+            if _SUFFIX_PATTERN.match(suffix):
+                resolved, confidence = self.resolve(base)
+                if resolved is None:
+                    return None, confidence
+                return f"{resolved}:{suffix}", confidence
+
+        query = normalize_model_name(model)
+        if not query:
+            return None, 0.0
+        if query in self._exact:
+            return self._exact[query], 1.0
+        if query in self._aliases:
+            return self._aliases[query], 1.0
+
+        # A dated name asks for one snapshot; never swap in another model for it
+        if _FULL_DATE_PATTERN.search(query):
+            return None, 0.0
+
+        return self._best_match(query)
+
+    def _best_match(self, query: str) -> Tuple[Optional[str], float]:
+        # Narrow the search to keys sharing a token, falling back to a full scan
+        candidates: Set[int] = set()
+        for token in _tokens(query):
+            candidates |= self._token_index.get(token, set())
+        if not candidates:
+            candidates = set(range(len(self._keys)))
+
+        best_by_model: Dict[str, float] = {}
+        for index in candidates:
+            key, weight, model = self._keys[index]
+            score = similarity(query, key) * weight
+            if score > best_by_model.get(model, 0.0):
+                best_by_model[model] = score
+
+        if not best_by_model:
+            return None, 0.0
+
+        # Highest score wins; ties prefer the shorter (undated) name, then the
+        # lexicographically greatest, i.e. the most recent release date
+        ranked = sorted(
+            best_by_model.items(),
+            key=lambda item: (item[1], -len(item[0]), item[0]),
+            reverse=True,
+        )
+        best_model, confidence = ranked[0]
+
+        # Dated releases of the same model are not competing answers
+        best_family = _DATE_PATTERN.sub("", normalize_model_name(best_model))
+        runners_up = [
+            score for model, score in ranked[1:]
+            if _DATE_PATTERN.sub("", normalize_model_name(model)) != best_family
+        ]
+        if runners_up and confidence < _VENDOR_AND_DATE_STRIPPED_WEIGHT:
+            if confidence - runners_up[0] < _AMBIGUITY_MARGIN:
+                confidence *= 0.9
+        return best_model, confidence
+
+
+_resolvers: Dict[str, Tuple[str, ModelResolver]] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_model_resolver(provider_name: str) -> ModelResolver:
+    """
+    Get the resolver for a provider, rebuilding it when the cached catalog changes.
+
+    A resolver built from a degraded catalog is not kept.
+
+    Args:
+        provider_name: Provider name (full name)
+
+    Returns:
+        ModelResolver built from the provider's current catalog
+    """
+    entry = get_model_catalog().get_entry(provider_name)
+    with _resolvers_lock:
+        cached = _resolvers.get(provider_name)
+        if cached is not None and cached[0] == entry.version:
+            return cached[1]
+
+    resolver = ModelResolver(entry.models, MODEL_ALIASES.get(provider_name))
+    if entry.degraded:
+        return resolver
+    with _resolvers_lock:
+        _resolvers[provider_name] = (entry.version, resolver)
+    return resolver
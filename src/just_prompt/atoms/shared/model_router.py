@@ -2,11 +2,23 @@
 Model router for dispatching requests to the appropriate provider.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import importlib
-from .utils import split_provider_and_model
+import threading
+from .utils import split_provider_and_model, split_fallback_chain, get_env_bool, get_env_float
 from .data_types import ModelProviders
+from .model_catalog import get_model_catalog
+from .model_resolver import get_model_resolver, DEFAULT_RESOLVER_THRESHOLD
+from .correction_memo import get_correction_memo
+from .response_cache import CACHE_USE, CACHE_BYPASS, get_response_cache, response_cache_key
+from .single_flight import get_single_flight
+from .rate_limiter import get_rate_limiter
+from .retry import get_retry_policy, retry_deadline
+from .hedging import get_hedger
+from .http_pool import request_cancelled
+from .circuit_breaker import CircuitOpenError, get_circuit_breakers
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +45,8 @@ class ModelRouter:
             return model_name
 
         try:
-            # Import the provider module
-            provider_module_name = f"just_prompt.atoms.llm_providers.{provider_name}"
-            provider_module = importlib.import_module(provider_module_name)
-
-            # Get available models
-            available_models = provider_module.list_models()
+            # Get available models from the shared catalog cache
+            available_models = get_model_catalog().get(provider_name)
 
             # Check if model is in available models
             if model_name in available_models:
@@ -70,16 +78,112 @@ class ModelRouter:
             return model_name
 
     @staticmethod
-    def route_prompt(model_string: str, text: str) -> str:
+    def route_prompt(
+        model_string: str,
+        text: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        cache_mode: str = CACHE_USE,
+        on_target: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
         Route a prompt to the appropriate provider.
 
+        A fallback chain ("provider:model|provider:model|...") is tried in order:
+        when a target fails, times out or is rate-limited, the next one is called
+        straight away. Targets before the last are not retried and do not queue
+        for rate-limit budget. Once streamed output has been delivered, a failure
+        is raised instead of falling back.
+
+        If a target's circuit breaker is open and a fallback is configured for it,
+        the prompt is rerouted to that fallback instead of failing.
+
+        Args:
+            model_string: String in format "provider:model", or a fallback chain
+            text: The prompt text
+            on_chunk: Optional callback receiving response text as it streams in.
+                      When given, the provider's streaming API is used.
+            cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+            on_target: Optional callback receiving the "provider:model" that answered
+
+        Returns:
+            Response from the model
+        """
+        targets = split_fallback_chain(model_string)
+        streamed = threading.Event()
+
+        def forward_chunk(chunk: str) -> None:
+            streamed.set()
+            on_chunk(chunk)
+
+        for index, target in enumerate(targets):
+            is_last = index == len(targets) - 1
+            try:
+                answered_by, response = ModelRouter._route_to_target(
+                    target, text, forward_chunk if on_chunk else None, cache_mode, fail_fast=not is_last
+                )
+            except Exception as e:
+                if is_last or streamed.is_set():
+                    raise
+                logger.warning(f"{target} failed, falling back to {targets[index + 1]}: {e}")
+                continue
+            if on_target is not None:
+                on_target(answered_by)
+            return response
+
+    @staticmethod
+    def _route_to_target(
+        model_string: str,
+        text: str,
+        on_chunk: Optional[Callable[[str], None]],
+        cache_mode: str,
+        fail_fast: bool = False,
+    ) -> Tuple[str, str]:
+        """
+        Route a prompt to one target, rerouting to its circuit breaker fallback while it is open.
+
         Args:
             model_string: String in format "provider:model"
             text: The prompt text
+            on_chunk: Optional callback receiving response text as it streams in
+            cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+            fail_fast: Skip retries and rate-limit queueing, for targets with a fallback
+
+        Returns:
+            Tuple of (model string that answered, response)
+        """
+        try:
+            return model_string, ModelRouter._route_to_model(model_string, text, on_chunk, cache_mode, fail_fast)
+        except CircuitOpenError as e:
+            fallback = get_circuit_breakers().fallback_for(e.provider_name, e.model)
+            if fallback is None:
+                raise
+            logger.warning(f"{e}; rerouting to {fallback}")
+            return fallback, ModelRouter._route_to_model(fallback, text, on_chunk, cache_mode, fail_fast)
+
+    @staticmethod
+    def _route_to_model(
+        model_string: str,
+        text: str,
+        on_chunk: Optional[Callable[[str], None]],
+        cache_mode: str,
+        fail_fast: bool = False,
+    ) -> str:
+        """
+        Route a prompt to one model, through the cache, coalescing, circuit breaker,
+        hedging, retry and rate-limiting layers.
+
+        Args:
+            model_string: String in format "provider:model"
+            text: The prompt text
+            on_chunk: Optional callback receiving response text as it streams in
+            cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+            fail_fast: Skip retries and rate-limit queueing
 
         Returns:
             Response from the model
+
+        Raises:
+            CircuitOpenError: If the provider's or model's circuit breaker is open
         """
         provider_prefix, model = split_provider_and_model(model_string)
         provider = ModelProviders.from_name(provider_prefix)
@@ -97,8 +201,49 @@ class ModelRouter:
             module_name = f"just_prompt.atoms.llm_providers.{provider.full_name}"
             provider_module = importlib.import_module(module_name)
 
-            # Call the prompt function
-            return provider_module.prompt(text, validated_model)
+            request_key = response_cache_key(provider.full_name, validated_model, text)
+            model_spec = f"{provider.full_name}:{validated_model}"
+
+            # Serve identical (model, prompt) requests from the response cache
+            response_cache = get_response_cache()
+            use_cache = response_cache.enabled and cache_mode != CACHE_BYPASS
+            if use_cache and cache_mode == CACHE_USE:
+                cached_response = response_cache.get(request_key)
+                if cached_response is not None:
+                    logger.info(f"Response cache hit for {model_spec}")
+                    if on_chunk is not None:
+                        on_chunk(cached_response)
+                    return cached_response
+
+            def call_upstream(stream_chunk: Optional[Callable[[str], None]]) -> str:
+                # Fail fast while the provider or model is known to be down
+                circuit_breakers = get_circuit_breakers()
+                circuit_breakers.before_call(provider.full_name, validated_model)
+                try:
+                    # Requests slower than usual may be hedged with a duplicate attempt
+                    response = get_hedger().run(
+                        model_spec,
+                        lambda attempt_chunk: ModelRouter._call_with_retries(
+                            provider.full_name, provider_module, text, validated_model, attempt_chunk, fail_fast
+                        ),
+                        stream_chunk,
+                    )
+                except Exception as e:
+                    # A request cancelled by its caller (e.g. a losing race) is no sign of trouble
+                    if request_cancelled():
+                        circuit_breakers.release(provider.full_name, validated_model)
+                    else:
+                        circuit_breakers.record(provider.full_name, validated_model, e)
+                    raise
+                circuit_breakers.record(provider.full_name, validated_model)
+                if use_cache:
+                    response_cache.put(request_key, response, model_spec)
+                return response
+
+            # Identical requests already in flight share one upstream call; fail-fast
+            # calls are kept apart so they never cut short a caller that would wait
+            flight_key = f"{request_key}:fail-fast" if fail_fast else request_key
+            return get_single_flight().run(flight_key, call_upstream, on_chunk)
         except ImportError as e:
             logger.error(f"Failed to import provider module: {e}")
             raise ValueError(f"Provider not available: {provider.full_name}")
@@ -106,6 +251,86 @@ class ModelRouter:
             logger.error(f"Error routing prompt to {provider.full_name}: {e}")
             raise
 
+    @staticmethod
+    def _call_with_retries(
+        provider_name: str,
+        provider_module: Any,
+        text: str,
+        model: str,
+        on_chunk: Optional[Callable[[str], None]],
+        fail_fast: bool = False,
+    ) -> str:
+        """
+        Call a provider within its rate limits, retrying transient failures.
+
+        Args:
+            provider_name: Provider name (full name)
+            provider_module: Provider module
+            text: The prompt text
+            model: Validated model name
+            on_chunk: Optional callback receiving response text as it streams in
+            fail_fast: Neither retry nor wait for rate-limit budget
+
+        Returns:
+            The complete response text
+        """
+        first_chunk = threading.Event()
+
+        def forward_chunk(chunk: str) -> None:
+            first_chunk.set()
+            on_chunk(chunk)
+
+        def call_provider() -> str:
+            # Call the prompt function, queueing for the provider's rate limits
+            return get_rate_limiter().call(
+                provider_name,
+                model,
+                text,
+                lambda: ModelRouter._call_provider(
+                    provider_module, text, model, forward_chunk if on_chunk else None
+                ),
+                max_wait=0 if fail_fast else None,
+            )
+
+        # Retry transient failures, but not once streamed output has been delivered
+        return get_retry_policy().call(
+            provider_name, call_provider, can_retry=lambda: not fail_fast and not first_chunk.is_set()
+        )
+
+    @staticmethod
+    def _call_provider(
+        provider_module: Any, text: str, model: str, on_chunk: Optional[Callable[[str], None]]
+    ) -> str:
+        """
+        Call a provider module, streaming through on_chunk when requested.
+
+        Args:
+            provider_module: Provider module
+            text: The prompt text
+            model: Validated model name
+            on_chunk: Optional callback receiving response text as it streams in
+
+        Returns:
+            The complete response text
+        """
+        # Called once the rate limiter lets the request through, which starts its retry deadline
+        with retry_deadline():
+            if on_chunk is None:
+                return provider_module.prompt(text, model)
+
+            chunks = []
+            stream = provider_module.stream_prompt(text, model)
+            try:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    on_chunk(chunk)
+            finally:
+                # Release the provider's response at once when on_chunk stops the stream
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+            return "".join(chunks)
+
     @staticmethod
     def route_list_models(provider_name: str) -> List[str]:
         """
@@ -127,8 +352,235 @@ class ModelRouter:
             module_name = f"just_prompt.atoms.llm_providers.{provider.full_name}"
             provider_module = importlib.import_module(module_name)
 
-            # Call the list_models function
-            return provider_module.list_models()
+            # A provider whose listing just failed is not asked again until the negative TTL ends
+            recent_failure = get_model_catalog().recent_failure(provider.full_name)
+            if recent_failure is not None:
+                return list(recent_failure.models)
+
+            # Call the list_models function and keep the catalog cache warm
+            try:
+                models = provider_module.list_models(fallback=False)
+            except Exception as e:
+                # Show the provider's known models, cached briefly as a degraded catalog
+                fallback_models = getattr(provider_module, "FALLBACK_MODELS", None)
+                if not fallback_models:
+                    raise
+                logger.warning(f"Error listing models for {provider.full_name}, showing its known models: {e}")
+                get_model_catalog().put_degraded(provider.full_name, fallback_models)
+                return list(fallback_models)
+            get_model_catalog().put(provider.full_name, models)
+            return models
+        except ImportError as e:
+            logger.error(f"Failed to import provider module: {e}")
+            raise ValueError(f"Provider not available: {provider.full_name}")
+        except Exception as e:
+            logger.error(f"Error listing models for {provider.full_name}: {e}")
+            raise
+
+    @staticmethod
+    async def aroute_prompt(
+        model_string: str,
+        text: str,
+        cache_mode: str = CACHE_USE,
+        on_target: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Route a prompt to the appropriate provider's native async client.
+
+        Fallback chains and circuit breaker fallbacks are handled as in route_prompt.
+
+        Args:
+            model_string: String in format "provider:model", or a fallback chain
+            text: The prompt text
+            cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+            on_target: Optional callback receiving the "provider:model" that answered
+
+        Returns:
+            Response from the model
+        """
+        targets = split_fallback_chain(model_string)
+        for index, target in enumerate(targets):
+            is_last = index == len(targets) - 1
+            try:
+                answered_by, response = await ModelRouter._aroute_to_target(
+                    target, text, cache_mode, fail_fast=not is_last
+                )
+            except Exception as e:
+                if is_last:
+                    raise
+                logger.warning(f"{target} failed, falling back to {targets[index + 1]}: {e}")
+                continue
+            if on_target is not None:
+                on_target(answered_by)
+            return response
+
+    @staticmethod
+    async def _aroute_to_target(
+        model_string: str, text: str, cache_mode: str, fail_fast: bool = False
+    ) -> Tuple[str, str]:
+        """
+        Async counterpart of _route_to_target.
+
+        Returns:
+            Tuple of (model string that answered, response)
+        """
+        try:
+            return model_string, await ModelRouter._aroute_to_model(model_string, text, cache_mode, fail_fast)
+        except CircuitOpenError as e:
+            fallback = get_circuit_breakers().fallback_for(e.provider_name, e.model)
+            if fallback is None:
+                raise
+            logger.warning(f"{e}; rerouting to {fallback}")
+            return fallback, await ModelRouter._aroute_to_model(fallback, text, cache_mode, fail_fast)
+
+    @staticmethod
+    async def _aroute_to_model(model_string: str, text: str, cache_mode: str, fail_fast: bool = False) -> str:
+        """
+        Async counterpart of _route_to_model, through the same cache, coalescing,
+        circuit breaker, hedging, retry and rate-limiting layers.
+
+        Identical sync and async requests in flight share one upstream call.
+
+        Args:
+            model_string: String in format "provider:model"
+            text: The prompt text
+            cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+            fail_fast: Skip retries and rate-limit queueing
+
+        Returns:
+            Response from the model
+
+        Raises:
+            CircuitOpenError: If the provider's or model's circuit breaker is open
+        """
+        provider_prefix, model = split_provider_and_model(model_string)
+        provider = ModelProviders.from_name(provider_prefix)
+
+        if not provider:
+            raise ValueError(f"Unknown provider prefix: {provider_prefix}")
+
+        # Catalog lookups and corrections are synchronous - keep them off the event loop
+        validated_model = await asyncio.to_thread(
+            ModelRouter.validate_and_correct_model, provider.full_name, model
+        )
+
+        try:
+            module_name = f"just_prompt.atoms.llm_providers.{provider.full_name}"
+            provider_module = importlib.import_module(module_name)
+
+            request_key = response_cache_key(provider.full_name, validated_model, text)
+            model_spec = f"{provider.full_name}:{validated_model}"
+
+            # The cache's disk tier is synchronous - keep it off the event loop
+            response_cache = get_response_cache()
+            use_cache = response_cache.enabled and cache_mode != CACHE_BYPASS
+            if use_cache and cache_mode == CACHE_USE:
+                cached_response = await asyncio.to_thread(response_cache.get, request_key)
+                if cached_response is not None:
+                    logger.info(f"Response cache hit for {model_spec}")
+                    return cached_response
+
+            async def call_upstream() -> str:
+                circuit_breakers = get_circuit_breakers()
+                circuit_breakers.before_call(provider.full_name, validated_model)
+                try:
+                    response = await get_hedger().arun(
+                        model_spec,
+                        lambda: ModelRouter._acall_with_retries(
+                            provider.full_name, provider_module, text, validated_model, fail_fast
+                        ),
+                    )
+                except asyncio.CancelledError:
+                    # The caller gave up on the request; that says nothing about the provider
+                    circuit_breakers.release(provider.full_name, validated_model)
+                    raise
+                except Exception as e:
+                    if request_cancelled():
+                        circuit_breakers.release(provider.full_name, validated_model)
+                    else:
+                        circuit_breakers.record(provider.full_name, validated_model, e)
+                    raise
+                circuit_breakers.record(provider.full_name, validated_model)
+                if use_cache:
+                    await asyncio.to_thread(response_cache.put, request_key, response, model_spec)
+                return response
+
+            flight_key = f"{request_key}:fail-fast" if fail_fast else request_key
+            return await get_single_flight().arun(flight_key, call_upstream)
+        except ImportError as e:
+            logger.error(f"Failed to import provider module: {e}")
+            raise ValueError(f"Provider not available: {provider.full_name}")
+        except Exception as e:
+            logger.error(f"Error routing async prompt to {provider.full_name}: {e}")
+            raise
+
+    @staticmethod
+    async def _acall_with_retries(
+        provider_name: str, provider_module: Any, text: str, model: str, fail_fast: bool = False
+    ) -> str:
+        """
+        Async counterpart of _call_with_retries.
+
+        Args:
+            provider_name: Provider name (full name)
+            provider_module: Provider module
+            text: The prompt text
+            model: Validated model name
+            fail_fast: Neither retry nor wait for rate-limit budget
+
+        Returns:
+            The response text
+        """
+        async def call_provider() -> str:
+            # Called once the rate limiter lets the request through, which starts its retry deadline
+            with retry_deadline():
+                return await provider_module.aprompt(text, model)
+
+        return await get_retry_policy().acall(
+            provider_name,
+            lambda: get_rate_limiter().acall(
+                provider_name, model, text, call_provider, max_wait=0 if fail_fast else None
+            ),
+            can_retry=lambda: not fail_fast,
+        )
+
+    @staticmethod
+    async def aroute_list_models(provider_name: str) -> List[str]:
+        """
+        Route a list_models request to the appropriate provider's native async client.
+
+        Failures are handled as in route_list_models.
+
+        Args:
+            provider_name: Provider name (full or short)
+
+        Returns:
+            List of model names
+        """
+        provider = ModelProviders.from_name(provider_name)
+
+        if not provider:
+            raise ValueError(f"Unknown provider: {provider_name}")
+
+        try:
+            module_name = f"just_prompt.atoms.llm_providers.{provider.full_name}"
+            provider_module = importlib.import_module(module_name)
+
+            recent_failure = get_model_catalog().recent_failure(provider.full_name)
+            if recent_failure is not None:
+                return list(recent_failure.models)
+
+            try:
+                models = await provider_module.alist_models(fallback=False)
+            except Exception as e:
+                fallback_models = getattr(provider_module, "FALLBACK_MODELS", None)
+                if not fallback_models:
+                    raise
+                logger.warning(f"Error listing models for {provider.full_name}, showing its known models: {e}")
+                get_model_catalog().put_degraded(provider.full_name, fallback_models)
+                return list(fallback_models)
+            get_model_catalog().put(provider.full_name, models)
+            return models
         except ImportError as e:
             logger.error(f"Failed to import provider module: {e}")
             raise ValueError(f"Provider not available: {provider.full_name}")
@@ -139,7 +591,13 @@ class ModelRouter:
     @staticmethod
     def magic_model_correction(provider: str, model: str, correction_model: str) -> str:
         """
-        Correct a model name using a correction AI model if needed.
+        Correct a model name if needed.
+
+        Corrections are memoized per provider catalog version, so repeated
+        requests for the same name skip correction entirely. Otherwise the local
+        fuzzy resolver is tried first. The correction AI model is only used when
+        LLM_MODEL_CORRECTION is enabled and the local match is below
+        MODEL_RESOLVER_THRESHOLD.
 
         Args:
             provider: Provider name
@@ -149,59 +607,103 @@ class ModelRouter:
         Returns:
             Corrected model name
         """
-        provider_module_name = f"just_prompt.atoms.llm_providers.{provider}"
-
         try:
-            provider_module = importlib.import_module(provider_module_name)
-            available_models = provider_module.list_models()
+            catalog_entry = get_model_catalog().get_entry(provider)
 
             # If model is already in available models, no correction needed
-            if model in available_models:
+            if model in catalog_entry.models:
                 logger.info(f"Using {provider} and {model}")
                 return model
 
-            # Model needs correction - use correction model to correct it
-            correction_provider, correction_model_name = split_provider_and_model(
-                correction_model
+            memo = get_correction_memo()
+            memoized_model = memo.get(provider, model, catalog_entry.version)
+            if memoized_model is not None:
+                logger.info(f"Using memoized correction '{model}' -> '{memoized_model}' for provider '{provider}'")
+                return memoized_model
+
+            corrected_model = ModelRouter._correct_model(
+                provider, model, correction_model, catalog_entry.models
             )
-            correction_provider_enum = ModelProviders.from_name(correction_provider)
+            # Corrections against a degraded catalog are not remembered
+            if not catalog_entry.degraded:
+                memo.put(provider, model, catalog_entry.version, corrected_model)
+            return corrected_model
 
-            if not correction_provider_enum:
-                logger.warning(
-                    f"Invalid correction model provider: {correction_provider}, skipping correction"
-                )
-                return model
+        except Exception as e:
+            logger.error(f"Error in model correction: {e}")
+            return model
+
+    @staticmethod
+    def _correct_model(
+        provider: str, model: str, correction_model: str, available_models: List[str]
+    ) -> str:
+        """
+        Correct a model name that is not in the provider's catalog.
+
+        Args:
+            provider: Provider name
+            model: Original model name
+            correction_model: Model to use for the correction llm prompt
+            available_models: The provider's available models
+
+        Returns:
+            Corrected model name, or the original name if no correction was found
+        """
+        # Try the local resolver first - no network or LLM call needed
+        resolved_model, confidence = get_model_resolver(provider).resolve(model)
+        threshold = get_env_float("MODEL_RESOLVER_THRESHOLD", DEFAULT_RESOLVER_THRESHOLD)
+        if resolved_model is not None and confidence >= threshold:
+            logger.info(
+                f"Resolved model '{model}' to '{resolved_model}' for provider '{provider}' (confidence {confidence:.2f})"
+            )
+            return resolved_model
 
-            correction_module_name = (
-                f"just_prompt.atoms.llm_providers.{correction_provider_enum.full_name}"
+        # LLM correction is an opt-in fallback for low-confidence matches
+        if not get_env_bool("LLM_MODEL_CORRECTION", False):
+            logger.warning(
+                f"Could not confidently resolve model '{model}' for provider '{provider}' "
+                f"(best match: {resolved_model}, confidence {confidence:.2f})"
             )
-            correction_module = importlib.import_module(correction_module_name)
+            return model
+
+        # Model needs correction - use correction model to correct it
+        correction_provider, correction_model_name = split_provider_and_model(
+            correction_model
+        )
+        correction_provider_enum = ModelProviders.from_name(correction_provider)
+
+        if not correction_provider_enum:
+            logger.warning(
+                f"Invalid correction model provider: {correction_provider}, skipping correction"
+            )
+            return model
 
-            # Build prompt for the correction model
-            prompt = f"""
+        correction_module_name = (
+            f"just_prompt.atoms.llm_providers.{correction_provider_enum.full_name}"
+        )
+        correction_module = importlib.import_module(correction_module_name)
+
+        # Build prompt for the correction model
+        prompt = f"""
 Given a user-provided model name "{model}" for the provider "{provider}", and the list of actual available models below,
 return the closest matching model name from the available models list.
 Only return the exact model name, nothing else.
 
 Available models: {', '.join(available_models)}
 """
-            # Get correction from correction model
-            corrected_model = correction_module.prompt(
-                prompt, correction_model_name
-            ).strip()
-
-            # Verify the corrected model exists in the available models
-            if corrected_model in available_models:
-                logger.info(f"correction_model: {correction_model}")
-                logger.info(f"models_prefixed_by_provider: {provider}:{model}")
-                logger.info(f"corrected_model: {corrected_model}")
-                return corrected_model
-            else:
-                logger.warning(
-                    f"Corrected model {corrected_model} not found in available models"
-                )
-                return model
-
-        except Exception as e:
-            logger.error(f"Error in model correction: {e}")
+        # Get correction from correction model
+        corrected_model = correction_module.prompt(
+            prompt, correction_model_name
+        ).strip()
+
+        # Verify the corrected model exists in the available models
+        if corrected_model in available_models:
+            logger.info(f"correction_model: {correction_model}")
+            logger.info(f"models_prefixed_by_provider: {provider}:{model}")
+            logger.info(f"corrected_model: {corrected_model}")
+            return corrected_model
+        else:
+            logger.warning(
+                f"Corrected model {corrected_model} not found in available models"
+            )
             return model
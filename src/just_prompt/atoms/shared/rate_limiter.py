@@ -0,0 +1,677 @@
+"""
+Per-provider rate limiting for just-prompt.
+
+Each provider (and optionally each model) gets a request bucket and a token
+bucket. Requests wait in line for budget instead of being sent and failing
+with a 429. Provider responses keep the buckets honest: rate-limit headers
+(remaining budget and reset times) and Retry-After on 429s pause the bucket,
+and requests rejected with a 429 are queued again rather than returned as
+errors. Providers that report budgets per model have their headers applied
+to that model's buckets only, so one exhausted model does not pause the rest.
+"""
+
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+from .data_types import ModelProviders
+from .utils import get_env_bool, get_env_float, iter_error_chain
+
+logger = logging.getLogger(__name__)
+
+# Longest a single request may spend queued for rate-limit budget, in seconds
+DEFAULT_RATE_LIMIT_MAX_WAIT = 120.0
+
+# Pause after a 429 that carries no Retry-After or reset header, doubled per retry
+DEFAULT_RATE_LIMIT_BACKOFF = 1.0
+
+# Longest single pause taken after a 429 without headers
+MAX_RATE_LIMIT_BACKOFF = 30.0
+
+# Rough characters-per-token ratio used to estimate token usage
+CHARS_PER_TOKEN = 4
+
+# Header names for remaining budget and reset times, per budget kind
+_REMAINING_HEADERS = {
+    "requests": ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+    "tokens": ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining"),
+}
+_RESET_HEADERS = {
+    "requests": ("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset"),
+    "tokens": ("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset"),
+}
+
+# Providers whose rate-limit headers describe the budget of the model called,
+# not of the whole account
+PER_MODEL_HEADER_PROVIDERS = frozenset({"openai", "anthropic"})
+
+# Model name in request URLs such as ".../models/gemini-2.5-pro:generateContent"
+_URL_MODEL = re.compile(r"/models/([^/:]+)")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Prompt or response text
+
+    Returns:
+        Approximate token count (at least 1)
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """
+    Parse per-minute rate limits for providers and models.
+
+    Args:
+        value: Comma-separated "provider=limit" or "provider:model=limit" pairs,
+               e.g. "groq=30,openai=500,groq:llama-3.3-70b-versatile=10"
+
+    Returns:
+        Dictionary mapping "provider" or "provider:model" keys (full provider names) to limits
+    """
+    limits = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, limit = item.rpartition("=")
+        provider_prefix, _, model = name.strip().partition(":")
+        provider = ModelProviders.from_name(provider_prefix)
+        try:
+            limit_value = float(limit)
+        except ValueError:
+            limit_value = 0
+        if provider is None or limit_value <= 0:
+            logger.warning(f"Ignoring invalid rate limit: {item.strip()}")
+            continue
+        key = f"{provider.full_name}:{model}" if model else provider.full_name
+        limits[key] = limit_value
+    return limits
+
+
+def parse_reset(value: str, now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a rate-limit reset header into seconds from now.
+
+    Accepts plain seconds ("20"), Go-style durations ("6m0s", "250ms") and
+    RFC 3339 timestamps ("2025-05-01T12:00:00Z").
+
+    Args:
+        value: Header value
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Seconds until the budget resets, or None if the value cannot be parsed
+    """
+    value = value.strip()
+    now = time.time() if now is None else now
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(number) * scale[unit] for number, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, reset_at.timestamp() - now)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Read the Retry-After delay from response headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Seconds to wait, or None if no Retry-After header is present
+    """
+    now = time.time() if now is None else now
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+def request_model(request: Any) -> Optional[str]:
+    """
+    Find the model a provider HTTP request was made for.
+
+    Looks at the "model" field of a JSON request body first, then at the URL.
+
+    Args:
+        request: httpx request
+
+    Returns:
+        The model name, or None if it cannot be told
+    """
+    try:
+        body = json.loads(request.content or b"{}")
+        if isinstance(body, dict) and isinstance(body.get("model"), str):
+            return body["model"]
+    except Exception:
+        # Streamed or non-JSON bodies carry no readable model
+        pass
+    match = _URL_MODEL.search(str(getattr(request, "url", "")))
+    return match.group(1) if match else None
+
+
+def rate_limit_details(error: BaseException) -> Optional[Mapping[str, str]]:
+    """
+    Recognize a provider rate-limit error.
+
+    Works with the OpenAI, Anthropic, Groq and DeepSeek SDK errors (status_code
+    and response), google-genai errors (code and response) and Ollama errors,
+    including when a provider module has wrapped them in another exception.
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        The response headers (possibly empty) if the error is a 429, otherwise None
+    """
+    for cause in iter_error_chain(error):
+        if error_status_code(cause) == 429:
+            headers = getattr(getattr(cause, "response", None), "headers", None)
+            return headers if headers is not None else {}
+    return None
+
+
+def error_status_code(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code carried by a provider SDK error.
+
+    Args:
+        error: Exception raised by a provider SDK
+
+    Returns:
+        The status code, or None if the error has none
+    """
+    for name in ("status_code", "code"):
+        status = getattr(error, name, None)
+        if isinstance(status, int) and status > 0:
+            return status
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+class TokenBucket:
+    """
+    A refilling budget of requests or tokens per minute.
+
+    Without a configured rate the bucket never limits on its own, but it can
+    still be paused by Retry-After and reset headers.
+    """
+
+    def __init__(self, per_minute: Optional[float] = None):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Get how long to wait before amount can be taken from the bucket.
+        """
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.per_minute is not None:
+            # Requests bigger than the whole bucket go through once it is full
+            needed = min(amount, self.capacity) - self.level
+            if needed > 0:
+                wait = max(wait, needed * 60.0 / self.per_minute)
+        return wait
+
+    def available(self, now: float) -> Optional[float]:
+        """
+        Get the current budget, or None if the bucket has no configured rate.
+        """
+        self._refill(now)
+        return self.level
+
+    def take(self, amount: float, now: float) -> None:
+        """
+        Take amount from the bucket; the level may go negative to record debt.
+        """
+        self._refill(now)
+        if self.per_minute is not None:
+            self.level -= amount
+
+    def pause(self, seconds: float, now: float) -> None:
+        """
+        Block the bucket for the given number of seconds.
+        """
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def sync(self, remaining: Optional[float], reset: Optional[float], now: float) -> None:
+        """
+        Align the bucket with the budget reported by the provider.
+        """
+        self._refill(now)
+        if remaining is None:
+            return
+        if self.per_minute is not None and remaining < self.level:
+            self.level = remaining
+        if remaining <= 0 and reset is not None:
+            self.pause(reset, now)
+
+    def _refill(self, now: float) -> None:
+        if self.per_minute is not None:
+            elapsed = max(0.0, now - self.updated)
+            self.level = min(self.capacity, self.level + elapsed * self.per_minute / 60.0)
+        self.updated = now
+
+
+class _LimitState:
+    """
+    Request and token buckets for one provider or model, with counters.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.buckets = {"requests": TokenBucket(requests_per_minute), "tokens": TokenBucket(tokens_per_minute)}
+        self.queued = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.rate_limited = 0
+
+
+class RateLimiter:
+    """
+    Queues provider requests so they stay within request and token budgets.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        requests_per_minute: Optional[Dict[str, float]] = None,
+        tokens_per_minute: Optional[Dict[str, float]] = None,
+        max_wait: float = DEFAULT_RATE_LIMIT_MAX_WAIT,
+    ):
+        self.enabled = enabled
+        self.requests_per_minute = requests_per_minute or {}
+        self.tokens_per_minute = tokens_per_minute or {}
+        self.max_wait = max_wait
+        self._states: Dict[str, _LimitState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, provider_name: str, model: str, tokens: int, max_wait: Optional[float] = None) -> float:
+        """
+        Wait until a request of the given size fits the budget, then reserve it.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Model name
+            tokens: Estimated tokens the request will use
+            max_wait: Longest wait for this request, overriding the limiter's max_wait
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            ValueError: If the request would have to wait longer than max_wait
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(provider_name, model, tokens, waited, max_wait)
+            if wait == 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, provider_name: str, model: str, tokens: int, max_wait: Optional[float] = None) -> float:
+        """
+        Async variant of acquire that waits without blocking the event loop.
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(provider_name, model, tokens, waited, max_wait)
+            if wait == 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def has_budget(self, provider_name: str, model: str, tokens: int = 1) -> bool:
+        """
+        Check whether a request could be sent now without waiting, without reserving budget.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Model name
+            tokens: Estimated tokens the request would use
+
+        Returns:
+            True if no bucket of the provider or model would make the request wait
+        """
+        if not self.enabled:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            return all(
+                state.buckets["requests"].wait_time(1, now) == 0 and state.buckets["tokens"].wait_time(tokens, now) == 0
+                for state in self._states_for(provider_name, model)
+            )
+
+    def record_usage(self, provider_name: str, model: str, tokens: int) -> None:
+        """
+        Charge tokens used beyond the reservation made by acquire (e.g. the response).
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Model name
+            tokens: Additional tokens used
+        """
+        if not self.enabled or tokens <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for state in self._states_for(provider_name, model):
+                state.buckets["tokens"].take(tokens, now)
+
+    def observe_headers(self, provider_name: str, headers: Mapping[str, str], model: Optional[str] = None) -> None:
+        """
+        Update the buckets from a provider response's rate-limit headers.
+
+        Headers of providers in PER_MODEL_HEADER_PROVIDERS only update the
+        model's own buckets when the model is known.
+
+        Args:
+            provider_name: Provider name (full name)
+            headers: Response headers (case-insensitive mapping)
+            model: Model the response belongs to, if known
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        retry_after = parse_retry_after(headers)
+        with self._lock:
+            if model and provider_name in PER_MODEL_HEADER_PROVIDERS:
+                states = [self._state(f"{provider_name}:{model}")]
+            elif model:
+                states = self._states_for(provider_name, model)
+            else:
+                states = [self._state(provider_name)]
+            for kind in ("requests", "tokens"):
+                remaining = self._header_number(headers, _REMAINING_HEADERS[kind])
+                reset_value = next((headers.get(name) for name in _RESET_HEADERS[kind] if headers.get(name)), None)
+                reset = parse_reset(reset_value) if reset_value else None
+                for state in states:
+                    state.buckets[kind].sync(remaining, reset, now)
+            if retry_after:
+                for state in states:
+                    state.buckets["requests"].pause(retry_after, now)
+
+    def call(
+        self,
+        provider_name: str,
+        model: str,
+        text: str,
+        fn: Callable[[], str],
+        max_wait: Optional[float] = None,
+    ) -> str:
+        """
+        Run a provider call within the rate limits.
+
+        The call waits for budget first. If the provider still answers with a
+        429, the bucket is paused for the advertised time and the call is
+        queued again, up to max_wait in total.
+
+        Args:
+            provider_name: Provider name (full name)
+            model: Model name
+            text: Prompt text, used to estimate token usage
+            fn: Performs the provider call
+            max_wait: Longest total wait for this call, overriding the limiter's
+                      max_wait (0 fails at once instead of queueing)
+
+        Returns:
+            The provider response
+        """
+        if not self.enabled:
+            return fn()
+
+        if max_wait is None:
+            max_wait = self.max_wait
+
+        tokens = estimate_tokens(text)
+        waited = 0.0
+        backoff = DEFAULT_RATE_LIMIT_BACKOFF
+        while True:
+            waited += self.acquire(provider_name, model, tokens, max_wait)
+            try:
+                response = fn()
+            except Exception as e:
+                delay = self._handle_rate_limit(provider_name, model, e, backoff)
+                if delay is None or waited + delay > max_wait:
+                    raise
+                logger.warning(f"Rate limited by {provider_name}:{model}, queueing again in {delay:.1f}s")
+                backoff = min(backoff * 2, MAX_RATE_LIMIT_BACKOFF)
+                continue
+            self.record_usage(provider_name, model, estimate_tokens(response))
+            return response
+
+    async def acall(
+        self,
+        provider_name: str,
+        model: str,
+        text: str,
+        fn: Callable[[], Awaitable[str]],
+        max_wait: Optional[float] = None,
+    ) -> str:
+        """
+        Async variant of call; fn returns an awaitable provider call.
+        """
+        if not self.enabled:
+            return await fn()
+
+        if max_wait is None:
+            max_wait = self.max_wait
+
+        tokens = estimate_tokens(text)
+        waited = 0.0
+        backoff = DEFAULT_RATE_LIMIT_BACKOFF
+        while True:
+            waited += await self.aacquire(provider_name, model, tokens, max_wait)
+            try:
+                response = await fn()
+            except Exception as e:
+                delay = self._handle_rate_limit(provider_name, model, e, backoff)
+                if delay is None or waited + delay > max_wait:
+                    raise
+                logger.warning(f"Rate limited by {provider_name}:{model}, queueing again in {delay:.1f}s")
+                backoff = min(backoff * 2, MAX_RATE_LIMIT_BACKOFF)
+                continue
+            self.record_usage(provider_name, model, estimate_tokens(response))
+            return response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get limiter counters.
+
+        Returns:
+            Dictionary mapping provider or "provider:model" keys to queued requests,
+            waits, total seconds waited, 429s seen and current bucket levels
+        """
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for key, state in self._states.items():
+                entry = {
+                    "queued": state.queued,
+                    "waits": state.waits,
+                    "wait_seconds": round(state.wait_seconds, 3),
+                    "rate_limited": state.rate_limited,
+                }
+                for kind, bucket in state.buckets.items():
+                    available = bucket.available(now)
+                    entry[f"{kind}_available"] = None if available is None else int(available)
+                result[key] = entry
+            return result
+
+    def _reserve(
+        self, provider_name: str, model: str, tokens: int, waited: float, max_wait: Optional[float] = None
+    ) -> float:
+        # Take budget from every applicable bucket at once, or report how long to wait
+        if not self.enabled:
+            return 0.0
+        if max_wait is None:
+            max_wait = self.max_wait
+        now = time.monotonic()
+        with self._lock:
+            states = self._states_for(provider_name, model)
+            wait = max(
+                max(state.buckets["requests"].wait_time(1, now), state.buckets["tokens"].wait_time(tokens, now))
+                for state in states
+            )
+            if wait == 0:
+                for state in states:
+                    state.buckets["requests"].take(1, now)
+                    state.buckets["tokens"].take(tokens, now)
+                    if waited:
+                        state.queued -= 1
+                return 0.0
+
+            if waited + wait > max_wait:
+                for state in states:
+                    if waited:
+                        state.queued -= 1
+                raise ValueError(
+                    f"Rate limit for {provider_name}:{model} would delay the request by more than {max_wait:.0f}s"
+                )
+            for state in states:
+                if not waited:
+                    state.queued += 1
+                state.waits += 1
+                state.wait_seconds += wait
+            return wait
+
+    def _handle_rate_limit(self, provider_name: str, model: str, error: BaseException, backoff: float) -> Optional[float]:
+        # Pause the buckets for as long as the provider asked, or back off if it did not say
+        headers = rate_limit_details(error)
+        if headers is None:
+            return None
+        self.observe_headers(provider_name, headers, model)
+        delay = parse_retry_after(headers)
+        now = time.monotonic()
+        with self._lock:
+            for state in self._states_for(provider_name, model):
+                state.rate_limited += 1
+                if delay is None:
+                    state.buckets["requests"].pause(backoff, now)
+        return backoff if delay is None else delay
+
+    def _states_for(self, provider_name: str, model: Optional[str]) -> List[_LimitState]:
+        states = [self._state(provider_name)]
+        model_key = f"{provider_name}:{model}"
+        if model and (
+            model_key in self.requests_per_minute
+            or model_key in self.tokens_per_minute
+            or provider_name in PER_MODEL_HEADER_PROVIDERS
+        ):
+            states.append(self._state(model_key))
+        return states
+
+    def _state(self, key: str) -> _LimitState:
+        state = self._states.get(key)
+        if state is None:
+            state = _LimitState(self.requests_per_minute.get(key), self.tokens_per_minute.get(key))
+            self._states[key] = state
+        return state
+
+    @staticmethod
+    def _header_number(headers: Mapping[str, str], names: Tuple[str, ...]) -> Optional[float]:
+        for name in names:
+            value = headers.get(name)
+            if value:
+                try:
+                    return float(value)
+                except ValueError:
+                    continue
+        return None
+
+
+def rate_limit_event_hooks(provider_name: str, asynchronous: bool = False) -> Dict[str, List[Callable]]:
+    """
+    Build httpx event hooks that feed a provider's rate-limit headers to the limiter.
+
+    The model is taken from each request, so per-model budgets land on the
+    right buckets.
+
+    Args:
+        provider_name: Provider name (full name)
+        asynchronous: Build hooks for an httpx.AsyncClient
+
+    Returns:
+        Event hooks for the provider SDK's HTTP client
+    """
+    def observe(response: Any) -> None:
+        model = request_model(response.request)
+        get_rate_limiter().observe_headers(provider_name, response.headers, model)
+
+    async def aobserve(response: Any) -> None:
+        observe(response)
+
+    return {"response": [aobserve if asynchronous else observe]}
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter, creating it from the environment on first use.
+
+    Environment variables:
+        RATE_LIMIT: Enable rate limiting and 429 queueing (default true)
+        RATE_LIMIT_RPM: Requests per minute, e.g. "groq=30,openai:o3=50" (default unlimited)
+        RATE_LIMIT_TPM: Tokens per minute, same format (default unlimited)
+        RATE_LIMIT_MAX_WAIT: Longest a request may wait for budget, in seconds (default 120)
+
+    Returns:
+        The shared RateLimiter
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                enabled=get_env_bool("RATE_LIMIT", True),
+                requests_per_minute=parse_rate_limits(os.environ.get("RATE_LIMIT_RPM", "")),
+                tokens_per_minute=parse_rate_limits(os.environ.get("RATE_LIMIT_TPM", "")),
+                max_wait=get_env_float("RATE_LIMIT_MAX_WAIT", DEFAULT_RATE_LIMIT_MAX_WAIT),
+            )
+        return _rate_limiter
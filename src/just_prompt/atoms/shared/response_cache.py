@@ -0,0 +1,304 @@
+"""
+Content-addressed response cache for just-prompt.
+
+Responses are keyed by a hash of the normalized model spec (provider, model and
+any reasoning or thinking suffix) and the prompt text. A small in-memory LRU
+sits in front of an SQLite store in the cache directory, so repeated prompts
+return without calling the provider, even across server restarts.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from .utils import get_cache_dir, get_env_bool, get_env_float, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Per-call cache modes
+CACHE_USE = "use"          # Serve cached responses and store new ones
+CACHE_REFRESH = "refresh"  # Ignore cached responses but store the new one
+CACHE_BYPASS = "bypass"    # Neither read nor write the cache
+
+# Seconds a cached response stays valid
+DEFAULT_RESPONSE_CACHE_TTL = 86400.0
+
+# Maximum number of responses held in the in-memory tier
+DEFAULT_RESPONSE_CACHE_MEMORY_ENTRIES = 256
+
+# Maximum size of the on-disk tier in megabytes
+DEFAULT_RESPONSE_CACHE_DISK_MB = 100.0
+
+# File name of the on-disk tier inside the cache directory
+RESPONSE_CACHE_FILE_NAME = "responses.sqlite3"
+
+# Bump to invalidate every existing key when the key layout changes
+_KEY_VERSION = 1
+
+
+def cache_mode_from_flags(bypass_cache: bool = False, refresh_cache: bool = False) -> str:
+    """
+    Convert the tool-level cache flags into a cache mode.
+
+    Args:
+        bypass_cache: Skip the cache entirely
+        refresh_cache: Ignore cached responses but store the new one
+
+    Returns:
+        One of CACHE_USE, CACHE_REFRESH or CACHE_BYPASS
+    """
+    if bypass_cache:
+        return CACHE_BYPASS
+    if refresh_cache:
+        return CACHE_REFRESH
+    return CACHE_USE
+
+
+def response_cache_key(provider_name: str, model: str, text: str) -> str:
+    """
+    Compute the cache key for a prompt.
+
+    Args:
+        provider_name: Provider name (full name)
+        model: Validated model name, including any reasoning or thinking suffix
+        text: The prompt text
+
+    Returns:
+        Hex digest identifying the (model, prompt) pair
+    """
+    model_spec = f"{provider_name.lower()}:{model.strip()}"
+    normalized_text = text.replace("\r\n", "\n")
+    payload = json.dumps([_KEY_VERSION, model_spec, normalized_text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) response cache with TTL and size-based eviction.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl: float = DEFAULT_RESPONSE_CACHE_TTL,
+        memory_entries: int = DEFAULT_RESPONSE_CACHE_MEMORY_ENTRIES,
+        disk_path: Optional[Path] = None,
+        max_disk_bytes: int = int(DEFAULT_RESPONSE_CACHE_DISK_MB * 1024 * 1024),
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.memory_entries = max(0, memory_entries)
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        if self.enabled and self.disk_path is not None:
+            try:
+                self._open_db()
+            except Exception as e:
+                logger.warning(f"Response cache disk tier unavailable at {self.disk_path}: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from response_cache_key
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._memory[key]
+
+        response, created_at = self._disk_get(key, now)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._memory_put(key, response, created_at)
+        return response
+
+    def put(self, key: str, response: str, model_spec: str = "") -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key from response_cache_key
+            response: Response text
+            model_spec: Model the response came from, stored for inspection only
+        """
+        if not self.enabled or response is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, response, now)
+        self._disk_put(key, response, model_spec, now)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, in-memory size and on-disk entry count
+        """
+        disk_entries = 0
+        if self._db is not None:
+            with self._db_lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def clear(self) -> None:
+        """
+        Drop every cached response and reset the counters.
+        """
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _memory_put(self, key: str, response: str, created_at: float) -> None:
+        if self.memory_entries == 0:
+            return
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _open_db(self) -> None:
+        self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.disk_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._db.commit()
+
+    def _disk_get(self, key: str, now: float) -> Tuple[Optional[str], float]:
+        if self._db is None:
+            return None, 0.0
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None, 0.0
+                response, created_at = row
+                if now - created_at > self.ttl:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    return None, 0.0
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                return response, created_at
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading response cache: {e}")
+            return None, 0.0
+
+    def _disk_put(self, key: str, response: str, model_spec: str, now: float) -> None:
+        if self._db is None:
+            return
+        size = len(response.encode("utf-8"))
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_spec, response, size, now, now),
+                )
+                self._evict(now)
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing response cache: {e}")
+
+    def _evict(self, now: float) -> None:
+        # Expired entries first, then least recently used until under the size cap
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cached responses")
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide response cache, creating it from the environment on first use.
+
+    Environment variables:
+        RESPONSE_CACHE: Enable the response cache (default false)
+        RESPONSE_CACHE_TTL: Seconds a cached response stays valid (default 86400)
+        RESPONSE_CACHE_MEMORY_ENTRIES: Responses held in memory (default 256)
+        RESPONSE_CACHE_DISK_MB: Size cap of the on-disk tier, 0 disables it (default 100)
+
+    Returns:
+        The shared ResponseCache
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            disk_mb = get_env_float("RESPONSE_CACHE_DISK_MB", DEFAULT_RESPONSE_CACHE_DISK_MB)
+            _response_cache = ResponseCache(
+                enabled=get_env_bool("RESPONSE_CACHE", False),
+                ttl=get_env_float("RESPONSE_CACHE_TTL", DEFAULT_RESPONSE_CACHE_TTL),
+                memory_entries=get_env_int("RESPONSE_CACHE_MEMORY_ENTRIES", DEFAULT_RESPONSE_CACHE_MEMORY_ENTRIES),
+                disk_path=get_cache_dir() / RESPONSE_CACHE_FILE_NAME if disk_mb > 0 else None,
+                max_disk_bytes=int(disk_mb * 1024 * 1024),
+            )
+        return _response_cache
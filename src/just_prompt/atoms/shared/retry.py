@@ -0,0 +1,319 @@
+"""
+Central retry policy for provider calls.
+
+Transient failures (connection resets, timeouts, 5xx and overload responses)
+are retried with exponential backoff and full jitter, bounded by an attempt
+count and, when RETRY_DEADLINE is set, a total deadline per request. The
+deadline clock starts once the rate limiter lets the first attempt through,
+so time spent queueing for budget does not count. Provider calls made inside
+retry_deadline() get the time left as a cap on their HTTP timeouts; for a
+streamed response the cap applies to each read, so a stream that keeps
+sending data can run past the deadline. Client errors such as bad requests,
+auth failures and unknown models fail immediately. Rate limits (429) are left
+to the rate limiter, which queues them.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+import anthropic
+import groq
+import httpx
+import openai
+from .http_pool import request_cancelled, request_deadline
+from .rate_limiter import error_status_code
+from .utils import get_env_float, get_env_int, iter_error_chain
+
+logger = logging.getLogger(__name__)
+
+# Attempts per request, including the first
+DEFAULT_RETRY_ATTEMPTS = 3
+
+# Backoff before the first retry, in seconds; doubles on each further retry
+DEFAULT_RETRY_BASE_DELAY = 0.5
+
+# Longest backoff between two attempts, in seconds
+DEFAULT_RETRY_MAX_DELAY = 8.0
+
+# Longest a request may take across all attempts, in seconds; None leaves
+# requests bounded only by the attempts and the HTTP timeouts
+DEFAULT_RETRY_DEADLINE: Optional[float] = None
+
+# HTTP statuses worth another attempt (529 is Anthropic's "overloaded")
+RETRYABLE_STATUS_CODES = {408, 409, 500, 502, 503, 504, 529}
+
+# Exceptions raised when no response arrived (connection errors and timeouts);
+# httpx covers Ollama, whose client does not wrap transport errors
+CONNECTION_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    anthropic.APIConnectionError,
+    groq.APIConnectionError,
+)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Check whether a failed provider call never got a response from the provider.
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        True for connection errors and timeouts, including wrapped ones
+    """
+    return any(isinstance(cause, CONNECTION_ERRORS) for cause in iter_error_chain(error))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed provider call is worth another attempt.
+
+    Looks through wrapping exceptions for the SDK error: connection errors and
+    timeouts from the OpenAI, Anthropic, Groq and DeepSeek SDKs (and httpx, used
+    by Ollama) are retryable, as are responses with a status in
+    RETRYABLE_STATUS_CODES, including google-genai ServerErrors.
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        True if the call should be retried
+    """
+    for cause in iter_error_chain(error):
+        if isinstance(cause, CONNECTION_ERRORS):
+            return True
+        status = error_status_code(cause)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+    return False
+
+
+class _Clock:
+    """
+    Start time of a request's deadline, set when its first attempt is let through.
+    """
+
+    def __init__(self):
+        self.started: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return 0.0 if self.started is None else time.monotonic() - self.started
+
+
+# Deadline and clock of the request being retried in this context
+_retry_clock: ContextVar[Optional[Tuple[Optional[float], _Clock]]] = ContextVar("retry_clock", default=None)
+
+
+@contextmanager
+def retry_deadline() -> Iterator[None]:
+    """
+    Run a provider call under the deadline of the request being retried.
+
+    The first use starts the request's deadline clock, so callers enter it
+    once the call is cleared to go (e.g. after the rate limiter grants it).
+    Outside RetryPolicy.call, or without a deadline, this does nothing.
+    """
+    current = _retry_clock.get()
+    if current is None or current[0] is None:
+        yield
+        return
+    deadline, clock = current
+    if clock.started is None:
+        clock.started = time.monotonic()
+    with request_deadline(deadline - clock.elapsed()):
+        yield
+
+
+class _RetryStats:
+    """
+    Retry counters for one provider.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+
+class RetryPolicy:
+    """
+    Retries transient provider failures with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        deadline: Optional[float] = DEFAULT_RETRY_DEADLINE,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._stats: Dict[str, _RetryStats] = {}
+        self._lock = threading.Lock()
+
+    def backoff(self, retry: int) -> float:
+        """
+        Get the delay before a retry, using full jitter.
+
+        Args:
+            retry: Retry number, starting at 1
+
+        Returns:
+            Random delay between 0 and the capped exponential backoff
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(self, provider_name: str, fn: Callable[[], str], can_retry: Optional[Callable[[], bool]] = None) -> str:
+        """
+        Run a provider call, retrying transient failures.
+
+        With a deadline, the clock starts when fn first enters retry_deadline(),
+        which caps its HTTP timeouts to the time left; no retry is scheduled
+        past the deadline.
+
+        Args:
+            provider_name: Provider name (full name), used for metrics
+            fn: Performs the provider call
+            can_retry: Optional check made before each retry, e.g. that no
+                       streamed output has been delivered yet
+
+        Returns:
+            The provider response
+        """
+        clock = _Clock()
+        token = _retry_clock.set((self.deadline, clock))
+        self._record(provider_name, "calls")
+        attempt = 1
+        try:
+            while True:
+                try:
+                    response = fn()
+                except Exception as e:
+                    delay = self._next_delay(provider_name, e, attempt, clock, can_retry)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                if attempt > 1:
+                    self._record(provider_name, "recovered")
+                return response
+        finally:
+            _retry_clock.reset(token)
+
+    async def acall(
+        self, provider_name: str, fn: Callable[[], Awaitable[str]], can_retry: Optional[Callable[[], bool]] = None
+    ) -> str:
+        """
+        Async variant of call; fn returns an awaitable provider call.
+        """
+        clock = _Clock()
+        token = _retry_clock.set((self.deadline, clock))
+        self._record(provider_name, "calls")
+        attempt = 1
+        try:
+            while True:
+                try:
+                    response = await fn()
+                except Exception as e:
+                    delay = self._next_delay(provider_name, e, attempt, clock, can_retry)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                if attempt > 1:
+                    self._record(provider_name, "recovered")
+                return response
+        finally:
+            _retry_clock.reset(token)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get retry counters.
+
+        Returns:
+            Dictionary mapping provider names to calls, retries, calls that
+            succeeded after retrying (recovered) and calls that ran out of
+            attempts or time (exhausted)
+        """
+        with self._lock:
+            return {
+                provider_name: {
+                    "calls": stats.calls,
+                    "retries": stats.retries,
+                    "recovered": stats.recovered,
+                    "exhausted": stats.exhausted,
+                }
+                for provider_name, stats in self._stats.items()
+            }
+
+    def _next_delay(
+        self,
+        provider_name: str,
+        error: BaseException,
+        attempt: int,
+        clock: _Clock,
+        can_retry: Optional[Callable[[], bool]],
+    ) -> Optional[float]:
+        # None means give up and re-raise; a cancelled request is not worth retrying
+        if not is_retryable(error) or request_cancelled() or (can_retry is not None and not can_retry()):
+            return None
+
+        delay = self.backoff(attempt)
+        past_deadline = self.deadline is not None and clock.elapsed() + delay > self.deadline
+        if attempt >= self.max_attempts or past_deadline:
+            logger.warning(f"Giving up on {provider_name} after {attempt} attempts: {error}")
+            self._record(provider_name, "exhausted")
+            return None
+
+        logger.warning(f"Retrying {provider_name} in {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts}): {error}")
+        self._record(provider_name, "retries")
+        return delay
+
+    def _record(self, provider_name: str, counter: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(provider_name, _RetryStats())
+            setattr(stats, counter, getattr(stats, counter) + 1)
+
+
+_retry_policy: Optional[RetryPolicy] = None
+_retry_policy_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Get the process-wide retry policy, creating it from the environment on first use.
+
+    Environment variables:
+        RETRY_ATTEMPTS: Attempts per request including the first, 1 disables retries (default 3)
+        RETRY_BASE_DELAY: Backoff before the first retry in seconds (default 0.5)
+        RETRY_MAX_DELAY: Longest backoff between attempts in seconds (default 8)
+        RETRY_DEADLINE: Longest a request may take across all attempts in seconds, counted
+                        from when the rate limiter lets it through (default unset)
+
+    Returns:
+        The shared RetryPolicy
+    """
+    global _retry_policy
+    with _retry_policy_lock:
+        if _retry_policy is None:
+            _retry_policy = RetryPolicy(
+                max_attempts=get_env_int("RETRY_ATTEMPTS", DEFAULT_RETRY_ATTEMPTS),
+                base_delay=get_env_float("RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY),
+                max_delay=get_env_float("RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY),
+                deadline=get_env_float("RETRY_DEADLINE", DEFAULT_RETRY_DEADLINE),
+            )
+        return _retry_policy
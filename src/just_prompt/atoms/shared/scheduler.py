@@ -0,0 +1,286 @@
+"""
+Shared worker pool for just-prompt.
+
+A single process-wide scheduler runs every provider call, with a global
+concurrency cap, optional per-provider sub-limits and queue-depth metrics.
+"""
+
+import concurrent.futures
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+from .data_types import ModelProviders
+from .utils import get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Default maximum number of provider calls running at once across all tool calls
+DEFAULT_MAX_CONCURRENCY = 32
+
+_Task = Tuple[concurrent.futures.Future, Callable[..., Any], tuple, dict, Optional[str]]
+
+
+def parse_provider_limits(value: str) -> Dict[str, int]:
+    """
+    Parse per-provider concurrency limits.
+
+    Args:
+        value: Comma-separated "provider=limit" pairs, e.g. "groq=4,openai=16"
+
+    Returns:
+        Dictionary mapping provider names to limits
+    """
+    limits = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, limit = item.partition("=")
+        provider = ModelProviders.from_name(name.strip())
+        try:
+            limit_value = int(limit)
+        except ValueError:
+            limit_value = 0
+        if provider is None or limit_value < 1:
+            logger.warning(f"Ignoring invalid provider concurrency limit: {item.strip()}")
+            continue
+        limits[provider.full_name] = limit_value
+    return limits
+
+
+class _ProviderState:
+    """
+    Per-provider slot accounting.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.pending: Deque[_Task] = deque()
+
+    def has_slot(self) -> bool:
+        return self.limit is None or self.active < self.limit
+
+
+class Scheduler:
+    """
+    Bounded thread pool with per-provider sub-limits.
+
+    Tasks for a provider that is at its limit wait in a per-provider queue
+    without occupying a worker thread, so a slow provider cannot starve the
+    others. Tasks must not block waiting on other scheduler tasks.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_CONCURRENCY, provider_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max(1, max_workers)
+        self.provider_limits = dict(provider_limits or {})
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="just-prompt-worker"
+        )
+        self._lock = threading.Lock()
+        self._providers: Dict[str, _ProviderState] = {}
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+
+    def submit(self, fn: Callable[..., Any], *args, provider: Optional[str] = None, **kwargs) -> concurrent.futures.Future:
+        """
+        Schedule a call.
+
+        Args:
+            fn: Function to call
+            *args: Positional arguments for fn
+            provider: Provider name (full name) the call counts against, if any
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future resolving to fn's result
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        task = (future, fn, args, kwargs, provider)
+
+        with self._lock:
+            self._queued += 1
+            if provider is not None:
+                state = self._provider_state(provider)
+                state.queued += 1
+                if not state.has_slot():
+                    state.pending.append(task)
+                    return future
+                state.active += 1
+
+        self._executor.submit(self._run, task)
+        return future
+
+    def fan_out(
+        self,
+        fn: Callable[..., Any],
+        items: Sequence[Any],
+        *args,
+        provider_for: Optional[Callable[[Any], Optional[str]]] = None,
+        **kwargs,
+    ) -> List[concurrent.futures.Future]:
+        """
+        Schedule fn(item, *args, **kwargs) for every item.
+
+        Args:
+            fn: Function to call
+            items: Items to call fn with, one call each
+            *args: Extra positional arguments for fn
+            provider_for: Maps an item to the provider name its call counts against
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Futures in the same order as items
+        """
+        return [
+            self.submit(fn, item, *args, provider=provider_for(item) if provider_for else None, **kwargs)
+            for item in items
+        ]
+
+    def has_capacity(self, provider: Optional[str] = None) -> bool:
+        """
+        Check whether a new call would start at once rather than queue.
+
+        Args:
+            provider: Provider name (full name) the call would count against, if any
+
+        Returns:
+            True if a worker, and a slot under the provider's limit, are free
+        """
+        with self._lock:
+            if self._queued + self._running >= self.max_workers:
+                return False
+            state = self._providers.get(provider) if provider is not None else None
+            return state is None or (state.has_slot() and not state.pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue-depth and throughput metrics.
+
+        Returns:
+            Dictionary with global and per-provider queued/running/completed counts
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "providers": {
+                    name: {
+                        "limit": state.limit,
+                        "queued": state.queued,
+                        "running": state.running,
+                        "completed": state.completed,
+                    }
+                    for name, state in self._providers.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting work and shut down the worker threads.
+
+        Args:
+            wait: Whether to wait for running tasks to finish
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _provider_state(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            state = _ProviderState(self.provider_limits.get(provider))
+            self._providers[provider] = state
+        return state
+
+    def _run(self, task: _Task) -> None:
+        future, fn, args, kwargs, provider = task
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            if provider is not None:
+                state = self._providers[provider]
+                state.queued -= 1
+                state.running += 1
+
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            next_task = None
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                if provider is not None:
+                    state = self._providers[provider]
+                    state.running -= 1
+                    state.completed += 1
+                    state.active -= 1
+                    if state.pending and state.has_slot():
+                        next_task = state.pending.popleft()
+                        state.active += 1
+            if next_task is not None:
+                self._executor.submit(self._run, next_task)
+
+
+def gather_ordered(futures: Sequence[concurrent.futures.Future]) -> List[Any]:
+    """
+    Wait for futures and return their results by submission index.
+
+    Args:
+        futures: Futures, e.g. as returned by Scheduler.fan_out
+
+    Returns:
+        Results in the same order as futures
+    """
+    return [future.result() for future in futures]
+
+
+def iter_completed(futures: Sequence[concurrent.futures.Future]) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield results as soon as each future finishes.
+
+    Args:
+        futures: Futures, e.g. as returned by Scheduler.fan_out
+
+    Yields:
+        Tuples of (submission index, result) in completion order
+    """
+    index_of = {future: index for index, future in enumerate(futures)}
+    for future in concurrent.futures.as_completed(index_of):
+        yield index_of[future], future.result()
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Get the process-wide scheduler, creating it from the environment on first use.
+
+    Environment variables:
+        JUST_PROMPT_MAX_CONCURRENCY: Maximum provider calls running at once (default 32)
+        JUST_PROMPT_PROVIDER_CONCURRENCY: Per-provider limits, e.g. "groq=4,openai=16"
+
+    Returns:
+        The shared Scheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(
+                max_workers=get_env_int("JUST_PROMPT_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY),
+                provider_limits=parse_provider_limits(os.environ.get("JUST_PROMPT_PROVIDER_CONCURRENCY", "")),
+            )
+        return _scheduler
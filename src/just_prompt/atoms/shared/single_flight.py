@@ -0,0 +1,249 @@
+"""
+In-flight request coalescing for just-prompt.
+
+When identical requests (same model spec and prompt) are in flight at the same
+time, only the first one calls the provider; the others wait for and share its
+result, its error, and - when streaming - its chunks. Chunks are kept for
+late joiners only up to a bounded replay window; a caller joining after the
+window has filled receives the whole response once the call completes. A
+streaming call is aborted once every caller's chunk handler has failed, e.g.
+because the caller no longer needs the response. Async callers share flights
+with sync callers: either kind can lead a flight the other joins.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from .utils import get_env_bool, get_env_int
+
+logger = logging.getLogger(__name__)
+
+# Characters of a streaming response kept to replay to callers that join late
+DEFAULT_SINGLE_FLIGHT_REPLAY_CHARS = 65536
+
+ChunkHandler = Callable[[str], None]
+
+
+class _Flight:
+    """
+    One upstream call and the callers waiting on it.
+    """
+
+    def __init__(self, streaming: bool, replay_chars: int = DEFAULT_SINGLE_FLIGHT_REPLAY_CHARS):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.streaming = streaming
+        self.replay_chars = replay_chars
+        self.chunks: List[str] = []
+        self.replay_size = 0
+        self.replayable = True
+        self.subscribers: Dict[int, ChunkHandler] = {}
+        self.subscriber_errors: Dict[int, Exception] = {}
+        self.waiting = 1  # The leader
+        self.lock = threading.Lock()
+        self._tokens = itertools.count(1)
+
+    def subscribe(self, on_chunk: ChunkHandler) -> Optional[int]:
+        """
+        Register a caller's chunk handler, replaying chunks it missed.
+
+        Returns None when the chunks it missed are no longer kept; the caller
+        then receives the whole response at the end instead.
+        """
+        with self.lock:
+            if not self.replayable:
+                return None
+            token = next(self._tokens)
+            self.subscribers[token] = on_chunk
+            for chunk in self.chunks:
+                self._deliver(token, chunk)
+            return token
+
+    def join(self) -> None:
+        """
+        Count another caller waiting on this flight.
+        """
+        with self.lock:
+            self.waiting += 1
+
+    def publish(self, chunk: str) -> None:
+        """
+        Record a chunk from the upstream call and pass it to every caller.
+
+        Raises:
+            Exception: The last handler error once every caller has stopped
+                       listening, to abort the upstream call
+        """
+        with self.lock:
+            if self.replayable:
+                self.chunks.append(chunk)
+                self.replay_size += len(chunk)
+                if self.replay_size > self.replay_chars:
+                    # Stop buffering; callers joining from now on get the whole response
+                    self.replayable = False
+                    self.chunks = []
+            for token in list(self.subscribers):
+                self._deliver(token, chunk)
+            if self.waiting == 0:
+                raise list(self.subscriber_errors.values())[-1]
+
+    def raise_for(self, token: Optional[int]) -> None:
+        """
+        Re-raise the error a caller's chunk handler hit, if any.
+        """
+        if token is not None and token in self.subscriber_errors:
+            raise self.subscriber_errors[token]
+
+    def _deliver(self, token: int, chunk: str) -> None:
+        # A failing handler must not break the upstream call or the other callers
+        try:
+            self.subscribers[token](chunk)
+        except Exception as e:
+            logger.warning(f"Dropping stream subscriber after error: {e}")
+            self.subscriber_errors[token] = e
+            del self.subscribers[token]
+            self.waiting -= 1
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+    """
+
+    def __init__(self, enabled: bool = True, replay_chars: int = DEFAULT_SINGLE_FLIGHT_REPLAY_CHARS):
+        self.enabled = enabled
+        self.replay_chars = max(0, replay_chars)
+        self.executed = 0
+        self.shared = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[Optional[ChunkHandler]], str], on_chunk: Optional[ChunkHandler] = None) -> str:
+        """
+        Run fn for key, or join an identical call that is already in flight.
+
+        Args:
+            key: Request key; calls with equal keys are coalesced
+            fn: Performs the upstream call; receives a chunk handler when streaming, else None
+            on_chunk: Optional callback receiving response text as it streams in
+
+        Returns:
+            The shared result
+
+        Raises:
+            Exception: The error raised by the upstream call, shared by every waiter
+        """
+        if not self.enabled:
+            with self._lock:
+                self.executed += 1
+            return fn(on_chunk)
+
+        flight, leader = self._lead_or_join(key, streaming=on_chunk is not None)
+        if not leader:
+            return self._follow(key, flight, on_chunk)
+
+        token = flight.subscribe(on_chunk) if flight.streaming else None
+        try:
+            result = fn(flight.publish if flight.streaming else None)
+        except BaseException as e:
+            self._finish(key)
+            flight.future.set_exception(e)
+            raise
+        self._finish(key)
+        flight.future.set_result(result)
+        flight.raise_for(token)
+        return result
+
+    async def arun(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """
+        Async variant of run for calls that do not stream; fn returns an awaitable upstream call.
+
+        Waiting on a flight led elsewhere does not block the event loop, and
+        cancelling a waiting caller leaves the flight running for the others.
+        """
+        if not self.enabled:
+            with self._lock:
+                self.executed += 1
+            return await fn()
+
+        flight, leader = self._lead_or_join(key, streaming=False)
+        if not leader:
+            logger.info(f"Joining in-flight request {key[:12]}")
+            flight.join()
+            return await asyncio.shield(asyncio.wrap_future(flight.future))
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key)
+            flight.future.set_exception(e)
+            raise
+        self._finish(key)
+        flight.future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with executed (upstream) calls, shared (coalesced) calls and calls in flight
+        """
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._flights)}
+
+    def _lead_or_join(self, key: str, streaming: bool) -> Tuple[_Flight, bool]:
+        # Returns the flight for key and whether this caller starts (leads) it
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.shared += 1
+                return flight, False
+            flight = self._flights[key] = _Flight(streaming=streaming, replay_chars=self.replay_chars)
+            self.executed += 1
+            return flight, True
+
+    def _follow(self, key: str, flight: _Flight, on_chunk: Optional[ChunkHandler]) -> str:
+        logger.info(f"Joining in-flight request {key[:12]}")
+        flight.join()
+        token = flight.subscribe(on_chunk) if on_chunk is not None and flight.streaming else None
+        result = flight.future.result()
+
+        if on_chunk is not None and token is None:
+            # The upstream call did not stream, or streamed past the replay
+            # window before this caller joined - deliver the whole response at once
+            on_chunk(result)
+        flight.raise_for(token)
+        return result
+
+    def _finish(self, key: str) -> None:
+        # Later identical requests start a new call rather than joining a finished one
+        with self._lock:
+            self._flights.pop(key, None)
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process-wide request coalescer, creating it from the environment on first use.
+
+    Environment variables:
+        SINGLE_FLIGHT: Coalesce identical in-flight requests (default true)
+        SINGLE_FLIGHT_REPLAY_CHARS: Characters of a stream kept for callers that join late (default 65536)
+
+    Returns:
+        The shared SingleFlight
+    """
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(
+                enabled=get_env_bool("SINGLE_FLIGHT", True),
+                replay_chars=get_env_int("SINGLE_FLIGHT_REPLAY_CHARS", DEFAULT_SINGLE_FLIGHT_REPLAY_CHARS),
+            )
+        return _single_flight
@@ -2,8 +2,10 @@
 Utility functions for just-prompt.
 """
 
-from typing import Tuple, List, Optional
+from typing import Iterator, Tuple, List, Optional
+from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import logging
 
@@ -20,6 +22,9 @@ load_dotenv()
 # Default model constants
 DEFAULT_MODEL = "anthropic:claude-sonnet-4-20250514"
 
+# Separates the targets of a fallback chain, e.g. "a:claude-sonnet-4-20250514|o:gpt-4o"
+FALLBACK_SEPARATOR = "|"
+
 
 def split_provider_and_model(model_string: str) -> Tuple[str, str]:
     """
@@ -29,13 +34,15 @@ def split_provider_and_model(model_string: str) -> Tuple[str, str]:
     as the model name. Models will have additional colons in the string and we want to ignore them
     and leave them for the model name.
     
+    For a fallback chain ("provider:model|provider:model|..."), the first target is split.
+    
     Args:
-        model_string: String in format "provider:model"
+        model_string: String in format "provider:model", or a fallback chain
         
     Returns:
         Tuple containing (provider, model)
     """
-    parts = model_string.split(":", 1)
+    parts = split_fallback_chain(model_string)[0].split(":", 1)
     if len(parts) != 2:
         raise ValueError(f"Invalid model string format: {model_string}. Expected format: 'provider:model'")
     
@@ -43,6 +50,24 @@ def split_provider_and_model(model_string: str) -> Tuple[str, str]:
     return provider, model
 
 
+def split_fallback_chain(model_string: str) -> List[str]:
+    """
+    Split a model string into the targets of its fallback chain.
+    
+    Args:
+        model_string: String in format "provider:model", or targets separated by "|"
+                      to try in order, e.g. "a:claude-sonnet-4-20250514|o:gpt-4o|l:llama3"
+        
+    Returns:
+        List of "provider:model" strings; a single item for plain model strings
+    """
+    targets = [target.strip() for target in model_string.split(FALLBACK_SEPARATOR)]
+    if not all(targets):
+        raise ValueError(f"Invalid fallback chain: {model_string}. Expected format: 'provider:model|provider:model'")
+    
+    return targets
+
+
 def get_provider_from_prefix(prefix: str) -> str:
     """
     Get the full provider name from a prefix.
@@ -100,4 +125,176 @@ def get_api_key(provider: str) -> Optional[str]:
     if not env_var:
         return None
     
-    return os.environ.get(env_var)
\ No newline at end of file
+    return os.environ.get(env_var)
+
+
+def get_env_float(name: str, default: float) -> float:
+    """
+    Read a float setting from an environment variable.
+    
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or invalid
+        
+    Returns:
+        Parsed float value
+    """
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    
+    try:
+        return float(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(f"Invalid value for {name}: {value}, using {default}")
+        return default
+
+
+def get_env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from an environment variable.
+    
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or invalid
+        
+    Returns:
+        Parsed integer value
+    """
+    return int(get_env_float(name, default))
+
+
+def get_env_bool(name: str, default: bool) -> bool:
+    """
+    Read a boolean setting from an environment variable.
+    
+    Accepts 1/0, true/false, yes/no and on/off (case-insensitive).
+    
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or invalid
+        
+    Returns:
+        Parsed boolean value
+    """
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    
+    logging.getLogger(__name__).warning(f"Invalid value for {name}: {value}, using {default}")
+    return default
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory used for just-prompt's on-disk caches.
+    
+    Uses JUST_PROMPT_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/just-prompt
+    (falling back to ~/.cache/just-prompt).
+    
+    Returns:
+        Path to the cache directory (not created)
+    """
+    cache_dir = os.environ.get("JUST_PROMPT_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(xdg_cache_home).expanduser() / "just-prompt"
+
+
+class AtomicFileWriter:
+    """
+    Incrementally write a text file that only appears under its final name once complete.
+    
+    Text goes to a temporary file in the destination directory; commit() renames
+    it over the target and discard() removes it. Used as a context manager it
+    commits on success and discards on error.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self.chars_written = 0
+    
+    def write(self, text: str) -> None:
+        """
+        Append text to the temporary file.
+        
+        Args:
+            text: Text to append
+        """
+        self._file.write(text)
+        self.chars_written += len(text)
+    
+    def commit(self) -> None:
+        """
+        Close the temporary file and atomically move it to the destination path.
+        """
+        try:
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+        except Exception:
+            self.discard()
+            raise
+    
+    def discard(self) -> None:
+        """
+        Close and delete the temporary file, leaving the destination untouched.
+        """
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+    
+    def __enter__(self) -> "AtomicFileWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write text to a file atomically.
+    
+    The text is written to a temporary file in the same directory which is then
+    renamed over the target, so readers never see a partially written file.
+    
+    Args:
+        path: Destination file path
+        text: Text to write
+    """
+    with AtomicFileWriter(path) as writer:
+        writer.write(text)
+
+
+def iter_error_chain(error: BaseException) -> Iterator[BaseException]:
+    """
+    Iterate over an exception and the exceptions it was raised from.
+    
+    Provider modules wrap SDK errors in ValueError; walking __cause__ and
+    __context__ recovers the original error for classification.
+    
+    Args:
+        error: The exception that was raised
+        
+    Yields:
+        The exception, then each underlying exception in turn
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
@@ -6,7 +6,7 @@ from typing import List, Dict, Optional, Tuple
 import logging
 import os
 from .data_types import ModelProviders
-from .utils import split_provider_and_model, get_api_key
+from .utils import split_provider_and_model, split_fallback_chain, get_api_key
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,8 @@ def validate_models_prefixed_by_provider(models_prefixed_by_provider: List[str])
     """
     Validate that provider prefixes in model strings are valid.
     
+    Every target of a fallback chain ("provider:model|provider:model") is validated.
+    
     Args:
         models_prefixed_by_provider: List of model strings in format "provider:model"
         
@@ -26,10 +28,11 @@ def validate_models_prefixed_by_provider(models_prefixed_by_provider: List[str])
     
     for model_string in models_prefixed_by_provider:
         try:
-            provider_prefix, model_name = split_provider_and_model(model_string)
-            provider = ModelProviders.from_name(provider_prefix)
-            if provider is None:
-                raise ValueError(f"Unknown provider prefix: {provider_prefix}")
+            for target in split_fallback_chain(model_string):
+                provider_prefix, model_name = split_provider_and_model(target)
+                provider = ModelProviders.from_name(provider_prefix)
+                if provider is None:
+                    raise ValueError(f"Unknown provider prefix: {provider_prefix}")
         except Exception as e:
             logger.error(f"Validation error for model string '{model_string}': {str(e)}")
             raise
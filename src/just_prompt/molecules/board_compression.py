@@ -0,0 +1,218 @@
+"""
+Board response compression for just-prompt.
+
+Keeps the CEO prompt of a large board under a token budget: near-identical
+answers are found so they can be passed on once, and the budget is shared
+out between the remaining answers. Answers over their share are trimmed
+extractively (keeping the opening and the conclusion) or, with a summary
+model, summarized in parallel.
+"""
+
+from typing import List, Optional, Set, Tuple
+import logging
+import os
+import re
+from .prompt import prompt_model, model_provider
+from ..atoms.shared.utils import DEFAULT_MODEL
+from ..atoms.shared.rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+from ..atoms.shared.response_cache import CACHE_USE
+from ..atoms.shared.scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Share of word shingles two answers must have in common to count as the same answer
+DEFAULT_DUPLICATE_SIMILARITY = 0.9
+
+# Words per shingle when comparing answers
+SHINGLE_WORDS = 3
+
+# Share of a trimmed answer's budget kept from its opening; the rest comes from its end
+TRIM_HEAD_SHARE = 0.65
+
+# Tokens kept of every answer, however small its share of the budget, so no
+# answer drops out of the CEO prompt
+MIN_EXCERPT_TOKENS = 32
+
+# Marker put where a trimmed answer was cut
+TRIM_MARKER = "\n\n[... {tokens} tokens omitted ...]\n\n"
+
+# Prompt used to summarize an answer that is over its share of the budget
+SUMMARY_PROMPT = """
+<purpose>
+    Summarize a board member's answer for a CEO who will compare it with other answers.
+</purpose>
+<instructions>
+    <instruction>Keep the recommendation, the key arguments and any numbers, risks or conditions it depends on.</instruction>
+    <instruction>Use at most {max_words} words. Do not add opinions of your own.</instruction>
+</instructions>
+
+<answer>{response}</answer>
+"""
+
+_WORD = re.compile(r"\w+")
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def find_duplicates(texts: List[str], similarity: float = DEFAULT_DUPLICATE_SIMILARITY) -> List[Optional[int]]:
+    """
+    Find answers that are near-identical to an earlier one.
+
+    Answers are compared by the Jaccard similarity of their word shingles,
+    which ignores case, punctuation and whitespace.
+
+    Args:
+        texts: The answers, in board order
+        similarity: Share of shingles two answers must have in common (0 to 1)
+
+    Returns:
+        For each answer, the index of the earlier answer it duplicates, or None
+    """
+    shingles = [_shingles(text) for text in texts]
+    duplicate_of: List[Optional[int]] = []
+    for index, current in enumerate(shingles):
+        original = None
+        for earlier in range(index):
+            if duplicate_of[earlier] is not None:
+                continue
+            union = current | shingles[earlier]
+            if union and len(current & shingles[earlier]) / len(union) >= similarity:
+                original = earlier
+                break
+        duplicate_of.append(original)
+    return duplicate_of
+
+
+def allocate_budget(sizes: List[int], budget: int) -> List[int]:
+    """
+    Share a token budget between answers.
+
+    Answers smaller than an equal share keep their size and the rest of
+    their share goes to the longer answers.
+
+    Args:
+        sizes: Token count of each answer
+        budget: Tokens available for all answers together
+
+    Returns:
+        Tokens allowed for each answer
+    """
+    allowed = [0] * len(sizes)
+    remaining = max(0, budget)
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index])
+    for position, index in enumerate(order):
+        share = remaining // (len(order) - position)
+        allowed[index] = min(sizes[index], share)
+        remaining -= allowed[index]
+    return allowed
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim an answer to a token budget, keeping its opening and its conclusion.
+
+    The cut is moved to the nearest sentence or line boundary and marked
+    with the number of tokens left out. Budgets below MIN_EXCERPT_TOKENS
+    are raised to it, so a trimmed answer always keeps an excerpt and the
+    marker.
+
+    Args:
+        text: The answer
+        max_tokens: Tokens allowed
+
+    Returns:
+        The answer, or its trimmed version if it was over the budget
+    """
+    max_tokens = max(max_tokens, MIN_EXCERPT_TOKENS)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    marker = TRIM_MARKER.format(tokens=estimate_tokens(text))
+    max_chars = max(CHARS_PER_TOKEN, max_tokens * CHARS_PER_TOKEN - len(marker))
+
+    head_chars = int(max_chars * TRIM_HEAD_SHARE)
+    head = text[:head_chars]
+    boundaries = [match.end() for match in _BOUNDARY.finditer(head)]
+    if boundaries and boundaries[-1] >= head_chars // 2:
+        head = head[:boundaries[-1]]
+
+    tail_chars = max_chars - len(head)
+    tail = text[len(text) - tail_chars:] if tail_chars > 0 else ""
+    match = _BOUNDARY.search(tail)
+    if match and match.end() <= len(tail) // 2:
+        tail = tail[match.end():]
+
+    omitted = estimate_tokens(text[len(head):len(text) - len(tail)])
+    return head.rstrip() + TRIM_MARKER.format(tokens=omitted) + tail.lstrip()
+
+
+def _summarize(text: str, max_tokens: int, summary_model: str, correction_model: str, cache_mode: str) -> str:
+    """
+    Summarize an answer with the summary model, trimming the summary if it is still too long.
+    """
+    summary_prompt = SUMMARY_PROMPT.format(max_words=max(1, int(max_tokens * 0.75)), response=text)
+    summary = prompt_model(summary_model, summary_prompt, correction_model, cache_mode=cache_mode)
+    return trim_to_tokens(summary, max_tokens)
+
+
+def compress_responses(
+    texts: List[str],
+    budget: int,
+    summary_model: Optional[str] = None,
+    cache_mode: str = CACHE_USE,
+) -> List[str]:
+    """
+    Fit answers into a token budget.
+
+    Answers over their share are trimmed, or summarized in parallel when a
+    summary model is given. An answer whose summary fails is trimmed instead.
+    Every answer keeps at least MIN_EXCERPT_TOKENS, even when that goes over
+    the budget.
+
+    Args:
+        texts: The answers
+        budget: Tokens available for all answers together
+        summary_model: Optional cheap model in format "provider:model" to summarize long answers with
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+
+    Returns:
+        The answers, each within its share of the budget or cut to a short excerpt
+    """
+    allowed = allocate_budget([estimate_tokens(text) for text in texts], budget)
+    over = [index for index, text in enumerate(texts) if estimate_tokens(text) > allowed[index]]
+    compressed = list(texts)
+    if not over:
+        return compressed
+
+    logger.info(f"Compressing {len(over)} of {len(texts)} board responses to fit {budget} tokens")
+    if summary_model is None:
+        for index in over:
+            compressed[index] = trim_to_tokens(texts[index], allowed[index])
+        return compressed
+
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    futures = [
+        get_scheduler().submit(
+            _summarize,
+            texts[index],
+            allowed[index],
+            summary_model,
+            correction_model,
+            cache_mode,
+            provider=model_provider(summary_model),
+        )
+        for index in over
+    ]
+    for index, future in zip(over, futures):
+        try:
+            compressed[index] = future.result()
+        except Exception as e:
+            logger.warning(f"Could not summarize a board response with {summary_model}, trimming it instead: {e}")
+            compressed[index] = trim_to_tokens(texts[index], allowed[index])
+    return compressed
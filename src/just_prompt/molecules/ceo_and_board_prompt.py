@@ -2,13 +2,22 @@
 CEO and Board prompt functionality for just-prompt.
 """
 
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
 import logging
 import os
+import time
 from pathlib import Path
-from .prompt_from_file_to_file import prompt_from_file_to_file
-from .prompt import prompt
-from ..atoms.shared.utils import DEFAULT_MODEL
+from .prompt_from_file import read_prompt_file
+from .prompt_from_file_to_file import response_file_path
+from .board_compression import compress_responses, find_duplicates
+from .prompt import prompt, prompt_model, resolve_model_list, model_provider
+from ..atoms.shared.utils import DEFAULT_MODEL, atomic_write_text
+from ..atoms.shared.rate_limiter import estimate_tokens
+from ..atoms.shared.board_store import board_prompt_hash, get_board_store
+from ..atoms.shared.response_cache import CACHE_BYPASS, CACHE_USE
+from ..atoms.shared.scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +34,9 @@ DEFAULT_CEO_DECISION_PROMPT = """
     <instruction>Given the original question prompt, and each of the board members' responses, choose the best answer.</instruction>
     <instruction>Tally the votes of the board members, choose the best direction, and explain why you chose it.</instruction>
     <instruction>To preserve anonymity, we will use model names instead of real names of your board members. When responding, use the model names in your response.</instruction>
+    <instruction>Board members marked absent did not answer in time. Do not count a vote for them.</instruction>
+    <instruction>Board members marked same-as gave the same answer as the board member named. Count their vote for that answer.</instruction>
+    <instruction>Board responses marked reused-from were given to this same question in an earlier run, at the time shown, and were reused instead of asking again. Count them like the other responses, but keep in mind they may be older.</instruction>
     <instruction>As a CEO, you breakdown the decision into several categories including: risk, reward, timeline, and resources. In addition to these guiding categories, you also consider the board members' expertise and experience. As a bleeding edge CEO, you also invent new dimensions of decision making to help you make the best decision for your company.</instruction>
     <instruction>Your final CEO response should be in markdown format with a comprehensive explanation of your decision. Start the top of the file with a title that says "CEO Decision", include a table of contents, briefly describe the question/problem at hand then dive into several sections. One of your first sections should be a quick summary of your decision, then breakdown each of the boards decisions into sections with your commentary on each. Where we lead into your decision with the categories of your decision making process, and then we lead into your final decision.</instruction>
 </instructions>
@@ -36,18 +48,134 @@ DEFAULT_CEO_DECISION_PROMPT = """
 </board-decisions>
 """
 
+# Template for merging the decisions of a CEO panel into one
+DEFAULT_MERGE_DECISION_PROMPT = """
+<purpose>
+    You are the chair of a panel of CEOs. Each CEO read the same board responses to the original question and made a decision. Your job is to merge their decisions into one final decision for your company.
+</purpose>
+<instructions>
+    <instruction>Identify where the CEOs agree and where they disagree, and settle each disagreement with your reasoning.</instruction>
+    <instruction>When the CEOs are split, say so and name the CEOs on each side. Use the model names of the CEOs.</instruction>
+    <instruction>Your final response should be in markdown format. Start the top of the file with a title that says "CEO Decision", then a quick summary of the final decision, the points the CEOs agree on, their disagreements and how you settled them, and the final decision.</instruction>
+</instructions>
+
+<original-question>{original_prompt}</original-question>
+
+<ceo-decisions>
+{ceo_decisions}
+</ceo-decisions>
+"""
+
+# Board member statuses
+BOARD_ANSWERED = "answered"
+BOARD_FAILED = "failed"
+BOARD_ABSENT = "absent"  # Had not answered when the CEO convened
+BOARD_DUPLICATE = "duplicate"  # Gave the same answer as another member (set by compression)
+
+
+class BoardResponse:
+    """
+    One board member's answer, passed to the CEO in memory.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        response: Optional[str],
+        path: Path,
+        answered_by: Optional[str] = None,
+        status: str = BOARD_ANSWERED,
+        same_as: Optional[str] = None,
+        reused_from: Optional[float] = None,
+    ):
+        self.model = model
+        self.response = response
+        self.path = path
+        self.answered_by = answered_by or model
+        self.status = status
+        self.same_as = same_as
+        self.reused_from = reused_from  # time.time() of the earlier run whose stored answer was reused
+
+    def to_xml(self) -> str:
+        """
+        Render the response as a board-response block for the CEO prompt.
+        """
+        if self.status == BOARD_ABSENT:
+            return f"""
+<board-response>
+    <model-name>{self.answered_by}</model-name>
+    <status>absent</status>
+</board-response>
+"""
+        if self.status == BOARD_DUPLICATE:
+            return f"""
+<board-response>
+    <model-name>{self.answered_by}</model-name>
+    <same-as>{self.same_as}</same-as>
+</board-response>
+"""
+        if self.reused_from is not None:
+            reused_from = datetime.fromtimestamp(self.reused_from, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            return f"""
+<board-response>
+    <model-name>{self.answered_by}</model-name>
+    <reused-from>{reused_from}</reused-from>
+    <response>{self.response}</response>
+</board-response>
+"""
+        return f"""
+<board-response>
+    <model-name>{self.answered_by}</model-name>
+    <response>{self.response}</response>
+</board-response>
+"""
+
 
 def ceo_and_board_prompt(
     from_file: str,
     output_dir: str = ".",
     models_prefixed_by_provider: List[str] = None,
     ceo_model: str = DEFAULT_CEO_MODEL,
-    ceo_decision_prompt: str = DEFAULT_CEO_DECISION_PROMPT
+    ceo_decision_prompt: str = DEFAULT_CEO_DECISION_PROMPT,
+    cache_mode: str = CACHE_USE,
+    board_quorum: Optional[int] = None,
+    board_deadline: Optional[float] = None,
+    ceo_max_tokens: Optional[int] = None,
+    compression_model: Optional[str] = None,
+    ceo_models: Optional[List[str]] = None,
+    merge_model: Optional[str] = None,
+    merge_decision_prompt: str = DEFAULT_MERGE_DECISION_PROMPT,
+    on_reused: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Read text from a file, send it as prompt to multiple 'board member' models,
     and then have a 'CEO' model make a decision based on the responses.
 
+    Board responses go to the CEO in memory. Saving them (and the CEO prompt)
+    to disk runs in the background while the CEO decides; those files are
+    written by the time this returns.
+
+    With a quorum or deadline, the CEO starts once that many board members
+    have answered or the time is up. Members still working are listed as
+    absent in the CEO prompt and named in a comment at the end of
+    ceo_prompt.xml; their response files are saved when they finish, which
+    may be after this returns.
+
+    With the board store enabled (BOARD_STORE), board answers are stored per
+    prompt, so rerunning with another CEO model or decision template, or with
+    an extra board member, only calls the models that have not answered this
+    prompt yet. Reused answers are marked reused-from in the CEO prompt and
+    reported through on_reused.
+
+    With ceo_max_tokens, the board responses are compressed so the CEO
+    prompt stays within that many tokens however large the board is; the
+    response files keep the full answers.
+
+    With ceo_models, a panel of CEOs decides concurrently from the same
+    board responses. Each decision is saved to its own file, and the
+    decisions are merged by merge_model (or listed one after another) into
+    the CEO decision file.
+
     Args:
         from_file: Path to the text file containing the original prompt
         output_dir: Directory to save response files
@@ -55,10 +183,28 @@ def ceo_and_board_prompt(
                                    to act as the board members
         ceo_model: Model to use for the CEO decision in format "provider:model"
         ceo_decision_prompt: Template for the CEO decision prompt
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        board_quorum: Successful board answers needed before the CEO starts (default: all)
+        board_deadline: Seconds to wait for the board before the CEO starts (default: no limit)
+        ceo_max_tokens: Token budget of the CEO prompt (default: no limit)
+        compression_model: Cheap model in format "provider:model" to summarize long board
+                           responses with when compressing (default: trim them extractively)
+        ceo_models: Models in format "provider:model" to decide as a panel, instead of ceo_model
+        merge_model: Model to merge the decisions of a panel of more than one CEO
+        merge_decision_prompt: Template for the merge prompt
+        on_reused: Optional callback receiving the model string of each board member
+                   whose stored answer was reused
 
     Returns:
         Path to the CEO decision file
+
+    Raises:
+        ValueError: If the file cannot be read, board_quorum is less than 1,
+                    or no CEO could decide
     """
+    if board_quorum is not None and board_quorum < 1:
+        raise ValueError(f"Board quorum must be at least 1, got {board_quorum}")
+
     # Validate output directory
     output_path = Path(output_dir)
     if not output_path.exists():
@@ -67,74 +213,496 @@ def ceo_and_board_prompt(
     if not output_path.is_dir():
         raise ValueError(f"Not a directory: {output_dir}")
 
-    # Get the original prompt from the file
+    # Get the original prompt from the file (read once, for the board and the CEO)
     try:
-        with open(from_file, 'r', encoding='utf-8') as f:
-            original_prompt = f.read()
-    except Exception as e:
+        original_prompt = read_prompt_file(from_file)
+    except FileNotFoundError as e:
         logger.error(f"Error reading file {from_file}: {e}")
         raise ValueError(f"Error reading file: {str(e)}")
 
-    # Step 1: Get board members' responses
-    board_response_files = prompt_from_file_to_file(
-        from_file,
+    # Step 1: Get board members' responses, saving each one as it arrives
+    writes: List[Future] = []
+    board_responses = run_board(
+        original_prompt,
+        Path(from_file).stem,
+        output_path,
         models_prefixed_by_provider,
-        output_dir
+        cache_mode,
+        writes,
+        quorum=board_quorum,
+        deadline=board_deadline,
+    )
+    if on_reused is not None:
+        for board_response in board_responses:
+            if board_response.reused_from is not None:
+                on_reused(board_response.model)
+
+    # Step 2: Assemble the CEO decision prompt in one pass and save it in the background
+    if ceo_max_tokens is not None:
+        board_responses = compress_board(
+            original_prompt, board_responses, ceo_max_tokens, ceo_decision_prompt, compression_model, cache_mode
+        )
+    final_ceo_prompt = build_ceo_prompt(original_prompt, board_responses, ceo_decision_prompt)
+    ceo_prompt_file = output_path / "ceo_prompt.xml"
+    writes.append(
+        _write_in_background(ceo_prompt_file, _ceo_prompt_record(final_ceo_prompt, board_responses))
     )
 
-    # Get the models that were actually used
-    models_used = models_prefixed_by_provider
-    if not models_used:
-        default_models = os.environ.get("DEFAULT_MODELS", DEFAULT_MODEL)
-        models_used = [model.strip() for model in default_models.split(",")]
+    # Step 3: Get the CEO decision while the files are written
+    if ceo_models and len(ceo_models) > 1:
+        ceo_response = run_ceo_panel(
+            original_prompt,
+            final_ceo_prompt,
+            output_path,
+            ceo_models,
+            merge_model,
+            merge_decision_prompt,
+            cache_mode,
+            writes,
+        )
+    else:
+        ceo_response = prompt(final_ceo_prompt, ceo_models or [ceo_model], cache_mode=cache_mode)[0]
+
+    # Step 4: Write the CEO decision to a file
+    ceo_output_file = output_path / "ceo_decision.md"
+    try:
+        atomic_write_text(ceo_output_file, ceo_response)
+    except Exception as e:
+        logger.error(f"Error writing CEO decision to {ceo_output_file}: {e}")
+        raise ValueError(f"Error writing CEO decision: {str(e)}")
+
+    _wait_for_writes(writes)
+    return str(ceo_output_file)
 
-    # Step 2: Read in the board responses
-    board_responses_text = ""
-    for i, file_path in enumerate(board_response_files):
-        model_name = models_used[i].replace(":", "_")
+
+def run_board(
+    text: str,
+    input_file_name: str,
+    output_path: Path,
+    models_prefixed_by_provider: List[str] = None,
+    cache_mode: str = CACHE_USE,
+    writes: Optional[List[Future]] = None,
+    quorum: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> List[BoardResponse]:
+    """
+    Prompt every board member and save each response file as soon as it arrives.
+
+    With the board store enabled, answers stored for the same prompt by an
+    earlier run are reused (unless cache_mode is CACHE_REFRESH or
+    CACHE_BYPASS) and marked with the time they were saved, so only members
+    without a stored answer are called.
+
+    The response files of members that answered before waiting stopped are
+    written in the background (see writes). Members still working at that
+    point are left running; a callback saves their response file once they
+    finish, possibly after this returns, and it is not added to writes.
+
+    Args:
+        text: The prompt text
+        input_file_name: Stem of the prompt file, used in the response file names
+        output_path: Directory to save response files to
+        models_prefixed_by_provider: List of model strings in format "provider:model"
+                                    If None, uses the DEFAULT_MODELS environment variable
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        writes: Optional list collecting the futures of the background file writes
+        quorum: Stop waiting once this many members answered successfully (default: all);
+                a quorum larger than the board waits for every member
+        deadline: Stop waiting after this many seconds (default: no limit)
+
+    Returns:
+        Board responses in the order the models were given; members that had
+        not answered when waiting stopped are marked absent
+
+    Raises:
+        ValueError: If quorum is less than 1
+    """
+    if quorum is not None and quorum < 1:
+        raise ValueError(f"Board quorum must be at least 1, got {quorum}")
+
+    models_used = resolve_model_list(models_prefixed_by_provider)
+    if quorum is not None and quorum > len(models_used):
+        logger.warning(f"Board quorum {quorum} exceeds the {len(models_used)} board members; waiting for all of them")
+        quorum = len(models_used)
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    paths = [response_file_path(output_path, input_file_name, model_string) for model_string in models_used]
+
+    def save(board_response: BoardResponse) -> None:
+        write = _save_board_response(board_response, prompt_hash, cache_mode)
+        if writes is not None:
+            writes.append(write)
+
+    # Reuse the answers stored for this prompt; only members without one are asked
+    prompt_hash = board_prompt_hash(text)
+    stored = get_board_store().get(prompt_hash, models_used) if cache_mode == CACHE_USE else {}
+    if stored:
+        logger.info(f"Reusing {len(stored)} stored board response(s) for prompt {prompt_hash[:12]}")
+
+    board_responses = []
+    for model_string, path in zip(models_used, paths):
+        if model_string in stored:
+            answered_by, response, saved_at = stored[model_string]
+            board_responses.append(BoardResponse(model_string, response, path, answered_by, reused_from=saved_at))
+            save(board_responses[-1])
+        else:
+            board_responses.append(BoardResponse(model_string, None, path, status=BOARD_ABSENT))
+    to_ask = [index for index, model_string in enumerate(models_used) if model_string not in stored]
+
+    futures = get_scheduler().fan_out(
+        _ask_model,
+        [models_used[index] for index in to_ask],
+        text,
+        correction_model,
+        cache_mode,
+        provider_for=model_provider,
+    )
+    index_of = {future: index for index, future in zip(to_ask, futures)}
+
+    needed = len(models_used) if quorum is None else quorum
+    stop_at = None if deadline is None else time.monotonic() + deadline
+    answered = len(stored)
+    pending = set(futures)
+    while pending and answered < needed:
+        timeout = None if stop_at is None else max(0.0, stop_at - time.monotonic())
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            index = index_of[future]
+            board_response = _board_response(models_used[index], paths[index], future)
+            board_responses[index] = board_response
+            if board_response.status == BOARD_ANSWERED:
+                answered += 1
+            save(board_response)
+
+    # Late members keep running; their answers are saved whenever they arrive
+    for future in pending:
+        index = index_of[future]
+        logger.warning(f"Board member {models_used[index]} is absent: the CEO convened without its answer")
+        future.add_done_callback(
+            lambda late, model_string=models_used[index], path=paths[index]: _save_late_response(
+                _board_response(model_string, path, late), prompt_hash, cache_mode
+            )
+        )
+    return board_responses
+
+
+def run_ceo_panel(
+    original_prompt: str,
+    ceo_prompt: str,
+    output_path: Path,
+    ceo_models: List[str],
+    merge_model: Optional[str] = None,
+    merge_decision_prompt: str = DEFAULT_MERGE_DECISION_PROMPT,
+    cache_mode: str = CACHE_USE,
+    writes: Optional[List[Future]] = None,
+) -> str:
+    """
+    Have a panel of CEOs decide concurrently from the same CEO prompt, then combine their decisions.
+
+    Each decision is saved to ceo_decision_<model>.md in the background.
+    Failed CEOs are left out of the combined decision; if the merge model
+    fails, the decisions are listed one after another instead.
+
+    Args:
+        original_prompt: The question put to the board
+        ceo_prompt: The CEO prompt with the board responses
+        output_path: Directory to save the decision files to
+        ceo_models: Models in format "provider:model" to act as the CEOs
+        merge_model: Optional model to merge the decisions into one
+        merge_decision_prompt: Template with {original_prompt} and {ceo_decisions} placeholders
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        writes: Optional list collecting the futures of the background file writes
+
+    Returns:
+        The combined CEO decision
+
+    Raises:
+        ValueError: If every CEO failed
+    """
+    ceo_models = resolve_model_list(ceo_models)
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    futures = get_scheduler().fan_out(
+        _ask_model,
+        ceo_models,
+        ceo_prompt,
+        correction_model,
+        cache_mode,
+        provider_for=model_provider,
+    )
+
+    decisions: List[Tuple[str, str]] = []
+    errors = []
+    for model_string, future in zip(ceo_models, futures):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                response_content = f.read()
-                board_responses_text += f"""
-<board-response>
-    <model-name>{models_used[i]}</model-name>
-    <response>{response_content}</response>
-</board-response>
-"""
+            answered_by, decision = future.result()
+            decisions.append((answered_by, decision))
         except Exception as e:
-            logger.error(f"Error reading board response file {file_path}: {e}")
-            board_responses_text += f"""
-<board-response>
-    <model-name>{models_used[i]}</model-name>
-    <response>Error reading response: {str(e)}</response>
-</board-response>
-"""
+            logger.error(f"Error processing prompt for {model_string}: {e}")
+            decision = f"Error ({model_string}): {str(e)}"
+            errors.append(decision)
+        write = _write_in_background(response_file_path(output_path, "ceo_decision", model_string), decision)
+        if writes is not None:
+            writes.append(write)
 
-    # Step 3: Prepare the CEO decision prompt
-    final_ceo_prompt = ceo_decision_prompt.format(
-        original_prompt=original_prompt,
-        board_responses=board_responses_text
-    )
+    if not decisions:
+        raise ValueError("No CEO decision: " + "; ".join(errors))
+    if merge_model is None or len(decisions) == 1:
+        return combine_ceo_decisions(decisions)
 
-    # Step 4: Save the CEO prompt to a file
-    ceo_prompt_file = output_path / "ceo_prompt.xml"
+    merge_prompt = build_merge_prompt(original_prompt, decisions, merge_decision_prompt)
+    write = _write_in_background(output_path / "ceo_merge_prompt.xml", merge_prompt)
+    if writes is not None:
+        writes.append(write)
     try:
-        with open(ceo_prompt_file, "w", encoding="utf-8") as f:
-            f.write(final_ceo_prompt)
+        return _ask_model(merge_model, merge_prompt, correction_model, cache_mode)[1]
     except Exception as e:
-        logger.error(f"Error writing CEO prompt to {ceo_prompt_file}: {e}")
-        raise ValueError(f"Error writing CEO prompt: {str(e)}")
-    
-    # Step 5: Get the CEO decision
-    ceo_response = prompt(final_ceo_prompt, [ceo_model])[0]
+        logger.error(f"Error merging CEO decisions with {merge_model}, listing them instead: {e}")
+        return combine_ceo_decisions(decisions)
 
-    # Step 6: Write the CEO decision to a file
-    ceo_output_file = output_path / "ceo_decision.md"
+
+def build_merge_prompt(
+    original_prompt: str,
+    decisions: List[Tuple[str, str]],
+    merge_decision_prompt: str = DEFAULT_MERGE_DECISION_PROMPT,
+) -> str:
+    """
+    Fill the merge template with the original prompt and the CEO decisions.
+
+    Args:
+        original_prompt: The question put to the board
+        decisions: (CEO model, decision) pairs
+        merge_decision_prompt: Template with {original_prompt} and {ceo_decisions} placeholders
+
+    Returns:
+        The merge prompt
+    """
+    return merge_decision_prompt.format(
+        original_prompt=original_prompt,
+        ceo_decisions="".join(
+            f"""
+<ceo-decision>
+    <model-name>{model_string}</model-name>
+    <decision>{decision}</decision>
+</ceo-decision>
+"""
+            for model_string, decision in decisions
+        ),
+    )
+
+
+def combine_ceo_decisions(decisions: List[Tuple[str, str]]) -> str:
+    """
+    List CEO decisions one after another in a single markdown document.
+
+    Args:
+        decisions: (CEO model, decision) pairs
+
+    Returns:
+        The decision itself for a single CEO, otherwise every decision under a heading naming its CEO
+    """
+    if len(decisions) == 1:
+        return decisions[0][1]
+    return "\n\n---\n\n".join(f"## Decision by {model_string}\n\n{decision}" for model_string, decision in decisions)
+
+
+def _ask_model(model_string: str, text: str, correction_model: str, cache_mode: str) -> Tuple[str, str]:
+    """
+    Prompt one board member or CEO of a panel.
+
+    Args:
+        model_string: String in format "provider:model", or a fallback chain
+        text: The prompt text
+        correction_model: Model to use for model name correction
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+
+    Returns:
+        Tuple of (the "provider:model" that answered, response)
+    """
+    answered_by = []
+    response = prompt_model(model_string, text, correction_model, cache_mode=cache_mode, on_target=answered_by.append)
+    return (answered_by[-1] if answered_by else model_string), response
+
+
+def _board_response(model_string: str, path: Path, future: Future) -> BoardResponse:
+    """
+    Build a board response from a finished board member call, reporting failures as an error response.
+    """
     try:
-        with open(ceo_output_file, "w", encoding="utf-8") as f:
-            f.write(ceo_response)
+        answered_by, response = future.result()
     except Exception as e:
-        logger.error(f"Error writing CEO decision to {ceo_output_file}: {e}")
-        raise ValueError(f"Error writing CEO decision: {str(e)}")
+        logger.error(f"Error processing prompt for {model_string}: {e}")
+        return BoardResponse(model_string, f"Error ({model_string}): {str(e)}", path, status=BOARD_FAILED)
+    return BoardResponse(model_string, response, path, answered_by)
+
 
-    return str(ceo_output_file)
\ No newline at end of file
+def _save_board_response(board_response: BoardResponse, prompt_hash: str, cache_mode: str) -> Future:
+    """
+    Store a successful board answer for reuse and write the response file in the background.
+
+    Args:
+        board_response: The board member's response
+        prompt_hash: Key of the board artifact, from board_prompt_hash
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+
+    Returns:
+        Future of the background file write
+    """
+    if board_response.status == BOARD_ANSWERED and cache_mode != CACHE_BYPASS:
+        get_board_store().put(prompt_hash, board_response.model, board_response.answered_by, board_response.response)
+    return _write_in_background(board_response.path, board_response.response)
+
+
+def _save_late_response(board_response: BoardResponse, prompt_hash: str, cache_mode: str) -> None:
+    """
+    Save the response of a board member that answered after the CEO convened.
+    """
+    logger.info(f"Saving late board response from {board_response.model} to {board_response.path}")
+    _save_board_response(board_response, prompt_hash, cache_mode)
+
+
+def build_ceo_prompt(
+    original_prompt: str,
+    board_responses: List[BoardResponse],
+    ceo_decision_prompt: str = DEFAULT_CEO_DECISION_PROMPT,
+) -> str:
+    """
+    Fill the CEO decision template with the original prompt and the board responses.
+
+    Args:
+        original_prompt: The question put to the board
+        board_responses: The board members' responses
+        ceo_decision_prompt: Template with {original_prompt} and {board_responses} placeholders
+
+    Returns:
+        The CEO prompt
+    """
+    return ceo_decision_prompt.format(
+        original_prompt=original_prompt,
+        board_responses="".join(board_response.to_xml() for board_response in board_responses),
+    )
+
+
+def compress_board(
+    original_prompt: str,
+    board_responses: List[BoardResponse],
+    max_tokens: int,
+    ceo_decision_prompt: str = DEFAULT_CEO_DECISION_PROMPT,
+    summary_model: Optional[str] = None,
+    cache_mode: str = CACHE_USE,
+) -> List[BoardResponse]:
+    """
+    Compress board responses so the CEO prompt fits a token budget.
+
+    Near-identical answers are passed on once, with the other members
+    marked as giving the same answer. The tokens left after the template,
+    the original prompt and the response markup are shared between the
+    remaining responses; longer ones are trimmed or summarized.
+
+    Args:
+        original_prompt: The question put to the board
+        board_responses: The board members' responses
+        max_tokens: Token budget of the CEO prompt
+        ceo_decision_prompt: Template for the CEO decision prompt
+        summary_model: Optional cheap model to summarize long responses with, instead of trimming them
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+
+    Returns:
+        Board responses to build the CEO prompt from, in the same order
+    """
+    compressed = list(board_responses)
+    answers = [index for index, board_response in enumerate(board_responses) if board_response.status == BOARD_ANSWERED]
+    duplicate_of = find_duplicates([board_responses[index].response for index in answers])
+    for position, original in enumerate(duplicate_of):
+        if original is not None:
+            board_response = board_responses[answers[position]]
+            compressed[answers[position]] = BoardResponse(
+                board_response.model,
+                None,
+                board_response.path,
+                board_response.answered_by,
+                status=BOARD_DUPLICATE,
+                same_as=board_responses[answers[original]].answered_by,
+                reused_from=board_response.reused_from,
+            )
+
+    # Everything but the response texts counts against the budget first
+    kept = [index for index, board_response in enumerate(compressed) if board_response.response is not None]
+    skeleton = [
+        BoardResponse(
+            board_response.model, "", board_response.path, board_response.answered_by,
+            reused_from=board_response.reused_from,
+        )
+        if board_response.response is not None else board_response
+        for board_response in compressed
+    ]
+    available = max_tokens - estimate_tokens(build_ceo_prompt(original_prompt, skeleton, ceo_decision_prompt))
+    if available <= 0:
+        logger.warning(
+            f"The CEO prompt is over {max_tokens} tokens before any board response is added; "
+            f"each response is cut to a short excerpt"
+        )
+
+    texts = compress_responses(
+        [compressed[index].response for index in kept], available, summary_model, cache_mode
+    )
+    for index, text in zip(kept, texts):
+        board_response = compressed[index]
+        compressed[index] = BoardResponse(
+            board_response.model,
+            text,
+            board_response.path,
+            board_response.answered_by,
+            board_response.status,
+            reused_from=board_response.reused_from,
+        )
+    return compressed
+
+
+def _ceo_prompt_record(ceo_prompt: str, board_responses: List[BoardResponse]) -> str:
+    """
+    Build the contents of ceo_prompt.xml: the CEO prompt, plus a note of the
+    board members that were still answering when the CEO started.
+
+    Args:
+        ceo_prompt: The prompt sent to the CEO
+        board_responses: The board responses the prompt was built from
+
+    Returns:
+        The text to save
+    """
+    pending = [board_response.model for board_response in board_responses if board_response.status == BOARD_ABSENT]
+    if not pending:
+        return ceo_prompt
+    return (
+        f"{ceo_prompt}\n<!-- Still answering when the CEO started (their response files are saved "
+        f"when they finish): {', '.join(pending)} -->\n"
+    )
+
+
+def _wait_for_writes(writes: List[Future]) -> None:
+    """
+    Wait for background file writes, logging any that failed.
+
+    Args:
+        writes: Futures of the background file writes
+    """
+    for write in writes:
+        try:
+            write.result()
+        except Exception as e:
+            logger.error(f"Error writing response file: {e}")
+
+
+def _write_in_background(path: Path, text: str) -> Future:
+    """
+    Write a file on the shared scheduler, off the path to the CEO decision.
+
+    Args:
+        path: File to write
+        text: Content to write
+
+    Returns:
+        Future of the write
+    """
+    return get_scheduler().submit(atomic_write_text, path, text)
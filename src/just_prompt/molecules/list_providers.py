@@ -2,26 +2,38 @@
 List providers functionality for just-prompt.
 """
 
-from typing import List, Dict
+from typing import Any, List, Dict
 import logging
+from ..atoms.shared.circuit_breaker import CLOSED, get_circuit_breakers
 from ..atoms.shared.data_types import ModelProviders
 
 logger = logging.getLogger(__name__)
 
 
-def list_providers() -> List[Dict[str, str]]:
+def list_providers() -> List[Dict[str, Any]]:
     """
     List all available providers with their full and short names.
     
+    Each provider also reports its circuit breaker state ("closed", "open" or
+    "half_open") and the state of any of its models whose breaker is not closed.
+    
     Returns:
         List of dictionaries with provider information
     """
+    circuits = get_circuit_breakers().states()
     providers = []
     for provider in ModelProviders:
+        prefix = f"{provider.full_name}:"
         providers.append({
             "name": provider.name,
             "full_name": provider.full_name,
-            "short_name": provider.short_name
+            "short_name": provider.short_name,
+            "circuit": circuits.get(provider.full_name, {}).get("state", CLOSED),
+            "model_circuits": {
+                key[len(prefix):]: circuit["state"]
+                for key, circuit in circuits.items()
+                if key.startswith(prefix) and circuit["state"] != CLOSED
+            },
         })
     
     return providers
\ No newline at end of file
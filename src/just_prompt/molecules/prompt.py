@@ -2,30 +2,161 @@
 Prompt functionality for just-prompt.
 """
 
-from typing import List
+from concurrent.futures import Future
+from typing import Callable, Iterator, List, Optional, Tuple
+import asyncio
 import logging
-import concurrent.futures
 import os
 from ..atoms.shared.validator import validate_models_prefixed_by_provider
-from ..atoms.shared.utils import split_provider_and_model, DEFAULT_MODEL
+from ..atoms.shared.utils import (
+    split_provider_and_model,
+    split_fallback_chain,
+    get_provider_from_prefix,
+    DEFAULT_MODEL,
+    FALLBACK_SEPARATOR,
+)
 from ..atoms.shared.model_router import ModelRouter
+from ..atoms.shared.response_cache import CACHE_USE
+from ..atoms.shared.scheduler import get_scheduler, gather_ordered, iter_completed
 
 logger = logging.getLogger(__name__)
 
+# Receives (model string as requested, text chunk); called from worker threads
+ChunkCallback = Callable[[str, str], None]
 
-def _process_model_prompt(model_string: str, text: str) -> str:
+# Receives (model string as requested, "provider:model" that answered); called from worker threads
+TargetCallback = Callable[[str, str], None]
+
+
+def prompt_model(
+    model_string: str,
+    text: str,
+    correction_model: str,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[Callable[[str], None]] = None,
+) -> str:
     """
-    Process a single model prompt.
+    Resolve a single model name and send it the prompt.
+    
+    Validation, correction and the prompt itself run as one task so that a slow
+    model's setup never delays the other models.
     
     Args:
-        model_string: String in format "provider:model"
+        model_string: String in format "provider:model", or a fallback chain
         text: The prompt text
+        correction_model: Model to use for model name correction
+        on_chunk: Optional callback receiving response text as it streams in
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving the "provider:model" that answered
         
     Returns:
         Response from the model
+        
+    Raises:
+        Exception: Any error from the provider
+    """
+    model_string = _correct_model_string(model_string, correction_model)
+    
+    return ModelRouter.route_prompt(
+        model_string, text, on_chunk=on_chunk, cache_mode=cache_mode, on_target=on_target
+    )
+
+
+def _correct_model_string(model_string: str, correction_model: str) -> str:
+    """
+    Correct the model name of every target in a model string.
+    
+    Args:
+        model_string: String in format "provider:model", or a fallback chain
+        correction_model: Model to use for model name correction
+        
+    Returns:
+        The model string with corrected model names
+    """
+    corrected_targets = []
+    for target in split_fallback_chain(model_string):
+        provider, model = split_provider_and_model(target)
+        
+        # Check if model needs correction (the catalog is keyed by full provider name)
+        corrected_model = _correct_model_name(get_provider_from_prefix(provider), model, correction_model)
+        corrected_targets.append(f"{provider}:{corrected_model}" if corrected_model != model else target)
+    
+    return FALLBACK_SEPARATOR.join(corrected_targets)
+
+
+def _process_model_prompt(
+    model_string: str,
+    text: str,
+    correction_model: str,
+    on_chunk: Optional[ChunkCallback] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> str:
+    """
+    Process a single model prompt, reporting failures as an error response.
+    
+    Args:
+        model_string: String in format "provider:model", or a fallback chain
+        text: The prompt text
+        correction_model: Model to use for model name correction
+        on_chunk: Optional callback receiving (model_string, chunk) as the response streams in
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
+        
+    Returns:
+        Response from the model, or an error message
     """
     try:
-        return ModelRouter.route_prompt(model_string, text)
+        model_on_chunk = None
+        if on_chunk is not None:
+            model_on_chunk = lambda chunk: on_chunk(model_string, chunk)
+        model_on_target = None
+        if on_target is not None:
+            model_on_target = lambda target: on_target(model_string, target)
+        return prompt_model(
+            model_string,
+            text,
+            correction_model,
+            on_chunk=model_on_chunk,
+            cache_mode=cache_mode,
+            on_target=model_on_target,
+        )
+    except Exception as e:
+        logger.error(f"Error processing prompt for {model_string}: {e}")
+        return f"Error ({model_string}): {str(e)}"
+
+
+async def _aprocess_model_prompt(
+    model_string: str,
+    text: str,
+    correction_model: str,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> str:
+    """
+    Async counterpart of _process_model_prompt using the providers' async clients.
+    
+    Args:
+        model_string: String in format "provider:model", or a fallback chain
+        text: The prompt text
+        correction_model: Model to use for model name correction
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
+        
+    Returns:
+        Response from the model
+    """
+    try:
+        # Corrections may list models or call the correction model synchronously
+        corrected_model_string = await asyncio.to_thread(_correct_model_string, model_string, correction_model)
+        
+        model_on_target = None
+        if on_target is not None:
+            model_on_target = lambda target: on_target(model_string, target)
+        return await ModelRouter.aroute_prompt(
+            corrected_model_string, text, cache_mode=cache_mode, on_target=model_on_target
+        )
     except Exception as e:
         logger.error(f"Error processing prompt for {model_string}: {e}")
         return f"Error ({model_string}): {str(e)}"
@@ -50,56 +181,156 @@ def _correct_model_name(provider: str, model: str, correction_model: str) -> str
         return model
 
 
-def prompt(text: str, models_prefixed_by_provider: List[str] = None) -> List[str]:
+def prompt(
+    text: str,
+    models_prefixed_by_provider: List[str] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> List[str]:
     """
-    Send a prompt to multiple models using parallel processing.
+    Send a prompt to multiple models using parallel processing on the shared scheduler.
     
     Args:
         text: The prompt text
-        models_prefixed_by_provider: List of model strings in format "provider:model"
+        models_prefixed_by_provider: List of model strings in format "provider:model",
+                                    or fallback chains "provider:model|provider:model"
                                     If None, uses the DEFAULT_MODELS environment variable
+        on_chunk: Optional callback receiving (model_string, chunk) as responses stream in
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
         
     Returns:
         List of responses from the models
     """
-    # Use default models if no models provided
+    # Use default models if no models provided, then validate
+    models_prefixed_by_provider = resolve_model_list(models_prefixed_by_provider)
+    
+    # Get correction model from environment
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    
+    # Resolve and prompt each model in parallel on the shared scheduler
+    futures = _submit_prompts(text, models_prefixed_by_provider, correction_model, on_chunk, cache_mode, on_target)
+    
+    # Collect results by submission index
+    return gather_ordered(futures)
+
+
+def prompt_as_completed(
+    text: str, models_prefixed_by_provider: List[str] = None, cache_mode: str = CACHE_USE
+) -> Iterator[Tuple[int, str, str]]:
+    """
+    Send a prompt to multiple models and yield each response as soon as it is ready.
+    
+    Args:
+        text: The prompt text
+        models_prefixed_by_provider: List of model strings in format "provider:model"
+                                    If None, uses the DEFAULT_MODELS environment variable
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        
+    Yields:
+        Tuples of (index in the model list, model string, response) in completion order
+    """
+    models_prefixed_by_provider = resolve_model_list(models_prefixed_by_provider)
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    
+    futures = _submit_prompts(text, models_prefixed_by_provider, correction_model, cache_mode=cache_mode)
+    for index, response in iter_completed(futures):
+        yield index, models_prefixed_by_provider[index], response
+
+
+def resolve_model_list(models_prefixed_by_provider: List[str] = None) -> List[str]:
+    """
+    Apply the DEFAULT_MODELS fallback and validate the model strings.
+    
+    Args:
+        models_prefixed_by_provider: List of model strings, or None
+        
+    Returns:
+        Validated list of model strings
+    """
     if not models_prefixed_by_provider:
         default_models = os.environ.get("DEFAULT_MODELS", DEFAULT_MODEL)
         models_prefixed_by_provider = [model.strip() for model in default_models.split(",")]
-    # Validate model strings
     validate_models_prefixed_by_provider(models_prefixed_by_provider)
+    return models_prefixed_by_provider
+
+
+def _submit_prompts(
+    text: str,
+    models_prefixed_by_provider: List[str],
+    correction_model: str,
+    on_chunk: Optional[ChunkCallback] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> List[Future]:
+    """
+    Schedule one prompt task per model string.
     
-    # Prepare corrected model strings
-    corrected_models = []
-    for model_string in models_prefixed_by_provider:
-        provider, model = split_provider_and_model(model_string)
-        
-        # Get correction model from environment
-        correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
-        
-        # Check if model needs correction
-        corrected_model = _correct_model_name(provider, model, correction_model)
+    Args:
+        text: The prompt text
+        models_prefixed_by_provider: List of model strings in format "provider:model"
+        correction_model: Model to use for model name correction
+        on_chunk: Optional callback receiving (model_string, chunk) as responses stream in
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
         
-        # Use corrected model
-        if corrected_model != model:
-            model_string = f"{provider}:{corrected_model}"
+    Returns:
+        Futures in the same order as the model strings
+    """
+    return get_scheduler().fan_out(
+        _process_model_prompt,
+        models_prefixed_by_provider,
+        text,
+        correction_model,
+        on_chunk,
+        cache_mode,
+        on_target,
+        provider_for=model_provider,
+    )
+
+
+def model_provider(model_string: str) -> str:
+    """
+    Get the full provider name a model string's calls count against on the scheduler.
+    
+    A fallback chain counts against its first target's provider.
+    
+    Args:
+        model_string: String in format "provider:model", or a fallback chain
         
-        corrected_models.append(model_string)
-    
-    # Process each model in parallel using ThreadPoolExecutor
-    responses = []
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Submit all tasks
-        future_to_model = {
-            executor.submit(_process_model_prompt, model_string, text): model_string
-            for model_string in corrected_models
-        }
+    Returns:
+        Full provider name
+    """
+    return get_provider_from_prefix(split_provider_and_model(model_string)[0])
+
+
+async def aprompt(
+    text: str,
+    models_prefixed_by_provider: List[str] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> List[str]:
+    """
+    Send a prompt to multiple models concurrently on the running event loop.
+    
+    Uses the providers' native async clients, so no thread is held per in-flight request.
+    
+    Args:
+        text: The prompt text
+        models_prefixed_by_provider: List of model strings in format "provider:model"
+                                    If None, uses the DEFAULT_MODELS environment variable
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
         
-        # Collect results in order
-        for model_string in corrected_models:
-            for future, future_model in future_to_model.items():
-                if future_model == model_string:
-                    responses.append(future.result())
-                    break
-    
-    return responses
\ No newline at end of file
+    Returns:
+        List of responses from the models, in the order the models were given
+    """
+    models_prefixed_by_provider = resolve_model_list(models_prefixed_by_provider)
+    
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+    
+    return list(await asyncio.gather(*(
+        _aprocess_model_prompt(model_string, text, correction_model, cache_mode, on_target)
+        for model_string in models_prefixed_by_provider
+    )))
@@ -0,0 +1,137 @@
+"""
+Fastest-of-N prompt functionality for just-prompt.
+"""
+
+from typing import Any, Dict, List, Optional
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from .prompt import prompt_model, resolve_model_list, model_provider
+from ..atoms.shared.utils import DEFAULT_MODEL
+from ..atoms.shared.http_pool import RequestScope, request_scope
+from ..atoms.shared.response_cache import CACHE_USE
+from ..atoms.shared.scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class RaceCancelled(Exception):
+    """
+    Raised inside a losing model's stream to stop it once another model has answered.
+    """
+
+
+def _race_model(
+    model_string: str,
+    text: str,
+    correction_model: str,
+    race_over: threading.Event,
+    cache_mode: str = CACHE_USE,
+    scope: Optional[RequestScope] = None,
+) -> str:
+    """
+    Prompt one model of a race, giving up as soon as the race is over.
+
+    The response is streamed so the call can be abandoned mid-generation,
+    which closes the provider connection instead of paying for the rest of
+    an answer nobody will read. Its HTTP requests are tracked in scope, so
+    cancelling the scope closes them even while waiting for the next chunk.
+
+    Args:
+        model_string: String in format "provider:model"
+        text: The prompt text
+        correction_model: Model to use for model name correction
+        race_over: Set once another model has won
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        scope: Request scope of this racer (default: a new one)
+
+    Returns:
+        Response from the model
+
+    Raises:
+        RaceCancelled: If another model won first
+    """
+    def stop_if_lost(chunk: str) -> None:
+        if race_over.is_set():
+            raise RaceCancelled(f"{model_string} lost the race")
+
+    if race_over.is_set():
+        raise RaceCancelled(f"{model_string} lost the race")
+    with request_scope(scope or RequestScope()):
+        return prompt_model(model_string, text, correction_model, on_chunk=stop_if_lost, cache_mode=cache_mode)
+
+
+def prompt_fastest(
+    text: str,
+    models_prefixed_by_provider: List[str] = None,
+    cache_mode: str = CACHE_USE,
+) -> Dict[str, Any]:
+    """
+    Race a prompt across several models and return the first successful response.
+
+    The other models are cancelled: queued calls never start, and running
+    calls have their HTTP responses closed, so their connections are released
+    at once instead of at their next chunk.
+
+    Args:
+        text: The prompt text
+        models_prefixed_by_provider: List of model strings in format "provider:model"
+                                    If None, uses the DEFAULT_MODELS environment variable
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+
+    Returns:
+        Dictionary with the winning model, its response, its latency in seconds
+        and the errors of models that failed before it answered
+
+    Raises:
+        ValueError: If every model failed
+    """
+    models_prefixed_by_provider = resolve_model_list(models_prefixed_by_provider)
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+
+    race_over = threading.Event()
+    scopes = [RequestScope() for _ in models_prefixed_by_provider]
+    started = time.monotonic()
+    scheduler = get_scheduler()
+    futures = [
+        scheduler.submit(
+            _race_model,
+            model_string,
+            text,
+            correction_model,
+            race_over,
+            cache_mode,
+            scope,
+            provider=model_provider(model_string),
+        )
+        for model_string, scope in zip(models_prefixed_by_provider, scopes)
+    ]
+
+    index_of = {future: index for index, future in enumerate(futures)}
+    errors = []
+    winner = None
+    try:
+        for future in concurrent.futures.as_completed(index_of):
+            model_string = models_prefixed_by_provider[index_of[future]]
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.warning(f"{model_string} failed in race: {e}")
+                errors.append(f"Error ({model_string}): {e}")
+                continue
+
+            winner = future
+            latency = time.monotonic() - started
+            logger.info(f"{model_string} won the race in {latency:.2f}s")
+            return {"model": model_string, "response": response, "latency": latency, "errors": errors}
+    finally:
+        # Stop the losers: queued calls never start, running ones have their responses closed
+        race_over.set()
+        for future, scope in zip(futures, scopes):
+            if future is not winner:
+                future.cancel()
+                scope.cancel()
+
+    raise ValueError("No model answered: " + "; ".join(errors))
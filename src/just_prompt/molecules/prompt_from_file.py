@@ -2,16 +2,23 @@
 Prompt from file functionality for just-prompt.
 """
 
-from typing import List
+from typing import List, Optional
 import logging
 import os
 from pathlib import Path
-from .prompt import prompt
+from .prompt import prompt, ChunkCallback, TargetCallback
+from ..atoms.shared.response_cache import CACHE_USE
 
 logger = logging.getLogger(__name__)
 
 
-def prompt_from_file(file: str, models_prefixed_by_provider: List[str] = None) -> List[str]:
+def prompt_from_file(
+    file: str,
+    models_prefixed_by_provider: List[str] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    cache_mode: str = CACHE_USE,
+    on_target: Optional[TargetCallback] = None,
+) -> List[str]:
     """
     Read text from a file and send it as a prompt to multiple models.
     
@@ -19,10 +26,29 @@ def prompt_from_file(file: str, models_prefixed_by_provider: List[str] = None) -
         file: Path to the text file
         models_prefixed_by_provider: List of model strings in format "provider:model"
                                     If None, uses the DEFAULT_MODELS environment variable
+        on_chunk: Optional callback receiving (model_string, chunk) as responses stream in
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
+        on_target: Optional callback receiving (model_string, target that answered)
         
     Returns:
         List of responses from the models
     """
+    text = read_prompt_file(file)
+    
+    # Send prompt with file content
+    return prompt(text, models_prefixed_by_provider, on_chunk, cache_mode, on_target)
+
+
+def read_prompt_file(file: str) -> str:
+    """
+    Read the prompt text from a file.
+    
+    Args:
+        file: Path to the text file
+        
+    Returns:
+        The file content
+    """
     file_path = Path(file)
     
     # Validate file
@@ -40,5 +66,4 @@ def prompt_from_file(file: str, models_prefixed_by_provider: List[str] = None) -
         logger.error(f"Error reading file {file}: {e}")
         raise ValueError(f"Error reading file: {str(e)}")
     
-    # Send prompt with file content
-    return prompt(text, models_prefixed_by_provider)
\ No newline at end of file
+    return text
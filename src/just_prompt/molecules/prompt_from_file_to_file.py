@@ -6,23 +6,35 @@ from typing import List
 import logging
 import os
 from pathlib import Path
-from .prompt_from_file import prompt_from_file
-from ..atoms.shared.utils import DEFAULT_MODEL
+from .prompt import prompt_model, resolve_model_list, model_provider
+from .prompt_from_file import read_prompt_file
+from ..atoms.shared.response_cache import CACHE_USE
+from ..atoms.shared.scheduler import get_scheduler, gather_ordered
+from ..atoms.shared.utils import DEFAULT_MODEL, FALLBACK_SEPARATOR, AtomicFileWriter, atomic_write_text
 
 logger = logging.getLogger(__name__)
 
 
 def prompt_from_file_to_file(
-    file: str, models_prefixed_by_provider: List[str] = None, output_dir: str = "."
+    file: str,
+    models_prefixed_by_provider: List[str] = None,
+    output_dir: str = ".",
+    cache_mode: str = CACHE_USE,
 ) -> List[str]:
     """
     Read text from a file, send it as prompt to multiple models, and save responses to files.
 
+    Responses are streamed to disk as they arrive, so each file is available
+    as soon as its model finishes. Each model's complete response is still
+    assembled in memory once, since it is also returned to the router for the
+    response cache and for identical requests in flight.
+
     Args:
         file: Path to the text file
         models_prefixed_by_provider: List of model strings in format "provider:model"
                                     If None, uses the DEFAULT_MODELS environment variable
         output_dir: Directory to save response files
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
 
     Returns:
         List of paths to the output files
@@ -38,32 +50,90 @@ def prompt_from_file_to_file(
     # Get the base name of the input file
     input_file_name = Path(file).stem
 
-    # Get responses
-    responses = prompt_from_file(file, models_prefixed_by_provider)
+    text = read_prompt_file(file)
+    models_used = resolve_model_list(models_prefixed_by_provider)
+    correction_model = os.environ.get("CORRECTION_MODEL", DEFAULT_MODEL)
+
+    # Each model streams straight into its own file, which appears as soon as
+    # that model finishes
+    futures = get_scheduler().fan_out(
+        _prompt_model_to_file,
+        models_used,
+        text,
+        correction_model,
+        output_path,
+        input_file_name,
+        cache_mode,
+        provider_for=model_provider,
+    )
+    return gather_ordered(futures)
 
-    # Save responses to files
-    output_files = []
 
-    # Get the models that were actually used
-    models_used = models_prefixed_by_provider
-    if not models_used:
-        default_models = os.environ.get("DEFAULT_MODELS", DEFAULT_MODEL)
-        models_used = [model.strip() for model in default_models.split(",")]
+def _prompt_model_to_file(
+    model_string: str,
+    text: str,
+    correction_model: str,
+    output_path: Path,
+    input_file_name: str,
+    cache_mode: str = CACHE_USE,
+) -> str:
+    """
+    Stream one model's response into its output file.
+
+    The response is written to a temporary file as chunks arrive and renamed
+    into place once complete, so the output file is never partially written.
+    Failed prompts are saved as an error message, like the other prompt tools.
 
-    for i, (model_string, response) in enumerate(zip(models_used, responses)):
-        # Sanitize model string for filename (replace colons with underscores)
-        safe_model_name = model_string.replace(":", "_")
+    Args:
+        model_string: String in format "provider:model"
+        text: The prompt text
+        correction_model: Model to use for model name correction
+        output_path: Directory to save the response file to
+        input_file_name: Stem of the prompt file, used in the output file name
+        cache_mode: How to use the response cache (CACHE_USE, CACHE_REFRESH or CACHE_BYPASS)
 
-        # Create output filename with .md extension
-        output_file = output_path / f"{input_file_name}_{safe_model_name}.md"
+    Returns:
+        Path to the output file, or an error message if it could not be written
+    """
+    output_file = response_file_path(output_path, input_file_name, model_string)
 
-        # Write response to file as markdown
+    # Write response to file as markdown
+    try:
+        writer = AtomicFileWriter(output_file)
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(response)
-            output_files.append(str(output_file))
+            response = prompt_model(
+                model_string, text, correction_model, on_chunk=writer.write, cache_mode=cache_mode
+            )
+            # Responses that did not stream are written whole
+            if writer.chars_written == 0 and response:
+                writer.write(response)
         except Exception as e:
-            logger.error(f"Error writing response to {output_file}: {e}")
-            output_files.append(f"Error: {str(e)}")
+            logger.error(f"Error processing prompt for {model_string}: {e}")
+            writer.discard()
+            atomic_write_text(output_file, f"Error ({model_string}): {str(e)}")
+        else:
+            writer.commit()
+        return str(output_file)
+    except Exception as e:
+        logger.error(f"Error writing response to {output_file}: {e}")
+        return f"Error: {str(e)}"
+
+
+def response_file_path(output_path: Path, input_file_name: str, model_string: str) -> Path:
+    """
+    Get the file a model's response to a prompt file is saved to.
+
+    Args:
+        output_path: Directory the response files are saved to
+        input_file_name: Stem of the prompt file
+        model_string: String in format "provider:model", or a fallback chain
+
+    Returns:
+        Path of the markdown response file
+    """
+    # Sanitize model string for filename (replace colons with underscores, and
+    # the separators of fallback chains with double underscores)
+    safe_model_name = model_string.replace(":", "_").replace(FALLBACK_SEPARATOR, "__")
 
-    return output_files
+    # Create output filename with .md extension
+    return output_path / f"{input_file_name}_{safe_model_name}.md"
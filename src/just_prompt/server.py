@@ -3,17 +3,24 @@ MCP server for just-prompt.
 """
 
 import asyncio
+import concurrent.futures
+import functools
 import logging
 import os
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
+from mcp import types
 from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field
-from .atoms.shared.utils import DEFAULT_MODEL
-from .atoms.shared.validator import print_provider_availability
-from .molecules.prompt import prompt
+from .atoms.shared.utils import DEFAULT_MODEL, get_env_int
+from .atoms.shared.validator import print_provider_availability, validate_provider_api_keys
+from .atoms.shared.model_catalog import get_model_catalog, get_snapshot_path
+from .atoms.shared.response_cache import cache_mode_from_flags
+from .molecules.prompt import prompt, ChunkCallback
+from .molecules.prompt_fastest import prompt_fastest
 from .molecules.prompt_from_file import prompt_from_file
 from .molecules.prompt_from_file_to_file import prompt_from_file_to_file
 from .molecules.ceo_and_board_prompt import ceo_and_board_prompt, DEFAULT_CEO_MODEL
@@ -32,9 +39,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default number of tool calls that can run at the same time
+DEFAULT_TOOL_WORKERS = 8
+
 # Tool names enum
 class JustPromptTools:
     PROMPT = "prompt"
+    PROMPT_FASTEST = "prompt_fastest"
     PROMPT_FROM_FILE = "prompt_from_file"
     PROMPT_FROM_FILE_TO_FILE = "prompt_from_file_to_file"
     CEO_AND_BOARD = "ceo_and_board"
@@ -42,25 +53,42 @@ class JustPromptTools:
     LIST_MODELS = "list_models"
 
 # Schema classes for MCP tools
-class PromptSchema(BaseModel):
+class CacheOptionsSchema(BaseModel):
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip the response cache for this call (no read, no write)"
+    )
+    refresh_cache: bool = Field(
+        default=False,
+        description="Ignore cached responses for this call but cache the fresh ones"
+    )
+
+class PromptSchema(CacheOptionsSchema):
+    text: str = Field(..., description="The prompt text")
+    models_prefixed_by_provider: Optional[List[str]] = Field(
+        None, 
+        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). Join models with '|' for a fallback chain tried in order (e.g., 'a:claude-sonnet-4-20250514|o:gpt-4o'). If not provided, uses default models."
+    )
+
+class PromptFastestSchema(CacheOptionsSchema):
     text: str = Field(..., description="The prompt text")
     models_prefixed_by_provider: Optional[List[str]] = Field(
         None, 
-        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). If not provided, uses default models."
+        description="List of roughly equivalent models with provider prefixes to race (e.g., 'q:llama-3.3-70b-versatile'). If not provided, uses default models."
     )
 
-class PromptFromFileSchema(BaseModel):
+class PromptFromFileSchema(CacheOptionsSchema):
     file: str = Field(..., description="Path to the file containing the prompt")
     models_prefixed_by_provider: Optional[List[str]] = Field(
         None, 
-        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). If not provided, uses default models."
+        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). Join models with '|' for a fallback chain tried in order (e.g., 'a:claude-sonnet-4-20250514|o:gpt-4o'). If not provided, uses default models."
     )
 
-class PromptFromFileToFileSchema(BaseModel):
+class PromptFromFileToFileSchema(CacheOptionsSchema):
     file: str = Field(..., description="Path to the file containing the prompt")
     models_prefixed_by_provider: Optional[List[str]] = Field(
         None, 
-        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). If not provided, uses default models."
+        description="List of models with provider prefixes (e.g., 'openai:gpt-4o' or 'o:gpt-4o'). Join models with '|' for a fallback chain tried in order (e.g., 'a:claude-sonnet-4-20250514|o:gpt-4o'). If not provided, uses default models."
     )
     output_dir: str = Field(
         default=".", 
@@ -73,7 +101,7 @@ class ListProvidersSchema(BaseModel):
 class ListModelsSchema(BaseModel):
     provider: str = Field(..., description="Provider to list models for (e.g., 'openai' or 'o')")
     
-class CEOAndBoardSchema(BaseModel):
+class CEOAndBoardSchema(CacheOptionsSchema):
     file: str = Field(..., description="Path to the file containing the prompt")
     models_prefixed_by_provider: Optional[List[str]] = Field(
         None, 
@@ -87,6 +115,31 @@ class CEOAndBoardSchema(BaseModel):
         default=DEFAULT_CEO_MODEL,
         description="Model to use for the CEO decision in format 'provider:model'"
     )
+    ceo_models: Optional[List[str]] = Field(
+        None,
+        description="Models with provider prefixes to decide as a CEO panel, concurrently from the same board responses; overrides ceo_model"
+    )
+    merge_model: Optional[str] = Field(
+        None,
+        description="Model in format 'provider:model' to merge the CEO panel's decisions into one; without it the decisions are listed one after another"
+    )
+    board_quorum: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Start the CEO decision once this many board members have answered; the rest are marked absent"
+    )
+    board_deadline: Optional[float] = Field(
+        None,
+        description="Seconds to wait for the board before starting the CEO decision; late members are marked absent"
+    )
+    ceo_max_tokens: Optional[int] = Field(
+        None,
+        description="Token budget of the CEO prompt; board responses are de-duplicated and trimmed (or summarized) to fit"
+    )
+    compression_model: Optional[str] = Field(
+        None,
+        description="Cheap model in format 'provider:model' to summarize long board responses with when ceo_max_tokens is set"
+    )
 
 
 async def serve(default_models: str = DEFAULT_MODEL) -> None:
@@ -112,9 +165,78 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
     # Check and log provider availability
     print_provider_availability()
     
+    # Warm the model catalog from the on-disk snapshot so the first requests can
+    # validate model names without network calls, then refresh it in the background
+    model_catalog = get_model_catalog()
+    model_catalog.snapshot_path = get_snapshot_path()
+    model_catalog.load_snapshot(model_catalog.snapshot_path)
+    available_providers = [name for name, available in validate_provider_api_keys().items() if available]
+    model_catalog.refresh_all_in_background(available_providers)
+    
+    # Blocking tool work runs on this pool so the stdio event loop stays free to
+    # answer list_tools, pings and further tool calls while prompts are in flight
+    tool_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=get_env_int("JUST_PROMPT_TOOL_WORKERS", DEFAULT_TOOL_WORKERS),
+        thread_name_prefix="just-prompt-tool",
+    )
+    
+    async def run_blocking(func, *args, **kwargs):
+        """Run a blocking function on the tool worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(tool_executor, functools.partial(func, *args, **kwargs))
+    
     # Create the MCP server
     server = Server("just-prompt")
     
+    def format_responses(models_used: List[str], responses: List[str], answered_by: Dict[str, str]) -> str:
+        """Format model responses, naming the fallback target that answered when it was not the first."""
+        lines = []
+        for model_string, response in zip(models_used, responses):
+            lines.append(f"Model: {model_string}")
+            target = answered_by.get(model_string)
+            if target is not None and target != model_string:
+                lines.append(f"Answered by: {target}")
+            lines.append(f"Response: {response}")
+        return "\n".join(lines)
+    
+    def progress_streamer() -> Optional[ChunkCallback]:
+        """
+        Build a chunk callback that forwards streamed text as MCP progress notifications.
+        
+        Returns None when the client did not ask for progress, so the tool call
+        uses the providers' non-streaming APIs.
+        """
+        request_context = server.request_context
+        meta = request_context.meta
+        progress_token = meta.progressToken if meta is not None else None
+        if progress_token is None:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        session = request_context.session
+        lock = threading.Lock()
+        sent = 0
+        
+        def on_chunk(model_string: str, chunk: str) -> None:
+            nonlocal sent
+            # Chunks arrive on worker threads; number them in one sequence per tool call
+            with lock:
+                sent += 1
+                notification = types.ServerNotification(
+                    types.ProgressNotification(
+                        method="notifications/progress",
+                        params=types.ProgressNotificationParams(
+                            progressToken=progress_token,
+                            progress=sent,
+                            model=model_string,
+                            message=chunk,
+                        ),
+                    )
+                )
+                asyncio.run_coroutine_threadsafe(session.send_notification(notification), loop)
+        
+        return on_chunk
+    
     @server.list_tools()
     async def list_tools() -> List[Tool]:
         """Register all available tools with the MCP server."""
@@ -124,6 +246,11 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
                 description="Send a prompt to multiple LLM models",
                 inputSchema=PromptSchema.schema(),
             ),
+            Tool(
+                name=JustPromptTools.PROMPT_FASTEST,
+                description="Race a prompt across several models and return the first successful response, cancelling the rest",
+                inputSchema=PromptFastestSchema.schema(),
+            ),
             Tool(
                 name=JustPromptTools.PROMPT_FROM_FILE,
                 description="Send a prompt from a file to multiple LLM models",
@@ -157,39 +284,62 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
         logger.info(f"Tool call: {name}, arguments: {arguments}")
         
         try:
+            cache_mode = cache_mode_from_flags(
+                arguments.get("bypass_cache", False), arguments.get("refresh_cache", False)
+            )
+            
             if name == JustPromptTools.PROMPT:
                 models_to_use = arguments.get("models_prefixed_by_provider")
-                responses = prompt(arguments["text"], models_to_use)
+                answered_by = {}
+                responses = await run_blocking(
+                    prompt, arguments["text"], models_to_use, progress_streamer(), cache_mode, answered_by.__setitem__
+                )
                 
                 # Get the model names that were actually used
                 models_used = models_to_use if models_to_use else [model.strip() for model in os.environ.get("DEFAULT_MODELS", DEFAULT_MODEL).split(",")]
                 
                 return [TextContent(
                     type="text",
-                    text="\n".join([f"Model: {models_used[i]}\nResponse: {resp}" 
-                                  for i, resp in enumerate(responses)])
+                    text=format_responses(models_used, responses, answered_by)
+                )]
+                
+            elif name == JustPromptTools.PROMPT_FASTEST:
+                result = await run_blocking(
+                    prompt_fastest, arguments["text"], arguments.get("models_prefixed_by_provider"), cache_mode
+                )
+                
+                result_text = f"Winner: {result['model']}\nLatency: {result['latency']:.2f}s\nResponse: {result['response']}"
+                if result["errors"]:
+                    result_text += "\nFailed before the winner:\n" + "\n".join(f"- {error}" for error in result["errors"])
+                return [TextContent(
+                    type="text",
+                    text=result_text
                 )]
                 
             elif name == JustPromptTools.PROMPT_FROM_FILE:
                 models_to_use = arguments.get("models_prefixed_by_provider")
-                responses = prompt_from_file(arguments["file"], models_to_use)
+                answered_by = {}
+                responses = await run_blocking(
+                    prompt_from_file, arguments["file"], models_to_use, progress_streamer(), cache_mode, answered_by.__setitem__
+                )
                 
                 # Get the model names that were actually used
                 models_used = models_to_use if models_to_use else [model.strip() for model in os.environ.get("DEFAULT_MODELS", DEFAULT_MODEL).split(",")]
                 
                 return [TextContent(
                     type="text",
-                    text="\n".join([f"Model: {models_used[i]}\nResponse: {resp}" 
-                                  for i, resp in enumerate(responses)])
+                    text=format_responses(models_used, responses, answered_by)
                 )]
                 
             elif name == JustPromptTools.PROMPT_FROM_FILE_TO_FILE:
                 output_dir = arguments.get("output_dir", ".")
                 models_to_use = arguments.get("models_prefixed_by_provider")
-                file_paths = prompt_from_file_to_file(
+                file_paths = await run_blocking(
+                    prompt_from_file_to_file,
                     arguments["file"], 
                     models_to_use,
-                    output_dir
+                    output_dir,
+                    cache_mode
                 )
                 return [TextContent(
                     type="text",
@@ -200,14 +350,19 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
                 providers = list_providers_func()
                 provider_text = "\nAvailable Providers:\n"
                 for provider in providers:
-                    provider_text += f"- {provider['name']}: full_name='{provider['full_name']}', short_name='{provider['short_name']}'\n"
+                    provider_text += f"- {provider['name']}: full_name='{provider['full_name']}', short_name='{provider['short_name']}', circuit='{provider['circuit']}'"
+                    if provider["model_circuits"]:
+                        provider_text += ", model_circuits=" + ", ".join(
+                            f"{model}='{state}'" for model, state in provider["model_circuits"].items()
+                        )
+                    provider_text += "\n"
                 return [TextContent(
                     type="text",
                     text=provider_text
                 )]
                 
             elif name == JustPromptTools.LIST_MODELS:
-                models = list_models_func(arguments["provider"])
+                models = await run_blocking(list_models_func, arguments["provider"])
                 return [TextContent(
                     type="text",
                     text=f"Models for provider '{arguments['provider']}':\n" + 
@@ -219,20 +374,33 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
                 output_dir = arguments.get("output_dir", ".")
                 models_to_use = arguments.get("models_prefixed_by_provider")
                 ceo_model = arguments.get("ceo_model", DEFAULT_CEO_MODEL)
+                reused = []
                 
-                ceo_decision_file = ceo_and_board_prompt(
+                ceo_decision_file = await run_blocking(
+                    ceo_and_board_prompt,
                     from_file=file_path,
                     output_dir=output_dir,
                     models_prefixed_by_provider=models_to_use,
-                    ceo_model=ceo_model
+                    ceo_model=ceo_model,
+                    ceo_models=arguments.get("ceo_models"),
+                    merge_model=arguments.get("merge_model"),
+                    cache_mode=cache_mode,
+                    board_quorum=arguments.get("board_quorum"),
+                    board_deadline=arguments.get("board_deadline"),
+                    ceo_max_tokens=arguments.get("ceo_max_tokens"),
+                    compression_model=arguments.get("compression_model"),
+                    on_reused=reused.append,
                 )
                 
                 # Get the CEO prompt file path
                 ceo_prompt_file = str(Path(ceo_decision_file).parent / "ceo_prompt.xml")
                 
+                result_text = f"Board responses and CEO decision saved.\nCEO prompt file: {ceo_prompt_file}\nCEO decision file: {ceo_decision_file}"
+                if reused:
+                    result_text += "\nReused stored board answers from an earlier run: " + ", ".join(reused)
                 return [TextContent(
                     type="text",
-                    text=f"Board responses and CEO decision saved.\nCEO prompt file: {ceo_prompt_file}\nCEO decision file: {ceo_decision_file}"
+                    text=result_text
                 )]
                 
             else:
@@ -255,4 +423,6 @@ async def serve(default_models: str = DEFAULT_MODEL) -> None:
             await server.run(read_stream, write_stream, options, raise_exceptions=True)
     except Exception as e:
         logger.error(f"Error running server: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        tool_executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -89,4 +89,12 @@ def test_prompt_with_thinking():
     # Assertions (should still work with a corrected budget of 1024)
     assert isinstance(response, str)
     assert len(response) > 0
-    assert "rome" in response.lower() or "Rome" in response
\ No newline at end of file
+    assert "rome" in response.lower() or "Rome" in response
+
+
+def test_stream_prompt():
+    """Test streaming a prompt to Anthropic."""
+    chunks = list(anthropic.stream_prompt("What is the capital of France?", "claude-sonnet-4-20250514"))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "paris" in "".join(chunks).lower()
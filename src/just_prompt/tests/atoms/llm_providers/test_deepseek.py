@@ -28,4 +28,12 @@ def test_prompt():
     response = deepseek.prompt("What is the capital of France?", "deepseek-coder")
     assert isinstance(response, str)
     assert len(response) > 0
-    assert "paris" in response.lower() or "Paris" in response
\ No newline at end of file
+    assert "paris" in response.lower() or "Paris" in response
+
+
+def test_stream_prompt():
+    """Test streaming a prompt to DeepSeek."""
+    chunks = list(deepseek.stream_prompt("What is the capital of France?", "deepseek-coder"))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "paris" in "".join(chunks).lower()
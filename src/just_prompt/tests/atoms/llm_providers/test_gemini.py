@@ -93,4 +93,12 @@ def test_prompt_without_thinking():
     # Assertions
     assert isinstance(response, str)
     assert len(response) > 0
-    assert "berlin" in response.lower() or "Berlin" in response, f"Expected 'Berlin' in response: {response}"
\ No newline at end of file
+    assert "berlin" in response.lower() or "Berlin" in response, f"Expected 'Berlin' in response: {response}"
+
+
+def test_stream_prompt():
+    """Test streaming a prompt to Gemini."""
+    chunks = list(gemini.stream_prompt("What is the capital of France?", "gemini-1.5-flash"))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "paris" in "".join(chunks).lower()
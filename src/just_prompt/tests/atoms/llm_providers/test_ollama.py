@@ -29,3 +29,11 @@ def test_prompt():
     assert isinstance(response, str)
     assert len(response) > 0
     assert "paris" in response.lower() or "Paris" in response
+
+
+def test_stream_prompt():
+    """Test streaming a prompt to Ollama."""
+    chunks = list(ollama.stream_prompt("What is the capital of France?", "gemma3:12b"))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "paris" in "".join(chunks).lower()
@@ -65,4 +65,12 @@ def test_prompt_with_reasoning(model_suffix):
     # Assertions
     assert isinstance(response, str)
     assert len(response) > 0
-    assert "madrid" in response.lower() or "Madrid" in response
\ No newline at end of file
+    assert "madrid" in response.lower() or "Madrid" in response
+
+
+def test_stream_prompt():
+    """Test streaming a prompt to OpenAI."""
+    chunks = list(openai.stream_prompt("What is the capital of France?", "o4-mini"))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, str) for chunk in chunks)
+    assert "paris" in "".join(chunks).lower()
@@ -0,0 +1,70 @@
+"""
+Tests for the board store.
+"""
+
+import json
+from unittest.mock import patch
+
+from just_prompt.atoms.shared import board_store
+from just_prompt.atoms.shared.board_store import BoardStore, board_prompt_hash, get_board_store
+
+
+def test_board_prompt_hash():
+    """Test that the key depends on the prompt text only, ignoring line ending style."""
+    assert board_prompt_hash("Ship it?\r\nNow") == board_prompt_hash("Ship it?\nNow")
+    assert board_prompt_hash("Ship it?") != board_prompt_hash("Ship it!")
+
+
+def test_get_returns_only_stored_members():
+    """Test that a board lookup returns the members with an answer and counts the rest as misses."""
+    store = BoardStore()
+    key = board_prompt_hash("Ship it?")
+    with patch("just_prompt.atoms.shared.board_store.time.time", return_value=1000.0):
+        store.put(key, "a:claude-3|o:gpt-4o", "o:gpt-4o", "Yes")
+        found = store.get(key, ["a:claude-3|o:gpt-4o", "g:gemini"])
+
+    assert found == {"a:claude-3|o:gpt-4o": ("o:gpt-4o", "Yes", 1000.0)}
+    assert store.get(board_prompt_hash("Other"), ["a:claude-3|o:gpt-4o"]) == {}
+    assert (store.hits, store.misses) == (1, 2)
+
+
+def test_expired_answers_are_ignored():
+    """Test that answers older than the TTL are not reused."""
+    store = BoardStore(ttl=60)
+    key = board_prompt_hash("Ship it?")
+    with patch("just_prompt.atoms.shared.board_store.time.time", return_value=1000.0):
+        store.put(key, "a:claude-3", "a:claude-3", "Yes")
+    with patch("just_prompt.atoms.shared.board_store.time.time", return_value=1061.0):
+        assert store.get(key, ["a:claude-3"]) == {}
+
+
+def test_disabled_store_keeps_nothing():
+    """Test that a disabled store neither stores nor returns answers."""
+    store = BoardStore(enabled=False)
+    key = board_prompt_hash("Ship it?")
+    store.put(key, "a:claude-3", "a:claude-3", "Yes")
+    assert store.get(key, ["a:claude-3"]) == {}
+
+
+def test_boards_persist_across_instances(tmp_path):
+    """Test that stored boards are written to the directory and loaded by a new store."""
+    key = board_prompt_hash("Ship it?")
+    with patch("just_prompt.atoms.shared.board_store.time.time", return_value=1000.0):
+        BoardStore(directory=tmp_path).put(key, "a:claude-3", "a:claude-3", "Yes")
+        assert json.loads((tmp_path / f"{key}.json").read_text())["members"]["a:claude-3"]["response"] == "Yes"
+
+        store = BoardStore(directory=tmp_path)
+        assert store.get(key, ["a:claude-3"]) == {"a:claude-3": ("a:claude-3", "Yes", 1000.0)}
+
+    (tmp_path / f"{key}.json").write_text("not json")
+    assert BoardStore(directory=tmp_path).get(key, ["a:claude-3"]) == {}
+
+
+def test_store_is_off_by_default(monkeypatch):
+    """Test that the process-wide store neither reuses nor persists answers unless enabled."""
+    monkeypatch.delenv("BOARD_STORE", raising=False)
+    monkeypatch.delenv("BOARD_STORE_PERSIST", raising=False)
+    monkeypatch.setattr(board_store, "_board_store", None)
+    store = get_board_store()
+    assert store.enabled is False
+    assert store.directory is None
@@ -0,0 +1,147 @@
+"""
+Tests for provider and model circuit breakers.
+"""
+
+import httpx
+import pytest
+from types import SimpleNamespace
+from just_prompt.atoms.shared.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    parse_fallbacks,
+)
+
+
+class FakeStatusError(Exception):
+    """Mimics an SDK error that carries an HTTP status code."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+def test_opens_after_consecutive_failures():
+    """Test that a run of failures opens the breaker and a success resets the run."""
+    breaker = CircuitBreaker(failure_threshold=3, min_calls=100)
+    breaker.record(True, 0)
+    breaker.record(True, 0)
+    breaker.record(False, 0)
+    breaker.record(True, 0)
+    breaker.record(True, 0)
+    assert breaker.state == CLOSED
+
+    assert breaker.record(True, 0) == OPEN
+    assert not breaker.allow(1)
+
+
+def test_opens_on_error_rate():
+    """Test that a high error rate over the window opens the breaker without a failure run."""
+    breaker = CircuitBreaker(failure_threshold=100, error_rate=0.5, window=10, min_calls=10)
+    for _ in range(4):
+        breaker.record(True, 0)
+        breaker.record(False, 0)
+    breaker.record(True, 0)
+    assert breaker.state == CLOSED
+
+    assert breaker.record(True, 0) == OPEN
+
+
+def test_half_open_lets_one_probe_through():
+    """Test the cooldown, the single half-open probe, and how its outcome settles the state."""
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record(True, 0)
+    assert not breaker.allow(5)
+
+    assert breaker.allow(10)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(10)
+
+    # A failed probe re-opens the breaker for another cooldown
+    assert breaker.record(True, 10) == OPEN
+    assert not breaker.allow(15)
+
+    assert breaker.allow(20)
+    assert breaker.record(False, 20) == CLOSED
+    assert breaker.allow(20) and breaker.allow(20)
+
+
+def test_fail_fast_after_transient_failures():
+    """Test that transient model failures open the model breaker and calls then fail fast."""
+    breakers = CircuitBreakers(failure_threshold=2)
+    for _ in range(2):
+        breakers.before_call("openai", "o3")
+        breakers.record("openai", "o3", FakeStatusError(503))
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breakers.before_call("openai", "o3")
+    assert (excinfo.value.provider_name, excinfo.value.model) == ("openai", "o3")
+
+    # A 5xx says nothing about the provider as a whole
+    breakers.before_call("openai", "o4-mini")
+    states = breakers.states()
+    assert states["openai"]["state"] == CLOSED
+    assert states["openai:o3"]["state"] == OPEN
+
+
+def test_connection_errors_open_the_provider_breaker():
+    """Test that failing to reach a provider blocks all of its models."""
+    breakers = CircuitBreakers(failure_threshold=2)
+    for model in ("llama3", "phi4"):
+        breakers.before_call("ollama", model)
+        breakers.record("ollama", model, ValueError("Failed to get response from Ollama: connection refused"))
+    breakers.before_call("ollama", "llama3")
+
+    for model in ("llama3", "phi4"):
+        breakers.before_call("ollama", model)
+        breakers.record("ollama", model, httpx.ConnectError("connection refused"))
+
+    with pytest.raises(CircuitOpenError):
+        breakers.before_call("ollama", "qwen3")
+
+
+def test_client_errors_do_not_count():
+    """Test that errors caused by the request itself leave the breakers closed."""
+    breakers = CircuitBreakers(failure_threshold=1)
+    for status_code in (400, 401, 404, 429):
+        breakers.before_call("anthropic", "claude")
+        breakers.record("anthropic", "claude", FakeStatusError(status_code))
+    breakers.before_call("anthropic", "claude")
+
+
+def test_half_open_probe_is_shared_across_breakers():
+    """Test that a blocked model does not take the provider's probe."""
+    breakers = CircuitBreakers(failure_threshold=1, cooldown=0)
+    breakers.before_call("groq", "a")
+    breakers.record("groq", "a", httpx.ConnectError("down"))
+
+    # Both breakers are half-open; the first call claims both probes
+    breakers.before_call("groq", "a")
+    with pytest.raises(CircuitOpenError):
+        breakers.before_call("groq", "a")
+    breakers.record("groq", "a")
+    assert {state["state"] for state in breakers.states().values()} == {CLOSED}
+
+
+def test_disabled_breakers_never_open():
+    """Test that disabled breakers let every call through."""
+    breakers = CircuitBreakers(enabled=False, failure_threshold=1)
+    for _ in range(3):
+        breakers.before_call("groq", "a")
+        breakers.record("groq", "a", httpx.ConnectError("down"))
+    assert breakers.states() == {}
+
+
+def test_parse_fallbacks():
+    """Test fallback parsing with short names, model keys and invalid entries."""
+    fallbacks = parse_fallbacks("a=o:gpt-4o, q:llama3=l:llama3,nope=o:gpt-4o,o=gpt-4o")
+    assert fallbacks == {"anthropic": "o:gpt-4o", "groq:llama3": "l:llama3"}
+
+    breakers = CircuitBreakers(fallbacks=fallbacks)
+    assert breakers.fallback_for("groq", "llama3") == "l:llama3"
+    assert breakers.fallback_for("groq", "other") is None
+    assert breakers.fallback_for("anthropic", "claude") == "o:gpt-4o"
@@ -0,0 +1,45 @@
+"""
+Tests for the model correction memo.
+"""
+
+from just_prompt.atoms.shared.correction_memo import CorrectionMemo
+
+
+def test_get_and_put_count_hits_and_misses():
+    """Test memo lookups and counters."""
+    memo = CorrectionMemo()
+    assert memo.get("openai", "4o", "v1") is None
+
+    memo.put("openai", "4o", "v1", "gpt-4o")
+    assert memo.get("openai", "4o", "v1") == "gpt-4o"
+    assert memo.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_catalog_version_is_part_of_the_key():
+    """Test that a new catalog version invalidates old corrections."""
+    memo = CorrectionMemo()
+    memo.put("openai", "4o", "v1", "gpt-4o")
+    assert memo.get("openai", "4o", "v2") is None
+
+
+def test_max_entries_evicts_least_recently_used():
+    """Test that the memo is bounded."""
+    memo = CorrectionMemo(max_entries=2)
+    memo.put("openai", "a", "v1", "A")
+    memo.put("openai", "b", "v1", "B")
+    memo.get("openai", "a", "v1")
+    memo.put("openai", "c", "v1", "C")
+
+    assert memo.get("openai", "b", "v1") is None
+    assert memo.get("openai", "a", "v1") == "A"
+    assert memo.get("openai", "c", "v1") == "C"
+
+
+def test_persistence(tmp_path):
+    """Test that corrections survive a restart when persisted."""
+    persist_path = tmp_path / "model_corrections.json"
+    memo = CorrectionMemo(persist_path=persist_path)
+    memo.put("anthropic", "sonnet-4", "v1", "claude-sonnet-4-20250514")
+
+    restored = CorrectionMemo(persist_path=persist_path)
+    assert restored.get("anthropic", "sonnet-4", "v1") == "claude-sonnet-4-20250514"
@@ -0,0 +1,245 @@
+"""
+Tests for hedged requests.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+import pytest
+from just_prompt.atoms.shared import hedging
+from just_prompt.atoms.shared.circuit_breaker import CircuitBreakers
+from just_prompt.atoms.shared.hedging import (
+    Hedger,
+    HedgeCancelled,
+    LatencyTracker,
+    LATENCY_FIRST_CHUNK,
+    LATENCY_RESPONSE,
+)
+from just_prompt.atoms.shared.http_pool import _request_scope
+from just_prompt.atoms.shared.rate_limiter import RateLimiter
+from just_prompt.atoms.shared.scheduler import Scheduler
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(monkeypatch):
+    """Give the hedger its own scheduler, rate limiter and breakers."""
+    limits = {
+        "scheduler": Scheduler(max_workers=4, provider_limits={"openai": 2}),
+        "rate_limiter": RateLimiter(),
+        "breakers": CircuitBreakers(),
+    }
+    monkeypatch.setattr(hedging, "get_scheduler", lambda: limits["scheduler"])
+    monkeypatch.setattr(hedging, "get_rate_limiter", lambda: limits["rate_limiter"])
+    monkeypatch.setattr(hedging, "get_circuit_breakers", lambda: limits["breakers"])
+    yield limits
+    limits["scheduler"].shutdown(wait=False)
+
+
+def primed_hedger(kind=LATENCY_RESPONSE, **kwargs):
+    """Build an enabled hedger whose history says the model answers in about 10ms."""
+    hedger = Hedger(enabled=True, max_percent=100, min_samples=5, **kwargs)
+    for _ in range(5):
+        hedger.latency.record("openai:o3", kind, 0.01)
+    return hedger
+
+
+def slow_then_fast():
+    """Build a call whose first attempt stalls and whose later attempts answer at once."""
+    attempts = itertools.count()
+
+    def call(stream_chunk):
+        if next(attempts) == 0:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+    return call
+
+
+def test_latency_percentile():
+    """Test percentile lookups and the minimum sample requirement."""
+    tracker = LatencyTracker(history=100)
+    assert tracker.percentile("openai:o3", LATENCY_RESPONSE, 95) is None
+    for seconds in range(1, 101):
+        tracker.record("openai:o3", LATENCY_RESPONSE, seconds)
+
+    assert tracker.percentile("openai:o3", LATENCY_RESPONSE, 95) == 95
+    assert tracker.percentile("openai:o3", LATENCY_RESPONSE, 50) == 50
+    assert tracker.percentile("openai:o3", LATENCY_FIRST_CHUNK, 50) is None
+    assert tracker.percentile("openai:o3", LATENCY_RESPONSE, 50, min_samples=200) is None
+
+
+def test_slow_request_is_hedged():
+    """Test that a request slower than the model's percentile gets a duplicate that wins."""
+    hedger = primed_hedger()
+
+    started = time.monotonic()
+    assert hedger.run("openai:o3", slow_then_fast()) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert hedger.stats() == {"requests": 1, "hedged": 1, "hedge_wins": 1}
+
+
+def test_latency_is_recorded_for_the_primary_from_the_start_of_the_request():
+    """Test that a hedge win still records how long the primary had been waiting, not the hedge's own time."""
+    hedger = primed_hedger()
+    recorded = []
+    record = hedger.latency.record
+    hedger.latency.record = lambda *args: (recorded.append(args), record(*args))
+
+    started = time.monotonic()
+    assert hedger.run("openai:o3", slow_then_fast()) == "fast"
+    elapsed = time.monotonic() - started
+
+    assert len(recorded) == 1
+    model_spec, kind, seconds = recorded[0]
+    assert (model_spec, kind) == ("openai:o3", LATENCY_RESPONSE)
+    # At least the hedge threshold the primary sat through, at most the whole request
+    assert 0.01 <= seconds <= elapsed
+
+
+def test_hedge_runs_on_the_scheduler_and_closes_the_loser(fresh_limits):
+    """Test that the hedge counts against the provider's slots and the losing attempt is cancelled."""
+    hedger = primed_hedger()
+    scopes = []
+    attempts = itertools.count()
+
+    def call(stream_chunk):
+        scopes.append(_request_scope.get())
+        if next(attempts) == 0:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    assert hedger.run("openai:o3", call) == "fast"
+    assert scopes[0].cancelled and not scopes[1].cancelled
+    time.sleep(0.05)
+    assert fresh_limits["scheduler"].stats()["providers"]["openai"]["completed"] == 1
+
+
+@pytest.mark.parametrize("pressure", ["scheduler", "rate_limiter", "breakers"])
+def test_no_hedge_under_pressure(fresh_limits, pressure):
+    """Test that a provider that is out of slots, throttled or failing is not hedged."""
+    release = threading.Event()
+    if pressure == "scheduler":
+        for _ in range(2):
+            fresh_limits["scheduler"].submit(release.wait, provider="openai")
+    elif pressure == "rate_limiter":
+        fresh_limits["rate_limiter"].observe_headers(
+            "openai", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "5s"}, "o3"
+        )
+    else:
+        fresh_limits["breakers"].record("openai", "o3", ConnectionError("reset"))
+
+    hedger = primed_hedger()
+    try:
+        assert hedger.run("openai:o3", slow_then_fast()) == "slow"
+    finally:
+        release.set()
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_fast_request_is_not_hedged():
+    """Test that requests answering within the threshold are sent once."""
+    hedger = primed_hedger()
+    calls = []
+
+    def call(stream_chunk):
+        calls.append(1)
+        return "Paris"
+
+    assert hedger.run("openai:o3", call) == "Paris"
+    assert len(calls) == 1
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_hedge_budget_caps_hedges():
+    """Test that hedges stay within the configured share of traffic."""
+    hedger = primed_hedger()
+    hedger.max_percent = 0
+
+    assert hedger.run("openai:o3", slow_then_fast()) == "slow"
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_no_hedging_without_history_or_when_disabled():
+    """Test that unknown models and disabled hedgers run once and build history."""
+    for hedger in (Hedger(enabled=True, min_samples=5), Hedger(enabled=False)):
+        assert hedger.run("openai:o3", lambda stream_chunk: "Paris") == "Paris"
+        assert hedger.stats()["hedged"] == 0
+        assert hedger.latency.percentile("openai:o3", LATENCY_RESPONSE, 50) is not None
+
+
+def test_streaming_hedge_cancels_losing_stream():
+    """Test that the first attempt to stream claims the output and the other stops."""
+    hedger = primed_hedger(kind=LATENCY_FIRST_CHUNK)
+    attempts = itertools.count()
+    cancelled = threading.Event()
+
+    def call(stream_chunk):
+        attempt = next(attempts)
+        if attempt == 0:
+            time.sleep(0.3)
+        chunks = ["slow ", "answer"] if attempt == 0 else ["fast ", "answer"]
+        try:
+            for chunk in chunks:
+                stream_chunk(chunk)
+        except HedgeCancelled:
+            cancelled.set()
+            raise
+        return "".join(chunks)
+
+    received = []
+    assert hedger.run("openai:o3", call, received.append) == "fast answer"
+    assert received == ["fast ", "answer"]
+    assert cancelled.wait(1)
+
+
+def test_primary_error_without_hedge_is_raised():
+    """Test that a failure before the threshold surfaces unchanged."""
+    hedger = primed_hedger()
+
+    def call(stream_chunk):
+        raise ValueError("Failed to get response from OpenAI: boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        hedger.run("openai:o3", call)
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_async_slow_request_is_hedged_and_the_loser_cancelled():
+    """Test that async requests are hedged on the event loop and the losing task is cancelled."""
+    hedger = primed_hedger()
+    attempts = itertools.count()
+    cancelled = []
+
+    async def call():
+        if next(attempts) == 0:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert asyncio.run(hedger.arun("openai:o3", call)) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert cancelled == [True]
+    assert hedger.stats() == {"requests": 1, "hedged": 1, "hedge_wins": 1}
+
+
+def test_async_no_hedge_under_pressure(fresh_limits):
+    """Test that a failing provider is not hedged on the async path either."""
+    fresh_limits["breakers"].record("openai", "o3", ConnectionError("reset"))
+    hedger = primed_hedger()
+    attempts = itertools.count()
+
+    async def call():
+        if next(attempts) == 0:
+            await asyncio.sleep(0.1)
+            return "slow"
+        return "fast"
+
+    assert asyncio.run(hedger.arun("openai:o3", call)) == "slow"
+    assert hedger.stats()["hedged"] == 0
@@ -0,0 +1,135 @@
+"""
+Tests for the shared HTTP connection pool.
+"""
+
+import asyncio
+import http.server
+import threading
+import time
+import httpx
+import pytest
+from just_prompt.atoms.shared.http_pool import HttpPool, RequestScope, request_deadline, request_scope
+
+
+@pytest.fixture
+def local_server():
+    """Serve small keep-alive responses on a local port."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/slow":
+                time.sleep(1)
+            body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_share_one_keep_alive_pool(local_server):
+    """Test that separate clients reuse the same idle connection."""
+    pool = HttpPool(max_connections=4)
+    first, second = pool.client(), pool.client()
+
+    assert first.get(local_server).text == "ok"
+    assert second.get(local_server).text == "ok"
+
+    stats = pool.stats()
+    assert stats["connections"] == 1
+    assert stats["idle"] == 1
+    assert stats["active"] == 0
+    assert stats["max_connections"] == 4
+
+
+def test_pool_settings():
+    """Test timeouts, keep-alive limits and event hooks on built clients."""
+    pool = HttpPool(max_connections=8, max_keepalive_connections=2, connect_timeout=3, read_timeout=30)
+    hook = lambda response: None
+    client = pool.client({"response": [hook]})
+
+    assert client.timeout.connect == 3
+    assert client.timeout.read == 30
+    assert client.event_hooks["response"] == [hook]
+    assert pool.limits.max_keepalive_connections == 2
+    assert pool.stats()["connections"] == 0
+    assert pool.async_client().timeout.read == 30
+    assert pool.stats()["event_loops"] == 0
+
+
+def test_async_clients_get_a_pool_per_event_loop(local_server):
+    """Test that one async client works from several event loops, each on its own pool."""
+    pool = HttpPool(max_connections=4)
+    client = pool.async_client()
+
+    async def fetch_concurrently():
+        responses = await asyncio.gather(*(client.get(local_server) for _ in range(3)))
+        return asyncio.get_running_loop(), pool.loop_transport(), [response.text for response in responses]
+
+    first_loop, first_transport, first_texts = asyncio.run(fetch_concurrently())
+    second_loop, second_transport, second_texts = asyncio.run(fetch_concurrently())
+
+    assert first_texts == second_texts == ["ok"] * 3
+    assert first_transport is not second_transport
+    assert pool.stats()["event_loops"] == 2
+
+
+def test_http2_needs_h2():
+    """Test that HTTP/2 is only enabled when the h2 package is installed."""
+    try:
+        import h2  # noqa: F401
+        installed = True
+    except ImportError:
+        installed = False
+    assert HttpPool(http2=True).http2 == installed
+    assert HttpPool().http2 is False
+
+
+def test_request_deadline_caps_timeouts(local_server):
+    """Test that a request outliving the context's deadline times out."""
+    client = HttpPool().client()
+    started = time.monotonic()
+    with request_deadline(0.2):
+        with pytest.raises(httpx.TimeoutException):
+            client.get(f"{local_server}/slow")
+    assert time.monotonic() - started < 0.9
+
+    with request_deadline(0):
+        with pytest.raises(httpx.TimeoutException, match="deadline"):
+            client.get(local_server)
+    assert client.get(local_server).text == "ok"
+
+
+def test_cancelled_scope_closes_responses_and_fails_new_requests(local_server):
+    """Test that cancelling a request scope closes its open responses and stops further requests."""
+    client = HttpPool().client()
+    scope = RequestScope()
+    with request_scope(scope):
+        with client.stream("GET", local_server) as response:
+            scope.cancel()
+            assert response.is_closed
+        with pytest.raises(httpx.RequestError, match="cancelled"):
+            client.get(local_server)
+    assert client.get(local_server).text == "ok"
+
+
+def test_child_scopes_are_cancelled_with_their_parent(local_server):
+    """Test that cancelling a scope closes the responses of scopes created under it, even later ones."""
+    client = HttpPool().client()
+    parent = RequestScope()
+    child = RequestScope(parent)
+    with request_scope(child):
+        with client.stream("GET", local_server) as response:
+            parent.cancel()
+            assert response.is_closed
+    assert child.cancelled
+    assert RequestScope(parent).cancelled
@@ -0,0 +1,174 @@
+"""
+Tests for the model catalog cache.
+"""
+
+import pytest
+import time
+from unittest.mock import MagicMock
+from just_prompt.atoms.shared.model_catalog import ModelCatalog, catalog_version
+
+
+def test_get_caches_within_ttl():
+    """Test that a fresh entry is served without calling the loader again."""
+    loader = MagicMock(return_value=["model1", "model2"])
+    catalog = ModelCatalog(ttl=60, stale_ttl=60, loader=loader)
+
+    assert catalog.get("openai") == ["model1", "model2"]
+    assert catalog.get("openai") == ["model1", "model2"]
+    loader.assert_called_once_with("openai")
+
+
+def test_stale_entry_is_served_while_refreshing():
+    """Test stale-while-revalidate behaviour."""
+    loader = MagicMock(return_value=["new-model"])
+    catalog = ModelCatalog(ttl=60, stale_ttl=600, loader=loader)
+    catalog.put("openai", ["old-model"], fetched_at=time.time() - 120)
+
+    # Stale entry returned immediately
+    assert catalog.get("openai") == ["old-model"]
+
+    # Background refresh eventually replaces it
+    deadline = time.time() + 2
+    while catalog.get("openai") != ["new-model"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert catalog.get("openai") == ["new-model"]
+
+
+def test_expired_entry_is_reloaded_synchronously():
+    """Test that entries past the stale window are reloaded before returning."""
+    loader = MagicMock(return_value=["new-model"])
+    catalog = ModelCatalog(ttl=1, stale_ttl=1, loader=loader)
+    catalog.put("openai", ["old-model"], fetched_at=time.time() - 10)
+
+    assert catalog.get("openai") == ["new-model"]
+    loader.assert_called_once_with("openai")
+
+
+def test_expired_entry_served_when_reload_fails():
+    """Test that a failing reload falls back to the stale entry."""
+    loader = MagicMock(side_effect=RuntimeError("provider down"))
+    catalog = ModelCatalog(ttl=1, stale_ttl=1, loader=loader)
+    catalog.put("ollama", ["llama3"], fetched_at=time.time() - 10)
+
+    assert catalog.get("ollama") == ["llama3"]
+
+
+def test_failed_listing_serves_known_models_briefly(tmp_path):
+    """Test that a failed listing serves the known models as degraded, for the negative TTL only and never saved."""
+    loader = MagicMock(side_effect=[ValueError("provider down"), ["o3", "gpt-4o"]])
+    catalog = ModelCatalog(ttl=60, stale_ttl=60, negative_ttl=30, loader=loader, fallback=lambda name: ["o4-mini"])
+    catalog.snapshot_path = tmp_path / "model_catalog.json"
+
+    entry = catalog.get_entry("openai")
+    assert entry.models == ["o4-mini"]
+    assert entry.degraded
+    assert not catalog.snapshot_path.exists()
+
+    # Inside the negative TTL the provider is not asked again
+    assert catalog.get_entry("openai") is entry
+    assert catalog.recent_failure("openai") is entry
+    assert loader.call_count == 1
+
+    # Once it ends, the next lookup asks the provider again
+    entry.fetched_at -= 31
+    assert catalog.recent_failure("openai") is None
+    entry = catalog.get_entry("openai")
+    assert entry.models == ["o3", "gpt-4o"]
+    assert not entry.degraded
+    assert loader.call_count == 2
+
+    # Without known models the listing error surfaces
+    failing = ModelCatalog(loader=MagicMock(side_effect=ValueError("provider down")), fallback=lambda name: [])
+    with pytest.raises(ValueError, match="provider down"):
+        failing.get("ollama")
+
+
+def test_degraded_entries_are_left_out_of_snapshots(tmp_path):
+    """Test that only listed catalogs are saved, and known models never replace a listed catalog."""
+    catalog = ModelCatalog()
+    catalog.put("openai", ["o3"])
+    catalog.put_degraded("openai", ["o4-mini"])
+    catalog.put_degraded("groq", ["llama3"])
+    assert catalog.get("openai") == ["o3"]
+
+    path = tmp_path / "model_catalog.json"
+    catalog.save_snapshot(path)
+    restored = ModelCatalog()
+    assert restored.load_snapshot(path) == 1
+    assert restored.get("openai") == ["o3"]
+
+
+def test_max_entries_evicts_least_recently_used():
+    """Test that the catalog never holds more than max_entries providers."""
+    loader = MagicMock(side_effect=lambda name: [f"{name}-model"])
+    catalog = ModelCatalog(ttl=60, max_entries=2, loader=loader)
+
+    catalog.get("openai")
+    catalog.get("anthropic")
+    catalog.get("openai")
+    catalog.get("groq")
+
+    assert len(catalog._entries) == 2
+    assert "anthropic" not in catalog._entries
+
+
+def test_version_changes_with_models():
+    """Test that the catalog version tracks the set of models."""
+    assert catalog_version(["a", "b"]) == catalog_version(["b", "a"])
+    assert catalog_version(["a", "b"]) != catalog_version(["a", "c"])
+
+    catalog = ModelCatalog(loader=lambda name: ["a", "b"])
+    assert catalog.version("openai") == catalog_version(["a", "b"])
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that a saved snapshot can be loaded into a fresh catalog."""
+    snapshot_path = tmp_path / "model_catalog.json"
+    catalog = ModelCatalog(loader=lambda name: [f"{name}-model"])
+    catalog.get("openai")
+    catalog.get("groq")
+    catalog.save_snapshot(snapshot_path)
+
+    loader = MagicMock(return_value=["unused"])
+    restored = ModelCatalog(loader=loader)
+    assert restored.load_snapshot(snapshot_path) == 2
+    assert restored.get("openai") == ["openai-model"]
+    assert restored.get("groq") == ["groq-model"]
+    loader.assert_not_called()
+
+
+def test_old_snapshot_is_served_without_network(tmp_path):
+    """Test that old snapshot entries are served immediately after a restart."""
+    snapshot_path = tmp_path / "model_catalog.json"
+    catalog = ModelCatalog(loader=lambda name: ["claude-sonnet-4-20250514"])
+    catalog.get("anthropic")
+    catalog._entries["anthropic"].fetched_at = time.time() - 10 * 86400
+    catalog.save_snapshot(snapshot_path)
+
+    loader = MagicMock(side_effect=RuntimeError("no network"))
+    restored = ModelCatalog(ttl=60, stale_ttl=600, loader=loader)
+    restored.load_snapshot(snapshot_path)
+
+    assert restored.get("anthropic") == ["claude-sonnet-4-20250514"]
+
+
+def test_snapshot_with_other_format_version_is_ignored(tmp_path):
+    """Test that snapshots from a different format version are not loaded."""
+    snapshot_path = tmp_path / "model_catalog.json"
+    snapshot_path.write_text('{"format_version": 999, "providers": {"openai": {"models": ["x"]}}}')
+
+    catalog = ModelCatalog(loader=lambda name: ["y"])
+    assert catalog.load_snapshot(snapshot_path) == 0
+    assert catalog.load_snapshot(tmp_path / "missing.json") == 0
+
+
+def test_refresh_writes_snapshot(tmp_path):
+    """Test that refreshed catalogs are persisted when a snapshot path is set."""
+    snapshot_path = tmp_path / "cache" / "model_catalog.json"
+    catalog = ModelCatalog(loader=lambda name: ["o3"])
+    catalog.snapshot_path = snapshot_path
+    catalog.get("openai")
+
+    restored = ModelCatalog(loader=MagicMock())
+    assert restored.load_snapshot(snapshot_path) == 1
+    assert restored.get("openai") == ["o3"]
@@ -0,0 +1,139 @@
+"""
+Tests for the local model name resolver.
+"""
+
+import pytest
+from just_prompt.atoms.shared.model_resolver import (
+    ModelResolver,
+    MODEL_ALIASES,
+    edit_distance,
+    normalize_model_name,
+    similarity,
+)
+
+OPENAI_MODELS = [
+    "gpt-4o",
+    "gpt-4o-2024-08-06",
+    "gpt-4o-mini",
+    "gpt-4.1",
+    "o3",
+    "o3-mini",
+    "o4-mini",
+]
+
+ANTHROPIC_MODELS = [
+    "claude-3-7-sonnet-20250219",
+    "claude-3-5-sonnet-20240620",
+    "claude-3-5-sonnet-20241022",
+    "claude-3-5-haiku-20241022",
+    "claude-sonnet-4-20250514",
+    "claude-opus-4-20250514",
+]
+
+
+def test_normalize_model_name():
+    """Test normalization of model names."""
+    assert normalize_model_name("  GPT_4o Mini ") == "gpt-4o-mini"
+    assert normalize_model_name("models/gemini-2.5-pro") == "gemini-2.5-pro"
+
+
+def test_edit_distance():
+    """Test edit distance including adjacent transpositions."""
+    assert edit_distance("gpt-4o", "gpt-4o") == 0
+    assert edit_distance("gtp-4o", "gpt-4o") == 1
+    assert edit_distance("o3-min", "o3-mini") == 1
+    assert edit_distance("", "abc") == 3
+
+
+@pytest.mark.parametrize("requested,expected", [
+    ("4o", "gpt-4o"),
+    ("4o-mini", "gpt-4o-mini"),
+    ("gpt4o", "gpt-4o"),
+    ("GPT-4.1", "gpt-4.1"),
+    ("gpt-4o-mnii", "gpt-4o-mini"),
+    ("gtp-4o", "gpt-4o"),
+    ("o4-mini:high", "o4-mini:high"),
+    ("o4mini:high", "o4-mini:high"),
+])
+def test_resolve_openai(requested, expected):
+    """Test resolving OpenAI shorthands and typos."""
+    resolver = ModelResolver(OPENAI_MODELS, MODEL_ALIASES["openai"])
+    resolved, confidence = resolver.resolve(requested)
+    assert resolved == expected
+    assert confidence >= 0.8
+
+
+@pytest.mark.parametrize("requested,expected", [
+    ("claude-sonnet-4", "claude-sonnet-4-20250514"),
+    ("sonnet-4", "claude-sonnet-4-20250514"),
+    ("sonnet.3.7", "claude-3-7-sonnet-20250219"),
+    ("claude-3.7-sonnet", "claude-3-7-sonnet-20250219"),
+    ("claude-3-5-sonnet", "claude-3-5-sonnet-20241022"),
+    ("claude-sonet-4:4k", "claude-sonnet-4-20250514:4k"),
+])
+def test_resolve_anthropic_date_stripped(requested, expected):
+    """Test resolving date-stripped and reordered Claude names."""
+    resolver = ModelResolver(ANTHROPIC_MODELS)
+    resolved, confidence = resolver.resolve(requested)
+    assert resolved == expected
+    assert confidence >= 0.8
+
+
+def test_resolve_low_confidence():
+    """Test that unrelated names resolve with low confidence."""
+    resolver = ModelResolver(OPENAI_MODELS, MODEL_ALIASES["openai"])
+    _, confidence = resolver.resolve("claude-opus-4")
+    assert confidence < 0.8
+
+
+def test_aliases_require_target_in_catalog():
+    """Test that aliases are ignored when their target is not available."""
+    resolver = ModelResolver(["o3"], MODEL_ALIASES["openai"])
+    resolved, confidence = resolver.resolve("4o")
+    assert resolved != "gpt-4o"
+
+
+def test_resolve_ollama_latest_tag():
+    """Test that untagged Ollama names find the :latest tag."""
+    resolver = ModelResolver(["llama3:latest", "gemma3:27b"])
+    assert resolver.resolve("llama3") == ("llama3:latest", 0.99)
+
+
+def test_dotted_and_dashed_versions_match():
+    """Test that "3.7" and "3-7" are treated as the same version."""
+    assert similarity("sonnet-3.7", "sonnet-3-7") >= 0.98
+    assert similarity("sonnet.3.7", "3-7-sonnet") > similarity("sonnet.3.7", "sonnet-4")
+
+
+def test_conflicting_versions_are_not_resolved():
+    """Test that a shorthand does not settle on a model with a different version."""
+    resolver = ModelResolver(["claude-sonnet-4-20250514"])
+    _, confidence = resolver.resolve("sonnet.3.7")
+    assert confidence < 0.8
+
+
+@pytest.mark.parametrize("requested,models", [
+    ("claude-sonnet-4-5-20250929", ANTHROPIC_MODELS),
+    ("claude-sonnet-4-5", ANTHROPIC_MODELS),
+    ("claude-opus-4-1", ANTHROPIC_MODELS),
+    ("claude-3-haiku", ANTHROPIC_MODELS),
+    ("gpt-4", OPENAI_MODELS + ["gpt-4.1-nano"]),
+    ("gpt-4o-nano", OPENAI_MODELS + ["gpt-4.1-nano"]),
+])
+def test_other_versions_are_not_resolved(requested, models):
+    """Test that a name is never rewritten to a model with a different version."""
+    _, confidence = ModelResolver(models).resolve(requested)
+    assert confidence < 0.8
+
+
+def test_dated_names_are_never_rewritten():
+    """Test that a dated name only resolves to that exact snapshot."""
+    resolver = ModelResolver(ANTHROPIC_MODELS)
+    assert resolver.resolve("claude-sonnet-4-20250101") == (None, 0.0)
+    assert resolver.resolve("Claude_Sonnet_4_20250514") == ("claude-sonnet-4-20250514", 1.0)
+
+
+def test_only_a_trailing_short_version_matches_longer_versions():
+    """Test that "claude-3" may mean a 3.x release but "claude-3-haiku" does not."""
+    assert similarity("claude-3", "claude-3-5") > 0.75
+    assert similarity("claude-3-haiku", "claude-3-5-haiku") < 0.6
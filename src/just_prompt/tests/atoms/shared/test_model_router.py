@@ -4,10 +4,29 @@ Tests for model router.
 
 import pytest
 import os
-from unittest.mock import patch, MagicMock
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
 import importlib
+from just_prompt.atoms.shared import model_router
 from just_prompt.atoms.shared.model_router import ModelRouter
 from just_prompt.atoms.shared.data_types import ModelProviders
+from just_prompt.atoms.shared.model_catalog import get_model_catalog
+from just_prompt.atoms.shared.correction_memo import get_correction_memo
+from just_prompt.atoms.shared.response_cache import ResponseCache, CACHE_REFRESH, CACHE_BYPASS
+from just_prompt.atoms.shared.retry import RetryPolicy
+from just_prompt.atoms.shared.circuit_breaker import CircuitBreakers, CircuitOpenError
+from just_prompt.atoms.shared.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def clear_model_catalog():
+    """Keep mocked model lists and corrections from leaking between tests."""
+    get_model_catalog().invalidate()
+    get_correction_memo().clear()
+    model_router.get_circuit_breakers().reset()
+    yield
+    get_model_catalog().invalidate()
+    get_correction_memo().clear()
 
 
 @patch('importlib.import_module')
@@ -33,6 +52,161 @@ def test_route_prompt(mock_import_module):
         ModelRouter.route_prompt("unknown:model", "What is the capital of France?")
 
 
+@patch('importlib.import_module')
+def test_route_prompt_streams_chunks(mock_import_module):
+    """Test that an on_chunk callback switches to the provider's streaming API."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini"]
+    mock_module.stream_prompt.return_value = iter(["Paris ", "is the ", "capital."])
+    mock_import_module.return_value = mock_module
+
+    chunks = []
+    response = ModelRouter.route_prompt("o:o4-mini", "What is the capital of France?", on_chunk=chunks.append)
+
+    assert response == "Paris is the capital."
+    assert chunks == ["Paris ", "is the ", "capital."]
+    mock_module.stream_prompt.assert_called_once_with("What is the capital of France?", "o4-mini")
+    mock_module.prompt.assert_not_called()
+
+
+@patch('importlib.import_module')
+def test_route_prompt_uses_response_cache(mock_import_module):
+    """Test that identical requests are served from the response cache unless bypassed."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini"]
+    mock_module.prompt.return_value = "Paris"
+    mock_import_module.return_value = mock_module
+
+    # patch.object: importlib.import_module is mocked, so string targets would not resolve
+    with patch.object(model_router, "get_response_cache", return_value=ResponseCache()):
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?") == "Paris"
+        assert ModelRouter.route_prompt("openai:o4-mini", "Capital of France?") == "Paris"
+        assert mock_module.prompt.call_count == 1
+
+        # Streaming callers still receive the cached text
+        chunks = []
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?", on_chunk=chunks.append) == "Paris"
+        assert chunks == ["Paris"]
+
+        mock_module.prompt.return_value = "Paris, France"
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?", cache_mode=CACHE_BYPASS) == "Paris, France"
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?") == "Paris"
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?", cache_mode=CACHE_REFRESH) == "Paris, France"
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?") == "Paris, France"
+        assert mock_module.prompt.call_count == 3
+
+
+@patch('importlib.import_module')
+def test_route_prompt_retries_transient_errors(mock_import_module):
+    """Test that transient provider failures are retried, but not after streaming started."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini"]
+    # Provider modules wrap SDK errors in ValueError; the original stays in the chain
+    wrapped_error = ValueError("Failed to get response from OpenAI")
+    wrapped_error.__context__ = ConnectionError("connection reset")
+    mock_module.prompt.side_effect = [wrapped_error, "Paris"]
+    mock_import_module.return_value = mock_module
+
+    def broken_stream(text, model):
+        yield "Par"
+        raise ConnectionError("connection reset")
+
+    mock_module.stream_prompt.side_effect = broken_stream
+
+    with patch.object(model_router, "get_retry_policy", return_value=RetryPolicy(base_delay=0)):
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?") == "Paris"
+        assert mock_module.prompt.call_count == 2
+
+        chunks = []
+        with pytest.raises(ConnectionError):
+            ModelRouter.route_prompt("o:o4-mini", "Capital of Spain?", on_chunk=chunks.append)
+        assert mock_module.stream_prompt.call_count == 1
+        assert chunks == ["Par"]
+
+
+@patch('importlib.import_module')
+def test_route_prompt_reroutes_when_circuit_open(mock_import_module):
+    """Test that an open circuit fails fast, or reroutes to the configured fallback."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini", "gpt-4o"]
+    mock_module.prompt.return_value = "Paris"
+    mock_import_module.return_value = mock_module
+
+    # A 503 from one model opens that model's breaker but not the provider's
+    overloaded = Exception("Error code: 503")
+    overloaded.status_code = 503
+    breakers = CircuitBreakers(failure_threshold=1)
+    breakers.record("openai", "o4-mini", overloaded)
+    with patch.object(model_router, "get_circuit_breakers", return_value=breakers):
+        with pytest.raises(CircuitOpenError):
+            ModelRouter.route_prompt("o:o4-mini", "Capital of France?")
+        mock_module.prompt.assert_not_called()
+
+        breakers.fallbacks = {"openai:o4-mini": "o:gpt-4o"}
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of France?") == "Paris"
+        mock_module.prompt.assert_called_once_with("Capital of France?", "gpt-4o")
+
+
+@patch('importlib.import_module')
+def test_route_prompt_falls_back_along_chain(mock_import_module):
+    """Test that a failing target hands over to the next one at once and the answering target is reported."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["claude-sonnet-4-20250514", "gpt-4o", "llama3"]
+    overloaded = Exception("Error code: 503")
+    overloaded.status_code = 503
+
+    def answer(text, model):
+        if model == "claude-sonnet-4-20250514":
+            raise overloaded
+        return f"Paris from {model}"
+
+    mock_module.prompt.side_effect = answer
+    mock_import_module.return_value = mock_module
+
+    answered_by = []
+    response = ModelRouter.route_prompt(
+        "a:claude-sonnet-4-20250514|o:gpt-4o|l:llama3", "Capital of France?", on_target=answered_by.append
+    )
+    assert response == "Paris from gpt-4o"
+    assert answered_by == ["o:gpt-4o"]
+    # The first target is not retried before falling back
+    models_called = [call.args[1] for call in mock_module.prompt.call_args_list]
+    assert models_called == ["claude-sonnet-4-20250514", "gpt-4o"]
+
+    # The last target's error surfaces when every target fails
+    mock_module.prompt.side_effect = ValueError("boom")
+    with pytest.raises(ValueError, match="boom"):
+        ModelRouter.route_prompt("o:gpt-4o|l:llama3", "Capital of Spain?")
+
+    # Async routing follows the same chain
+    mock_module.aprompt = AsyncMock(side_effect=[overloaded, "Madrid"])
+    answered_by = []
+    assert asyncio.run(
+        ModelRouter.aroute_prompt("o:gpt-4o|l:llama3", "Capital of Spain?", on_target=answered_by.append)
+    ) == "Madrid"
+    assert answered_by == ["l:llama3"]
+
+
+@patch('importlib.import_module')
+def test_route_prompt_chain_does_not_fall_back_mid_stream(mock_import_module):
+    """Test that a target failing after streaming output is not replaced by the next target."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["gpt-4o", "llama3"]
+
+    def broken_stream(text, model):
+        yield "Par"
+        raise ConnectionError("connection reset")
+
+    mock_module.stream_prompt.side_effect = broken_stream
+    mock_import_module.return_value = mock_module
+
+    chunks = []
+    with pytest.raises(ConnectionError):
+        ModelRouter.route_prompt("o:gpt-4o|l:llama3", "Capital of France?", on_chunk=chunks.append)
+    assert chunks == ["Par"]
+    assert mock_module.stream_prompt.call_count == 1
+
+
 @patch('importlib.import_module')
 def test_route_list_models(mock_import_module):
     """Test routing list_models requests to the appropriate provider."""
@@ -56,6 +230,20 @@ def test_route_list_models(mock_import_module):
         ModelRouter.route_list_models("unknown")
 
 
+@patch('importlib.import_module')
+def test_failed_listing_is_not_retried_within_negative_ttl(mock_import_module):
+    """Test that a provider whose listing failed shows its known models without being asked again."""
+    mock_module = MagicMock()
+    mock_module.list_models.side_effect = ConnectionError("provider down")
+    mock_module.FALLBACK_MODELS = ["o4-mini"]
+    mock_import_module.return_value = mock_module
+
+    assert ModelRouter.route_list_models("openai") == ["o4-mini"]
+    assert ModelRouter.route_list_models("o") == ["o4-mini"]
+    assert get_model_catalog().get_entry("openai").degraded
+    mock_module.list_models.assert_called_once_with(fallback=False)
+
+
 def test_validate_and_correct_model_shorthand():
     """Test validation and correction of shorthand model names like a:sonnet.3.7."""
     try:
@@ -78,3 +266,154 @@ def test_validate_and_correct_model_shorthand():
         pytest.fail(f"Test failed with error: {e}")
 
 
+@patch('importlib.import_module')
+def test_validate_and_correct_model_uses_catalog_cache(mock_import_module):
+    """Test that repeated validation only lists models once."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini", "o3"]
+    mock_import_module.return_value = mock_module
+
+    assert ModelRouter.validate_and_correct_model("openai", "o4-mini") == "o4-mini"
+    assert ModelRouter.validate_and_correct_model("openai", "o3") == "o3"
+    assert ModelRouter.magic_model_correction("openai", "o3", "o:gpt-4o-mini") == "o3"
+
+    mock_module.list_models.assert_called_once()
+
+
+@patch('importlib.import_module')
+def test_magic_model_correction_resolves_locally(mock_import_module, monkeypatch):
+    """Test that confident local matches skip the LLM correction prompt."""
+    monkeypatch.setenv("LLM_MODEL_CORRECTION", "true")
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["gpt-4o", "gpt-4o-mini", "o3"]
+    mock_import_module.return_value = mock_module
+
+    assert ModelRouter.magic_model_correction("openai", "4o-mini", "o:gpt-4o-mini") == "gpt-4o-mini"
+    mock_module.prompt.assert_not_called()
+
+
+@patch('importlib.import_module')
+def test_magic_model_correction_llm_fallback_is_opt_in(mock_import_module, monkeypatch):
+    """Test that the LLM correction only runs when enabled."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["gpt-4o", "o3"]
+    mock_module.prompt.return_value = "o3"
+    mock_import_module.return_value = mock_module
+
+    monkeypatch.delenv("LLM_MODEL_CORRECTION", raising=False)
+    assert ModelRouter.magic_model_correction("openai", "reasoning-best", "o:gpt-4o") == "reasoning-best"
+    mock_module.prompt.assert_not_called()
+
+    get_correction_memo().clear()
+    monkeypatch.setenv("LLM_MODEL_CORRECTION", "true")
+    assert ModelRouter.magic_model_correction("openai", "reasoning-best", "o:gpt-4o") == "o3"
+    mock_module.prompt.assert_called_once()
+
+
+@patch('importlib.import_module')
+def test_magic_model_correction_is_memoized(mock_import_module, monkeypatch):
+    """Test that repeated corrections are served from the memo."""
+    monkeypatch.setenv("LLM_MODEL_CORRECTION", "true")
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["gpt-4o", "o3"]
+    mock_module.prompt.return_value = "o3"
+    mock_import_module.return_value = mock_module
+
+    for _ in range(3):
+        assert ModelRouter.magic_model_correction("openai", "reasoning-best", "o:gpt-4o") == "o3"
+        assert ModelRouter.validate_and_correct_model("openai", "reasoning-best") == "o3"
+
+    mock_module.prompt.assert_called_once()
+    stats = get_correction_memo().stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 5
+
+
+@patch('importlib.import_module')
+def test_aroute_prompt(mock_import_module):
+    """Test routing prompts to the provider's async surface."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini"]
+    mock_module.aprompt = AsyncMock(return_value="Paris is the capital of France.")
+    mock_import_module.return_value = mock_module
+
+    response = asyncio.run(ModelRouter.aroute_prompt("o:o4-mini", "What is the capital of France?"))
+    assert response == "Paris is the capital of France."
+    mock_module.aprompt.assert_awaited_once_with("What is the capital of France?", "o4-mini")
+    mock_module.prompt.assert_not_called()
+
+    with pytest.raises(ValueError):
+        asyncio.run(ModelRouter.aroute_prompt("unknown:model", "What is the capital of France?"))
+
+
+@patch('importlib.import_module')
+def test_aroute_list_models(mock_import_module):
+    """Test routing async list_models requests."""
+    mock_module = MagicMock()
+    mock_module.alist_models = AsyncMock(return_value=["model1", "model2"])
+    mock_import_module.return_value = mock_module
+
+    assert asyncio.run(ModelRouter.aroute_list_models("q")) == ["model1", "model2"]
+    assert get_model_catalog().get("groq") == ["model1", "model2"]
+    mock_module.alist_models.assert_awaited_once_with(fallback=False)
+
+
+@patch('importlib.import_module')
+def test_concurrent_aroute_prompt_calls_share_the_sync_layers(mock_import_module):
+    """Test that concurrent async prompts on one event loop are coalesced, cached and breaker-tracked."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini"]
+
+    async def slow_answer(text, model):
+        await asyncio.sleep(0.1)
+        return f"{text} -> Paris"
+
+    mock_module.aprompt = AsyncMock(side_effect=slow_answer)
+    mock_import_module.return_value = mock_module
+
+    async def main():
+        return await asyncio.gather(
+            *(ModelRouter.aroute_prompt("o:o4-mini", "Capital of France?") for _ in range(5)),
+            ModelRouter.aroute_prompt("o:o4-mini", "Capital of Spain?"),
+        )
+
+    breakers = CircuitBreakers()
+    with patch.object(model_router, "get_response_cache", return_value=ResponseCache()), \
+         patch.object(model_router, "get_single_flight", return_value=SingleFlight()), \
+         patch.object(model_router, "get_circuit_breakers", return_value=breakers):
+        responses = asyncio.run(main())
+        assert responses == ["Capital of France? -> Paris"] * 5 + ["Capital of Spain? -> Paris"]
+        # Identical prompts share one upstream call
+        assert mock_module.aprompt.await_count == 2
+
+        # Answers are cached for sync and async callers alike
+        assert asyncio.run(ModelRouter.aroute_prompt("o:o4-mini", "Capital of France?")) == "Capital of France? -> Paris"
+        assert ModelRouter.route_prompt("o:o4-mini", "Capital of Spain?") == "Capital of Spain? -> Paris"
+        assert mock_module.aprompt.await_count == 2
+        mock_module.prompt.assert_not_called()
+
+    assert breakers.states()["openai:o4-mini"]["state"] == "closed"
+
+
+@patch('importlib.import_module')
+def test_aroute_prompt_retries_and_reroutes(mock_import_module):
+    """Test that async prompts are retried on transient errors and rerouted around open circuits."""
+    mock_module = MagicMock()
+    mock_module.list_models.return_value = ["o4-mini", "gpt-4o"]
+    wrapped_error = ValueError("Failed to get response from OpenAI")
+    wrapped_error.__context__ = ConnectionError("connection reset")
+    mock_module.aprompt = AsyncMock(side_effect=[wrapped_error, "Paris", "Madrid"])
+    mock_import_module.return_value = mock_module
+
+    with patch.object(model_router, "get_retry_policy", return_value=RetryPolicy(base_delay=0)):
+        assert asyncio.run(ModelRouter.aroute_prompt("o:o4-mini", "Capital of France?")) == "Paris"
+        assert mock_module.aprompt.await_count == 2
+
+    overloaded = Exception("Error code: 503")
+    overloaded.status_code = 503
+    breakers = CircuitBreakers(failure_threshold=1)
+    breakers.record("openai", "o4-mini", overloaded)
+    breakers.fallbacks = {"openai:o4-mini": "o:gpt-4o"}
+    with patch.object(model_router, "get_circuit_breakers", return_value=breakers):
+        assert asyncio.run(ModelRouter.aroute_prompt("o:o4-mini", "Capital of Spain?")) == "Madrid"
+        mock_module.aprompt.assert_awaited_with("Capital of Spain?", "gpt-4o")
@@ -0,0 +1,202 @@
+"""
+Tests for the per-provider rate limiter.
+"""
+
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from just_prompt.atoms.shared.rate_limiter import (
+    RateLimiter,
+    parse_rate_limits,
+    parse_reset,
+    parse_retry_after,
+    rate_limit_details,
+    rate_limit_event_hooks,
+    request_model,
+)
+
+
+class FakeRateLimitError(Exception):
+    """Mimics the SDK errors: a status code plus the HTTP response."""
+
+    def __init__(self, headers=None, status_code=429):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def test_parse_rate_limits():
+    """Test parsing provider and model limits with short and full names."""
+    limits = parse_rate_limits("q=30,openai=500,groq:llama-3.3-70b-versatile=10,nope=5,o=x")
+    assert limits == {"groq": 30, "openai": 500, "groq:llama-3.3-70b-versatile": 10}
+
+
+def test_parse_reset_formats():
+    """Test the reset header formats used by OpenAI, Groq and Anthropic."""
+    assert parse_reset("20") == 20
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("1.5s") == 1.5
+    assert parse_reset("250ms") == 0.25
+    assert parse_reset("2025-01-01T00:01:00Z", now=1735689600) == 60
+    assert parse_reset("soon") is None
+
+
+def test_parse_retry_after():
+    """Test Retry-After in seconds, milliseconds and HTTP-date form."""
+    assert parse_retry_after({"retry-after": "3"}) == 3
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "2"}) == 1.5
+    assert parse_retry_after({"retry-after": "Wed, 01 Jan 2025 00:00:30 GMT"}, now=1735689600) == 30
+    assert parse_retry_after({}) is None
+
+
+def test_rate_limit_details_only_matches_429():
+    """Test that only rate-limit errors are recognized."""
+    assert rate_limit_details(FakeRateLimitError({"retry-after": "1"})) == {"retry-after": "1"}
+    assert rate_limit_details(FakeRateLimitError(status_code=500)) is None
+
+    # Provider modules re-raise SDK errors as ValueError
+    try:
+        try:
+            raise FakeRateLimitError({"retry-after": "2"})
+        except FakeRateLimitError as e:
+            raise ValueError(f"Failed to get response from Groq: {e}")
+    except ValueError as wrapper:
+        assert rate_limit_details(wrapper) == {"retry-after": "2"}
+    assert rate_limit_details(ValueError("boom")) is None
+
+
+def test_request_budget_queues_then_gives_up_past_max_wait():
+    """Test that an exhausted request budget makes callers wait, bounded by max_wait."""
+    limiter = RateLimiter(requests_per_minute={"groq": 60}, max_wait=0.5)
+    for _ in range(60):
+        assert limiter.acquire("groq", "llama3", 1) == 0
+
+    # The next slot frees up in one second, past the half-second cap
+    with pytest.raises(ValueError, match="Rate limit"):
+        limiter.acquire("groq", "llama3", 1)
+
+    # Other providers are unaffected
+    assert limiter.acquire("openai", "o3", 1) == 0
+
+
+def test_token_budget_charges_prompt_and_response():
+    """Test that tokens from both the prompt and the response count against the budget."""
+    limiter = RateLimiter(tokens_per_minute={"openai": 6000}, max_wait=0.5)
+    limiter.call("openai", "o3", "x" * 4000, lambda: "y" * 20000)
+
+    assert limiter.stats()["openai"]["tokens_available"] <= 0
+    with pytest.raises(ValueError):
+        limiter.acquire("openai", "o3", 1000)
+
+
+def test_model_limits_apply_on_top_of_provider_limits():
+    """Test that a model-specific limit only throttles that model."""
+    limiter = RateLimiter(requests_per_minute={"groq:small": 1}, max_wait=0.1)
+    limiter.acquire("groq", "small", 1)
+    with pytest.raises(ValueError):
+        limiter.acquire("groq", "small", 1)
+    assert limiter.acquire("groq", "large", 1) == 0
+
+
+def test_429_is_queued_again_after_retry_after():
+    """Test that a rate-limited call waits for Retry-After and runs again."""
+    limiter = RateLimiter()
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeRateLimitError({"retry-after": "0.05"})
+        return "Paris"
+
+    assert limiter.call("groq", "llama3", "Capital of France?", call) == "Paris"
+    assert len(attempts) == 2
+    stats = limiter.stats()["groq"]
+    assert stats["rate_limited"] == 1
+    assert stats["wait_seconds"] >= 0.05
+
+
+def test_other_errors_are_not_retried():
+    """Test that non-rate-limit errors propagate immediately."""
+    limiter = RateLimiter()
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        raise FakeRateLimitError(status_code=500)
+
+    with pytest.raises(FakeRateLimitError):
+        limiter.call("groq", "llama3", "hi", call)
+    assert len(attempts) == 1
+
+
+def test_429_past_max_wait_is_raised():
+    """Test that a Retry-After beyond max_wait surfaces the provider error."""
+    limiter = RateLimiter(max_wait=1)
+
+    def call():
+        raise FakeRateLimitError({"retry-after": "60"})
+
+    with pytest.raises(FakeRateLimitError):
+        limiter.call("groq", "llama3", "hi", call)
+
+
+def test_exhausted_budget_header_pauses_provider():
+    """Test that remaining=0 with a reset time pauses the provider's requests."""
+    limiter = RateLimiter()
+    limiter.observe_headers(
+        "openai", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "50ms"}
+    )
+    assert limiter.acquire("openai", "o3", 1) >= 0.04
+
+
+def test_per_model_headers_only_pause_that_model():
+    """Test that an exhausted model budget does not hold back the provider's other models."""
+    limiter = RateLimiter()
+    limiter.observe_headers(
+        "openai", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "50ms"}, "o3"
+    )
+    assert limiter.acquire("openai", "gpt-4o", 1) == 0
+    assert limiter.acquire("openai", "o3", 1) >= 0.04
+
+
+def test_request_model_from_body_and_url():
+    """Test finding the model of a request from its JSON body or its URL."""
+    body_request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json={"model": "o3"})
+    url_request = httpx.Request(
+        "POST", "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-pro:generateContent"
+    )
+    assert request_model(body_request) == "o3"
+    assert request_model(url_request) == "gemini-2.5-pro"
+    assert request_model(httpx.Request("GET", "https://api.openai.com/v1/models")) is None
+
+
+def test_event_hook_passes_the_request_model():
+    """Test that the response hook reports headers against the requested model."""
+    limiter = RateLimiter()
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages", json={"model": "claude-opus-4-20250514"})
+    response = httpx.Response(
+        200,
+        headers={"anthropic-ratelimit-requests-remaining": "0", "anthropic-ratelimit-requests-reset": "50ms"},
+        request=request,
+    )
+    with patch("just_prompt.atoms.shared.rate_limiter.get_rate_limiter", return_value=limiter):
+        rate_limit_event_hooks("anthropic")["response"][0](response)
+    assert limiter.acquire("anthropic", "claude-sonnet-4-20250514", 1) == 0
+    assert limiter.acquire("anthropic", "claude-opus-4-20250514", 1) >= 0.04
+
+
+def test_disabled_limiter_passes_through():
+    """Test that a disabled limiter neither waits nor retries."""
+    limiter = RateLimiter(enabled=False, requests_per_minute={"groq": 1})
+    for _ in range(3):
+        assert limiter.call("groq", "llama3", "hi", lambda: "ok") == "ok"
+
+
+def test_per_call_max_wait_overrides_limiter():
+    """Test that a call with max_wait=0 fails at once instead of queueing."""
+    limiter = RateLimiter(requests_per_minute={"groq": 1})
+    limiter.call("groq", "llama3", "hi", lambda: "ok")
+    with pytest.raises(ValueError, match="Rate limit"):
+        limiter.call("groq", "llama3", "hi", lambda: "ok", max_wait=0)
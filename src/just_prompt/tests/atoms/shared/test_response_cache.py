@@ -0,0 +1,79 @@
+"""
+Tests for the response cache.
+"""
+
+import time
+from just_prompt.atoms.shared.response_cache import (
+    ResponseCache,
+    response_cache_key,
+    cache_mode_from_flags,
+    CACHE_USE,
+    CACHE_REFRESH,
+    CACHE_BYPASS,
+)
+
+
+def test_key_covers_model_spec_and_prompt():
+    """Test that keys differ by model, suffix and prompt, and ignore line endings."""
+    key = response_cache_key("openai", "o3:high", "Hello\nworld")
+    assert key == response_cache_key("openai", "o3:high", "Hello\r\nworld")
+    assert key != response_cache_key("openai", "o3:low", "Hello\nworld")
+    assert key != response_cache_key("openai", "o3", "Hello\nworld")
+    assert key != response_cache_key("anthropic", "o3:high", "Hello\nworld")
+    assert key != response_cache_key("openai", "o3:high", "Hello world")
+
+
+def test_memory_tier_hit():
+    """Test that a stored response is served from memory."""
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.put("k", "Paris")
+    assert cache.get("k") == "Paris"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that responses persist in SQLite across cache instances."""
+    db_path = tmp_path / "responses.sqlite3"
+    ResponseCache(disk_path=db_path).put("k", "Paris", "openai:o3")
+
+    restored = ResponseCache(disk_path=db_path)
+    assert restored.get("k") == "Paris"
+    assert restored.stats()["disk_entries"] == 1
+
+
+def test_expired_responses_are_not_served(tmp_path):
+    """Test TTL expiry in both tiers."""
+    cache = ResponseCache(ttl=0.05, disk_path=tmp_path / "responses.sqlite3")
+    cache.put("k", "Paris")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    """Test that the disk tier stays under its size cap."""
+    cache = ResponseCache(memory_entries=0, disk_path=tmp_path / "responses.sqlite3", max_disk_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") == "x" * 10
+    cache.put("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    assert cache.get("c") == "z" * 10
+
+
+def test_disabled_cache_stores_nothing():
+    """Test that a disabled cache never returns responses."""
+    cache = ResponseCache(enabled=False)
+    cache.put("k", "Paris")
+    assert cache.get("k") is None
+
+
+def test_cache_mode_from_flags():
+    """Test mapping of the tool flags to cache modes."""
+    assert cache_mode_from_flags() == CACHE_USE
+    assert cache_mode_from_flags(refresh_cache=True) == CACHE_REFRESH
+    assert cache_mode_from_flags(bypass_cache=True, refresh_cache=True) == CACHE_BYPASS
@@ -0,0 +1,165 @@
+"""
+Tests for the provider retry policy.
+"""
+
+import time
+import httpx
+import openai
+import pytest
+from types import SimpleNamespace
+from just_prompt.atoms.shared.http_pool import _request_deadline
+from just_prompt.atoms.shared.retry import RetryPolicy, is_retryable, retry_deadline
+
+
+class FakeStatusError(Exception):
+    """Mimics an SDK error that carries an HTTP status code."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={})
+
+
+def wrapped(error):
+    """Raise error wrapped the way provider modules do, and return the wrapper."""
+    try:
+        try:
+            raise error
+        except Exception as e:
+            raise ValueError(f"Failed to get response from OpenAI: {e}")
+    except ValueError as wrapper:
+        return wrapper
+
+
+def flaky(failures, error_factory, result="Paris"):
+    """Build a call that fails with the given error a number of times, then succeeds."""
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        if len(attempts) <= failures:
+            raise error_factory()
+        return result
+    return call, attempts
+
+
+def test_classification():
+    """Test which provider errors are retried, including wrapped SDK errors."""
+    connection_error = openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+    assert is_retryable(wrapped(connection_error))
+    assert is_retryable(wrapped(httpx.ReadTimeout("timed out")))
+    assert is_retryable(FakeStatusError(503))
+    assert is_retryable(FakeStatusError(529))
+    assert not is_retryable(wrapped(FakeStatusError(400)))
+    assert not is_retryable(FakeStatusError(401))
+    # Rate limits are queued by the rate limiter instead
+    assert not is_retryable(FakeStatusError(429))
+    assert not is_retryable(ValueError("Unknown provider prefix: x"))
+
+
+def test_transient_failure_is_retried():
+    """Test that a call recovers after transient failures."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    call, attempts = flaky(2, lambda: wrapped(FakeStatusError(502)))
+
+    assert policy.call("openai", call) == "Paris"
+    assert len(attempts) == 3
+    assert policy.stats()["openai"] == {"calls": 1, "retries": 2, "recovered": 1, "exhausted": 0}
+
+
+def test_attempts_are_bounded():
+    """Test that the last error is raised once attempts run out."""
+    policy = RetryPolicy(max_attempts=2, base_delay=0)
+    call, attempts = flaky(5, lambda: FakeStatusError(503))
+
+    with pytest.raises(FakeStatusError):
+        policy.call("groq", call)
+    assert len(attempts) == 2
+    assert policy.stats()["groq"]["exhausted"] == 1
+
+
+def test_permanent_failure_is_not_retried():
+    """Test that client errors fail on the first attempt."""
+    policy = RetryPolicy(base_delay=0)
+    call, attempts = flaky(5, lambda: FakeStatusError(404))
+
+    with pytest.raises(FakeStatusError):
+        policy.call("openai", call)
+    assert len(attempts) == 1
+
+
+def test_deadline_stops_retrying():
+    """Test that no retry is scheduled past the total deadline."""
+    policy = RetryPolicy(max_attempts=10, base_delay=5, max_delay=5, deadline=0.1)
+    policy.backoff = lambda retry: 5
+    call, attempts = flaky(5, lambda: FakeStatusError(500))
+
+    with pytest.raises(FakeStatusError):
+        policy.call("gemini", call)
+    assert len(attempts) == 1
+
+
+def test_attempts_run_within_the_remaining_deadline():
+    """Test that each attempt gets the time left before the deadline as its HTTP deadline."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0, deadline=30)
+    deadlines = []
+
+    def call():
+        with retry_deadline():
+            deadlines.append(_request_deadline.get() - time.monotonic())
+        if len(deadlines) < 2:
+            raise FakeStatusError(503)
+        return "ok"
+
+    assert policy.call("openai", call) == "ok"
+    assert len(deadlines) == 2
+    assert all(0 < remaining <= 30 for remaining in deadlines)
+    assert _request_deadline.get() is None
+
+
+def test_deadline_starts_when_the_call_is_let_through():
+    """Test that time spent before the first retry_deadline(), e.g. queueing for budget, does not count."""
+    policy = RetryPolicy(max_attempts=1, deadline=0.2)
+    remaining = []
+
+    def call():
+        time.sleep(0.3)  # Waiting for the rate limiter
+        with retry_deadline():
+            remaining.append(_request_deadline.get() - time.monotonic())
+        return "ok"
+
+    assert policy.call("openai", call) == "ok"
+    assert 0.1 < remaining[0] <= 0.2
+
+
+def test_no_deadline_by_default():
+    """Test that without a deadline the HTTP timeouts are left alone, so the read timeout applies."""
+    policy = RetryPolicy()
+    seen = []
+
+    def call():
+        with retry_deadline():
+            seen.append(_request_deadline.get())
+        return "ok"
+
+    assert policy.deadline is None
+    assert policy.call("openai", call) == "ok"
+    assert seen == [None]
+
+
+def test_can_retry_veto():
+    """Test that a caller can forbid retries, e.g. after streaming output."""
+    policy = RetryPolicy(base_delay=0)
+    call, attempts = flaky(1, lambda: FakeStatusError(500))
+
+    with pytest.raises(FakeStatusError):
+        policy.call("openai", call, can_retry=lambda: False)
+    assert len(attempts) == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    """Test full-jitter backoff bounds."""
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    for retry in range(1, 8):
+        delay = policy.backoff(retry)
+        assert 0 <= delay <= min(4, 2 ** (retry - 1))
@@ -0,0 +1,150 @@
+"""
+Tests for the shared scheduler.
+"""
+
+import threading
+import time
+import pytest
+from just_prompt.atoms.shared.scheduler import Scheduler, gather_ordered, iter_completed, parse_provider_limits
+
+
+def _tracking_task(tracker, lock, key, delay=0.05):
+    """Build a task that records the peak number of concurrent calls per key."""
+    def run():
+        with lock:
+            tracker["active"][key] = tracker["active"].get(key, 0) + 1
+            tracker["peak"][key] = max(tracker["peak"].get(key, 0), tracker["active"][key])
+        time.sleep(delay)
+        with lock:
+            tracker["active"][key] -= 1
+        return key
+    return run
+
+
+def test_submit_returns_results():
+    """Test that submitted calls resolve to their results."""
+    scheduler = Scheduler(max_workers=4)
+    try:
+        futures = [scheduler.submit(pow, 2, n) for n in range(5)]
+        assert [future.result(timeout=2) for future in futures] == [1, 2, 4, 8, 16]
+    finally:
+        scheduler.shutdown()
+
+
+def test_global_cap():
+    """Test that no more than max_workers calls run at once."""
+    tracker = {"active": {}, "peak": {}}
+    lock = threading.Lock()
+    scheduler = Scheduler(max_workers=2)
+    try:
+        futures = [scheduler.submit(_tracking_task(tracker, lock, "all")) for _ in range(6)]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.shutdown()
+
+    assert tracker["peak"]["all"] == 2
+
+
+def test_provider_limit_does_not_block_other_providers():
+    """Test that a provider at its limit queues while others keep running."""
+    tracker = {"active": {}, "peak": {}}
+    lock = threading.Lock()
+    scheduler = Scheduler(max_workers=8, provider_limits={"groq": 1})
+    try:
+        groq = [
+            scheduler.submit(_tracking_task(tracker, lock, "groq"), provider="groq")
+            for _ in range(4)
+        ]
+        openai = [
+            scheduler.submit(_tracking_task(tracker, lock, "openai"), provider="openai")
+            for _ in range(4)
+        ]
+        for future in openai:
+            future.result(timeout=5)
+        # OpenAI finished while most groq calls were still waiting their turn
+        assert sum(future.done() for future in groq) < 4
+        for future in groq:
+            future.result(timeout=5)
+    finally:
+        scheduler.shutdown()
+
+    assert tracker["peak"]["groq"] == 1
+    assert tracker["peak"]["openai"] == 4
+
+
+def test_stats_track_queue_depth():
+    """Test queued/running/completed counters."""
+    release = threading.Event()
+    scheduler = Scheduler(max_workers=4, provider_limits={"ollama": 1})
+    try:
+        first = scheduler.submit(release.wait, provider="ollama")
+        second = scheduler.submit(release.wait, provider="ollama")
+
+        deadline = time.time() + 2
+        while scheduler.stats()["running"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = scheduler.stats()
+        assert stats["running"] == 1
+        assert stats["queued"] == 1
+        assert stats["providers"]["ollama"] == {"limit": 1, "queued": 1, "running": 1, "completed": 0}
+
+        release.set()
+        first.result(timeout=2)
+        second.result(timeout=2)
+    finally:
+        scheduler.shutdown()
+
+    stats = scheduler.stats()
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+
+
+def test_exceptions_propagate_and_free_the_slot():
+    """Test that a failing call raises from its future without leaking its slot."""
+    def fail():
+        raise RuntimeError("provider down")
+
+    scheduler = Scheduler(max_workers=2, provider_limits={"openai": 1})
+    try:
+        with pytest.raises(RuntimeError, match="provider down"):
+            scheduler.submit(fail, provider="openai").result(timeout=2)
+        assert scheduler.submit(lambda: "ok", provider="openai").result(timeout=2) == "ok"
+    finally:
+        scheduler.shutdown()
+
+
+def test_fan_out_gathers_by_index():
+    """Test that fan-out results come back in submission order, duplicates included."""
+    def slow_echo(item):
+        time.sleep(0.05 if item == "a" else 0)
+        return item
+
+    scheduler = Scheduler(max_workers=4)
+    try:
+        futures = scheduler.fan_out(slow_echo, ["a", "b", "a", "c"], provider_for=lambda item: item)
+        assert gather_ordered(futures) == ["a", "b", "a", "c"]
+    finally:
+        scheduler.shutdown()
+
+
+def test_iter_completed_yields_in_completion_order():
+    """Test that results stream out as they finish, tagged with their index."""
+    def delayed(delay):
+        time.sleep(delay)
+        return delay
+
+    scheduler = Scheduler(max_workers=4)
+    try:
+        futures = scheduler.fan_out(delayed, [0.2, 0.0, 0.1])
+        assert list(iter_completed(futures)) == [(1, 0.0), (2, 0.1), (0, 0.2)]
+    finally:
+        scheduler.shutdown()
+
+
+def test_parse_provider_limits():
+    """Test parsing of the per-provider concurrency setting."""
+    assert parse_provider_limits("groq=4, o=16") == {"groq": 4, "openai": 16}
+    assert parse_provider_limits("") == {}
+    assert parse_provider_limits("unknown=3,groq=0,anthropic=x") == {}
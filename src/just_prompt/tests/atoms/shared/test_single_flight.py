@@ -0,0 +1,205 @@
+"""
+Tests for in-flight request coalescing.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from just_prompt.atoms.shared.single_flight import SingleFlight
+
+
+def _slow_call(calls, result="Paris", delay=0.1, chunks=()):
+    """Build an upstream call that counts invocations and optionally streams chunks."""
+    def call(stream_chunk):
+        calls.append(1)
+        for chunk in chunks:
+            time.sleep(delay / max(len(chunks), 1))
+            if stream_chunk is not None:
+                stream_chunk(chunk)
+        if not chunks:
+            time.sleep(delay)
+        return result
+    return call
+
+
+def test_identical_calls_share_one_execution():
+    """Test that concurrent calls with the same key run the upstream call once."""
+    flight = SingleFlight()
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.run, "key", _slow_call(calls)) for _ in range(5)]
+        results = [future.result() for future in futures]
+
+    assert results == ["Paris"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    """Test that distinct requests each call upstream."""
+    flight = SingleFlight()
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flight.run, key, _slow_call(calls)) for key in ("a", "b")]
+        [future.result() for future in futures]
+
+    assert len(calls) == 2
+
+
+def test_errors_are_shared():
+    """Test that every waiter sees the upstream error."""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing(stream_chunk):
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", failing)
+        started.wait(1)
+        follower = executor.submit(flight.run, "key", failing)
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="provider down"):
+                future.result()
+
+    assert flight.stats()["executed"] == 1
+
+
+def test_late_follower_receives_replayed_chunks():
+    """Test that a streaming follower gets chunks sent before it joined."""
+    flight = SingleFlight()
+    calls = []
+    leader_chunks, follower_chunks = [], []
+    call = _slow_call(calls, result="Paris is the capital.", delay=0.2, chunks=("Paris ", "is the ", "capital."))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", call, leader_chunks.append)
+        time.sleep(0.1)
+        follower = executor.submit(flight.run, "key", call, follower_chunks.append)
+        assert leader.result() == follower.result() == "Paris is the capital."
+
+    assert len(calls) == 1
+    assert leader_chunks == follower_chunks == ["Paris ", "is the ", "capital."]
+
+
+def test_follower_joining_past_replay_window_gets_whole_response():
+    """Test that chunks beyond the replay window are not kept for late joiners."""
+    flight = SingleFlight(replay_chars=4)
+    calls = []
+    leader_chunks, follower_chunks = [], []
+    call = _slow_call(calls, result="Paris is the capital.", delay=0.2, chunks=("Paris ", "is the ", "capital."))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", call, leader_chunks.append)
+        time.sleep(0.1)
+        follower = executor.submit(flight.run, "key", call, follower_chunks.append)
+        assert leader.result() == follower.result() == "Paris is the capital."
+
+    assert len(calls) == 1
+    assert leader_chunks == ["Paris ", "is the ", "capital."]
+    assert follower_chunks == ["Paris is the capital."]
+
+
+def test_failing_follower_handler_does_not_break_leader():
+    """Test that a follower whose chunk handler fails gets its own error only."""
+    flight = SingleFlight()
+    calls = []
+    leader_chunks = []
+    call = _slow_call(calls, result="ab", delay=0.2, chunks=("a", "b"))
+
+    def broken_handler(chunk):
+        raise OSError("disk full")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", call, leader_chunks.append)
+        time.sleep(0.05)
+        follower = executor.submit(flight.run, "key", call, broken_handler)
+        assert leader.result() == "ab"
+        with pytest.raises(OSError, match="disk full"):
+            follower.result()
+
+    assert leader_chunks == ["a", "b"]
+
+
+def test_non_streaming_leader_delivers_whole_response_to_streaming_follower():
+    """Test that a streaming follower of a non-streaming call gets the full text as one chunk."""
+    flight = SingleFlight()
+    calls = []
+    follower_chunks = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", _slow_call(calls))
+        time.sleep(0.05)
+        follower = executor.submit(flight.run, "key", _slow_call(calls), follower_chunks.append)
+        assert leader.result() == follower.result() == "Paris"
+
+    assert follower_chunks == ["Paris"]
+
+
+def test_disabled_single_flight_runs_every_call():
+    """Test that coalescing can be switched off."""
+    flight = SingleFlight(enabled=False)
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flight.run, "key", _slow_call(calls)) for _ in range(3)]
+        [future.result() for future in futures]
+
+    assert len(calls) == 3
+
+
+def test_stream_is_aborted_once_every_caller_stops_listening():
+    """Test that the upstream call stops when all chunk handlers have failed."""
+    flight = SingleFlight()
+    sent = []
+
+    def call(stream_chunk):
+        for chunk in ("a", "b", "c"):
+            sent.append(chunk)
+            stream_chunk(chunk)
+        return "abc"
+
+    def stop_listening(chunk):
+        raise RuntimeError("no longer needed")
+
+    with pytest.raises(RuntimeError, match="no longer needed"):
+        flight.run("key", call, stop_listening)
+    assert sent == ["a"]
+
+
+def test_async_calls_share_one_execution():
+    """Test that concurrent async calls with the same key on one event loop run the upstream call once."""
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "Paris"
+
+    async def main():
+        return await asyncio.gather(*(flight.arun("key", call) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["Paris"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+
+def test_async_callers_join_sync_flights():
+    """Test that an async caller joins an identical sync call already in flight."""
+    flight = SingleFlight()
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(flight.run, "key", _slow_call(calls, delay=0.3))
+        time.sleep(0.05)
+        assert asyncio.run(flight.arun("key", _slow_call(calls))) == "Paris"
+        assert future.result() == "Paris"
+
+    assert len(calls) == 1
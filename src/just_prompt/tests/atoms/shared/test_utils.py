@@ -3,7 +3,15 @@ Tests for utility functions.
 """
 
 import pytest
-from just_prompt.atoms.shared.utils import split_provider_and_model, get_provider_from_prefix
+from pathlib import Path
+from just_prompt.atoms.shared.utils import (
+    split_provider_and_model,
+    split_fallback_chain,
+    get_provider_from_prefix,
+    get_cache_dir,
+    atomic_write_text,
+    AtomicFileWriter,
+)
 
 
 def test_split_provider_and_model():
@@ -23,11 +31,29 @@ def test_split_provider_and_model():
     assert provider == "ollama"
     assert model == "llama3:latest"
     
+    # Test fallback chain (the first target is split)
+    provider, model = split_provider_and_model("a:claude-sonnet-4-20250514|o:gpt-4o")
+    assert provider == "a"
+    assert model == "claude-sonnet-4-20250514"
+    
     # Test invalid format
     with pytest.raises(ValueError):
         split_provider_and_model("invalid-model-string")
 
 
+def test_split_fallback_chain():
+    """Test splitting fallback chains into their targets."""
+    assert split_fallback_chain("o:gpt-4o") == ["o:gpt-4o"]
+    assert split_fallback_chain("a:claude-sonnet-4-20250514 | o:gpt-4o|l:llama3:latest") == [
+        "a:claude-sonnet-4-20250514",
+        "o:gpt-4o",
+        "l:llama3:latest",
+    ]
+    
+    with pytest.raises(ValueError):
+        split_fallback_chain("o:gpt-4o||l:llama3")
+
+
 def test_get_provider_from_prefix():
     """Test getting provider from prefix."""
     # Test full names
@@ -48,4 +74,43 @@ def test_get_provider_from_prefix():
     
     # Test invalid prefix
     with pytest.raises(ValueError):
-        get_provider_from_prefix("unknown")
\ No newline at end of file
+        get_provider_from_prefix("unknown")
+
+
+def test_get_cache_dir(monkeypatch, tmp_path):
+    """Test resolving the cache directory from the environment."""
+    monkeypatch.setenv("JUST_PROMPT_CACHE_DIR", str(tmp_path / "jp"))
+    assert get_cache_dir() == tmp_path / "jp"
+
+    monkeypatch.delenv("JUST_PROMPT_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert get_cache_dir() == tmp_path / "xdg" / "just-prompt"
+
+
+def test_atomic_write_text(tmp_path):
+    """Test that atomic writes create parent directories and leave no temp files."""
+    target = tmp_path / "nested" / "out.txt"
+    atomic_write_text(target, "first")
+    atomic_write_text(target, "second")
+
+    assert target.read_text(encoding="utf-8") == "second"
+    assert [p.name for p in target.parent.iterdir()] == ["out.txt"]
+
+
+def test_atomic_file_writer_commit_and_discard(tmp_path):
+    """Test that streamed writes only appear under the final name on commit."""
+    target = tmp_path / "out.md"
+
+    writer = AtomicFileWriter(target)
+    writer.write("Paris ")
+    writer.write("is the capital.")
+    assert not target.exists()
+    writer.commit()
+    assert target.read_text(encoding="utf-8") == "Paris is the capital."
+
+    with pytest.raises(RuntimeError):
+        with AtomicFileWriter(target) as failed:
+            failed.write("partial")
+            raise RuntimeError("stream broke")
+    assert target.read_text(encoding="utf-8") == "Paris is the capital."
+    assert [p.name for p in tmp_path.iterdir()] == ["out.md"]
@@ -19,6 +19,7 @@ def test_validate_models_prefixed_by_provider():
     assert validate_models_prefixed_by_provider(["openai:o4-mini"]) == True
     assert validate_models_prefixed_by_provider(["anthropic:claude-sonnet-4-20250514"]) == True
     assert validate_models_prefixed_by_provider(["o:o4-mini", "a:claude-sonnet-4-20250514"]) == True
+    assert validate_models_prefixed_by_provider(["a:claude-sonnet-4-20250514|o:gpt-4o|l:llama3"]) == True
     
     # Invalid model strings
     with pytest.raises(ValueError):
@@ -29,6 +30,10 @@ def test_validate_models_prefixed_by_provider():
     
     with pytest.raises(ValueError):
         validate_models_prefixed_by_provider(["invalid-format"])
+    
+    # Every target of a fallback chain is checked
+    with pytest.raises(ValueError):
+        validate_models_prefixed_by_provider(["o:gpt-4o|unknown:model"])
 
 
 def test_validate_provider():
@@ -0,0 +1,74 @@
+"""
+Tests for board response compression.
+"""
+
+from unittest.mock import patch
+
+from just_prompt.molecules.board_compression import (
+    MIN_EXCERPT_TOKENS,
+    allocate_budget,
+    compress_responses,
+    find_duplicates,
+    trim_to_tokens,
+)
+from just_prompt.atoms.shared.rate_limiter import estimate_tokens
+
+
+def test_find_duplicates():
+    """Test that near-identical answers point at the first one and different answers do not."""
+    answer = "We should ship the product next quarter after the security review is done. " * 5
+    texts = [
+        answer,
+        "Do not ship. The market is not ready and the costs are too high for us right now.",
+        answer.upper().replace(".", "!"),
+    ]
+    assert find_duplicates(texts) == [None, None, 0]
+
+
+def test_allocate_budget_gives_short_answers_their_size():
+    """Test that answers under an equal share keep their size and the rest goes to long ones."""
+    assert allocate_budget([10, 500, 1000], 310) == [10, 150, 150]
+    assert allocate_budget([10, 20], 100) == [10, 20]
+    assert allocate_budget([10, 20], -5) == [0, 0]
+
+
+def test_trim_to_tokens_keeps_opening_and_conclusion():
+    """Test that a long answer is cut in the middle at sentence boundaries and fits its budget."""
+    text = "Opening sentence. " + " ".join(f"Filler sentence {i}." for i in range(200)) + " Final verdict: ship."
+    trimmed = trim_to_tokens(text, 60)
+
+    assert estimate_tokens(trimmed) <= 60
+    assert trimmed.startswith("Opening sentence.")
+    assert trimmed.endswith("Final verdict: ship.")
+    assert "tokens omitted ...]" in trimmed
+    assert trim_to_tokens("Short answer.", 60) == "Short answer."
+
+
+def test_trim_to_tokens_keeps_an_excerpt_without_budget():
+    """Test that an answer with no budget left keeps an excerpt and the marker instead of vanishing."""
+    text = "Opening sentence. " + " ".join(f"Filler sentence {i}." for i in range(200))
+    for max_tokens in (0, -10, 1):
+        trimmed = trim_to_tokens(text, max_tokens)
+        assert trimmed.startswith("Opening sentence.")
+        assert "tokens omitted ...]" in trimmed
+        assert estimate_tokens(trimmed) <= MIN_EXCERPT_TOKENS
+
+
+def test_compress_responses_summarizes_long_answers_in_parallel():
+    """Test that only answers over their share go to the summary model, and failures fall back to trimming."""
+    long_a = "A long answer. " * 200
+    long_b = "Another long answer. " * 200
+
+    def summarize(model_string, text, correction_model, **kwargs):
+        if "Another" in text:
+            raise ValueError("summary model down")
+        return "Summary of A."
+
+    with patch("just_prompt.molecules.board_compression.prompt_model", side_effect=summarize) as mock_prompt:
+        compressed = compress_responses(["Short.", long_a, long_b], 200, summary_model="g:gemini-flash")
+
+    assert mock_prompt.call_count == 2
+    assert all(c.args[0] == "g:gemini-flash" for c in mock_prompt.call_args_list)
+    assert compressed[:2] == ["Short.", "Summary of A."]
+    assert "tokens omitted ...]" in compressed[2]
+    assert sum(estimate_tokens(text) for text in compressed) <= 200
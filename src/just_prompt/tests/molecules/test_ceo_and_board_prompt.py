@@ -4,15 +4,34 @@ Tests for the CEO and Board prompt functionality.
 
 import pytest
 import os
+import re
+import threading
+import time
 from unittest.mock import patch, mock_open, MagicMock, call
 import tempfile
 from pathlib import Path
 
 from just_prompt.molecules.ceo_and_board_prompt import (
     ceo_and_board_prompt,
+    build_ceo_prompt,
+    build_merge_prompt,
+    combine_ceo_decisions,
+    BoardResponse,
     DEFAULT_CEO_MODEL,
     DEFAULT_CEO_DECISION_PROMPT
 )
+from just_prompt.atoms.shared import board_store
+from just_prompt.atoms.shared.board_store import BoardStore
+from just_prompt.atoms.shared.rate_limiter import estimate_tokens
+from just_prompt.atoms.shared.response_cache import CACHE_REFRESH, CACHE_USE
+
+
+@pytest.fixture(autouse=True)
+def fresh_board_store(monkeypatch):
+    """Give every test an empty in-memory board store."""
+    store = BoardStore()
+    monkeypatch.setattr(board_store, "_board_store", store)
+    return store
 
 
 @pytest.fixture
@@ -23,132 +42,420 @@ def mock_environment(monkeypatch):
     return monkeypatch
 
 
+@pytest.fixture
+def mock_models():
+    """Answer every model with a canned response and skip model name correction."""
+    def route(model_string, text, on_target=None, **kwargs):
+        if on_target is not None:
+            on_target(model_string)
+        if text.lstrip().startswith("<purpose>"):
+            return f"# CEO Decision by {model_string}"
+        return f"{model_string} says 42"
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=route) as mock_route:
+        yield mock_route
+
+
+@pytest.fixture
+def prompt_file(tmp_path):
+    """Write the board question to a prompt file."""
+    path = tmp_path / "test.txt"
+    path.write_text("Test prompt question")
+    return path
+
+
 class TestCEOAndBoardPrompt:
     """Tests for ceo_and_board_prompt function."""
 
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt_from_file_to_file")
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt")
-    @patch("builtins.open", new_callable=mock_open, read_data="Test prompt question")
-    def test_ceo_and_board_prompt_success(self, mock_file, mock_prompt, mock_prompt_from_file_to_file, mock_environment, tmpdir):
-        """Test successful CEO and board prompt execution."""
-        # Set up mocks
-        mock_prompt_from_file_to_file.return_value = [
-            str(Path(tmpdir) / "test_a_claude-3.md"),
-            str(Path(tmpdir) / "test_o_gpt-4o.md")
-        ]
-        mock_prompt.return_value = ["# CEO Decision\n\nThis is the CEO decision content."]
-        
-        # Create test files that would normally be created by prompt_from_file_to_file
-        board_file1 = Path(tmpdir) / "test_a_claude-3.md"
-        board_file1.write_text("Claude's response to the test prompt")
-        
-        board_file2 = Path(tmpdir) / "test_o_gpt-4o.md"
-        board_file2.write_text("GPT-4o's response to the test prompt")
-        
-        # Test our function
-        input_file = "test_prompt.txt"
+    def test_ceo_and_board_prompt_success(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that board responses reach the CEO in memory and every file is saved."""
+        output_dir = tmp_path / "out"
         result = ceo_and_board_prompt(
-            from_file=input_file,
-            output_dir=str(tmpdir),
-            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"]
-        )
-        
-        # Assertions
-        mock_prompt_from_file_to_file.assert_called_once_with(
-            input_file,
-            ["a:claude-3", "o:gpt-4o"],
-            str(tmpdir)
+            from_file=str(prompt_file),
+            output_dir=str(output_dir),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_model="o:o3",
         )
-        
-        # Check that the CEO model was called with the right prompt
-        mock_prompt.assert_called_once()
-        prompt_arg = mock_prompt.call_args[0][0]
-        assert "<original-question>Test prompt question</original-question>" in prompt_arg
-        assert "<model-name>a:claude-3</model-name>" in prompt_arg
-        assert "<model-name>o:gpt-4o</model-name>" in prompt_arg
-        
-        # Check that the CEO decision file was created correctly
-        expected_output_file = str(Path(tmpdir) / "ceo_decision.md")
-        assert result == expected_output_file
-        
-        # Check that both the prompt XML and decision files were created
-        # The actual call may be with Path object or string, so we check the call arguments
-        assert mock_file.call_count >= 2  # Should be called at least twice - once for prompt XML and once for decision
-        
-        # Check that one call was for the CEO prompt XML file
-        expected_prompt_file = str(Path(tmpdir) / "ceo_prompt.xml")
-        prompt_file_call_found = False
-        
-        for call_args in mock_file.call_args_list:
-            args, kwargs = call_args
-            if str(args[0]) == expected_prompt_file and args[1] == "w" and kwargs.get("encoding") == "utf-8":
-                prompt_file_call_found = True
-                break
-        assert prompt_file_call_found, "No call to create CEO prompt XML file found"
-        
-        # Check that one call was for the CEO decision file
-        decision_file_call_found = False
-        for call_args in mock_file.call_args_list:
-            args, kwargs = call_args
-            if str(args[0]) == expected_output_file and args[1] == "w" and kwargs.get("encoding") == "utf-8":
-                decision_file_call_found = True
-                break
-        assert decision_file_call_found, "No call to create CEO decision file found"
-
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt_from_file_to_file")
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt")
-    @patch("builtins.open", new_callable=mock_open, read_data="Test prompt question")
-    def test_ceo_and_board_prompt_with_defaults(self, mock_file, mock_prompt, mock_prompt_from_file_to_file, mock_environment, tmpdir):
+
+        assert result == str(output_dir / "ceo_decision.md")
+        assert (output_dir / "ceo_decision.md").read_text() == "# CEO Decision by o:o3"
+        assert (output_dir / "test_a_claude-3.md").read_text() == "a:claude-3 says 42"
+        assert (output_dir / "test_o_gpt-4o.md").read_text() == "o:gpt-4o says 42"
+
+        ceo_prompt = (output_dir / "ceo_prompt.xml").read_text()
+        assert "<original-question>Test prompt question</original-question>" in ceo_prompt
+        assert "<model-name>a:claude-3</model-name>" in ceo_prompt
+        assert "<response>o:gpt-4o says 42</response>" in ceo_prompt
+        # Board responses keep the order the models were given
+        assert ceo_prompt.index("a:claude-3 says 42") < ceo_prompt.index("o:gpt-4o says 42")
+
+        # The CEO gets exactly the prompt that was saved
+        ceo_calls = [c for c in mock_models.call_args_list if c.args[0] == "o:o3"]
+        assert len(ceo_calls) == 1
+        assert ceo_calls[0].args[1] == ceo_prompt
+
+    def test_ceo_and_board_prompt_with_defaults(self, mock_models, mock_environment, prompt_file, tmp_path):
         """Test CEO and board prompt with default parameters."""
-        # Set up mocks
-        mock_prompt_from_file_to_file.return_value = [
-            str(Path(tmpdir) / "test_a_claude-3.md"),
-            str(Path(tmpdir) / "test_o_gpt-4o.md")
-        ]
-        mock_prompt.return_value = ["# CEO Decision\n\nThis is the CEO decision content."]
-        
-        # Create test files
-        board_file1 = Path(tmpdir) / "test_a_claude-3.md"
-        board_file1.write_text("Claude's response to the test prompt")
-        
-        board_file2 = Path(tmpdir) / "test_o_gpt-4o.md"
-        board_file2.write_text("GPT-4o's response to the test prompt")
-        
-        # Test with defaults
-        input_file = "test_prompt.txt"
+        result = ceo_and_board_prompt(from_file=str(prompt_file), output_dir=str(tmp_path))
+
+        assert result == str(tmp_path / "ceo_decision.md")
+        called_models = [c.args[0] for c in mock_models.call_args_list]
+        assert sorted(called_models[:2]) == ["a:claude-3", "o:gpt-4o"]
+        assert called_models[2] == DEFAULT_CEO_MODEL
+        assert (tmp_path / "test_a_claude-3.md").exists()
+        assert (tmp_path / "test_o_gpt-4o.md").exists()
+
+    def test_ceo_and_board_prompt_file_not_found(self, mock_models, mock_environment):
+        """Test error handling when input file is not found."""
+        with pytest.raises(ValueError, match="Error reading file"):
+            ceo_and_board_prompt(from_file="non_existent_file.txt")
+        mock_models.assert_not_called()
+
+    def test_board_failures_and_fallbacks_are_reported(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that failed members are passed on as errors and fallback targets are named."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            if model_string == "q:llama3":
+                raise ValueError("boom")
+            on_target("o:gpt-4o")
+            return "42"
+
+        mock_models.side_effect = route
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["q:llama3", "a:claude-3|o:gpt-4o"],
+        )
+
+        ceo_prompt = (tmp_path / "ceo_prompt.xml").read_text()
+        assert "<response>Error (q:llama3): boom</response>" in ceo_prompt
+        assert "<model-name>o:gpt-4o</model-name>" in ceo_prompt
+        assert (tmp_path / "test_q_llama3.md").read_text() == "Error (q:llama3): boom"
+        assert (tmp_path / "test_a_claude-3__o_gpt-4o.md").read_text() == "42"
+
+
+    def test_quorum_and_deadline_mark_late_members_absent(
+        self, mock_models, mock_environment, prompt_file, tmp_path, fresh_board_store
+    ):
+        """Test that the CEO starts without a slow member, which is saved once it answers."""
+        release = threading.Event()
+
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            if model_string == "o:o3":
+                release.wait(5)
+                return "slow answer"
+            if model_string == "q:llama3":
+                raise ValueError("boom")
+            return f"{model_string} says 42"
+
+        mock_models.side_effect = route
+        members = ["a:claude-3", "q:llama3", "o:o3", "g:gemini"]
+        for policy in ({"board_quorum": 2}, {"board_deadline": 0.3}):
+            release.clear()
+            # The late answer of the previous round would otherwise be reused
+            fresh_board_store.clear()
+            output_dir = tmp_path / next(iter(policy))
+            started = time.monotonic()
+            ceo_and_board_prompt(
+                from_file=str(prompt_file),
+                output_dir=str(output_dir),
+                models_prefixed_by_provider=members,
+                ceo_model="a:claude-3",
+                **policy,
+            )
+            assert time.monotonic() - started < 2
+
+            ceo_prompt = (output_dir / "ceo_prompt.xml").read_text()
+            # A failed member does not count towards the quorum and is not absent
+            assert "<response>Error (q:llama3): boom</response>" in ceo_prompt
+            assert "<model-name>o:o3</model-name>\n    <status>absent</status>" in ceo_prompt
+            assert "g:gemini says 42" in ceo_prompt
+            assert ceo_prompt.rstrip().endswith("when they finish): o:o3 -->")
+            assert not (output_dir / "test_o_o3.md").exists()
+
+            release.set()
+            late_file = output_dir / "test_o_o3.md"
+            for _ in range(50):
+                if late_file.exists():
+                    break
+                time.sleep(0.05)
+            assert late_file.read_text() == "slow answer"
+
+    @pytest.mark.parametrize("board_quorum", [0, -1])
+    def test_quorum_below_one_is_rejected(
+        self, mock_models, mock_environment, prompt_file, tmp_path, board_quorum
+    ):
+        """Test that a quorum of less than one member is an error, not a CEO without a board."""
+        with pytest.raises(ValueError, match="Board quorum must be at least 1"):
+            ceo_and_board_prompt(
+                from_file=str(prompt_file),
+                output_dir=str(tmp_path),
+                models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+                board_quorum=board_quorum,
+            )
+        mock_models.assert_not_called()
+
+    def test_quorum_larger_than_board_waits_for_every_member(
+        self, mock_models, mock_environment, prompt_file, tmp_path
+    ):
+        """Test that a quorum above the board size is clamped to the board, so every member answers."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            if model_string == "o:gpt-4o":
+                time.sleep(0.2)
+            return f"{model_string} says 42"
+
+        mock_models.side_effect = route
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_model="a:claude-3",
+            board_quorum=5,
+        )
+
+        ceo_prompt = (tmp_path / "ceo_prompt.xml").read_text()
+        assert "<response>o:gpt-4o says 42</response>" in ceo_prompt
+        assert "<status>absent</status>" not in ceo_prompt
+
+    def test_rerun_reuses_stored_board_responses(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that a rerun with another CEO or an extra member only calls the models that are missing."""
+        def called_models():
+            return [c.args[0] for c in mock_models.call_args_list]
+
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path / "first"),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_model="o:o3",
+        )
+        assert sorted(called_models()) == ["a:claude-3", "o:gpt-4o", "o:o3"]
+        assert "<reused-from>" not in (tmp_path / "first" / "ceo_prompt.xml").read_text()
+
+        # A different CEO: only the CEO is called, the board comes from the store
+        mock_models.reset_mock()
+        output_dir = tmp_path / "second"
+        reused = []
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(output_dir),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_model="a:claude-3",
+            on_reused=reused.append,
+        )
+        assert called_models() == ["a:claude-3"]
+        assert mock_models.call_args.args[1].lstrip().startswith("<purpose>")
+        assert reused == ["a:claude-3", "o:gpt-4o"]
+        ceo_prompt = (output_dir / "ceo_prompt.xml").read_text()
+        assert re.search(
+            r"<model-name>o:gpt-4o</model-name>\n    <reused-from>\d{4}-\d\d-\d\dT[\d:]+Z</reused-from>\n"
+            r"    <response>o:gpt-4o says 42</response>",
+            ceo_prompt,
+        )
+        assert (output_dir / "test_o_gpt-4o.md").read_text() == "o:gpt-4o says 42"
+
+        # An extra board member: only the new member and the CEO are called
+        mock_models.reset_mock()
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path / "third"),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o", "g:gemini"],
+            ceo_model="a:claude-3",
+        )
+        assert called_models() == ["g:gemini", "a:claude-3"]
+
+        # Refreshing asks the whole board again
+        mock_models.reset_mock()
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path / "fourth"),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_model="a:claude-3",
+            cache_mode=CACHE_REFRESH,
+        )
+        assert sorted(called_models()) == ["a:claude-3", "a:claude-3", "o:gpt-4o"]
+
+    def test_failed_members_are_not_stored(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that a member that failed is asked again on the next run."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            if model_string == "q:llama3" and failing:
+                raise ValueError("boom")
+            return f"{model_string} says 42"
+
+        failing = True
+        mock_models.side_effect = route
+        kwargs = dict(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3", "q:llama3"],
+            ceo_model="o:o3",
+        )
+        ceo_and_board_prompt(**kwargs)
+
+        failing = False
+        mock_models.reset_mock()
+        ceo_and_board_prompt(**kwargs)
+        assert [c.args[0] for c in mock_models.call_args_list] == ["q:llama3", "o:o3"]
+        assert "<response>q:llama3 says 42</response>" in (tmp_path / "ceo_prompt.xml").read_text()
+
+    def test_ceo_prompt_is_compressed_to_budget(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that duplicate and long board responses are compressed in the CEO prompt but not in the files."""
+        long_answer = "Ship it now. " + "Because of many reasons. " * 400 + "Final verdict: ship."
+
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            if model_string == "q:llama3":
+                return "Do not ship."
+            return long_answer
+
+        mock_models.side_effect = route
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3", "q:llama3", "o:gpt-4o"],
+            ceo_model="o:o3",
+            ceo_max_tokens=1000,
+        )
+
+        ceo_prompt = (tmp_path / "ceo_prompt.xml").read_text()
+        assert estimate_tokens(ceo_prompt) <= 1000
+        assert "<model-name>o:gpt-4o</model-name>\n    <same-as>a:claude-3</same-as>" in ceo_prompt
+        assert "<response>Do not ship.</response>" in ceo_prompt
+        assert "tokens omitted ...]" in ceo_prompt
+        assert "Final verdict: ship." in ceo_prompt
+        assert (tmp_path / "test_o_gpt-4o.md").read_text() == long_answer
+
+    def test_over_budget_template_keeps_an_excerpt_of_every_response(
+        self, mock_models, mock_environment, prompt_file, tmp_path
+    ):
+        """Test that a budget the template alone uses up still leaves every answer in the CEO prompt."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                return "# CEO Decision"
+            return f"{model_string} recommends shipping. " + "Because of many reasons. " * 100
+
+        mock_models.side_effect = route
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3", "q:llama3"],
+            ceo_model="o:o3",
+            ceo_max_tokens=10,
+        )
+
+        ceo_prompt = (tmp_path / "ceo_prompt.xml").read_text()
+        for model_string in ("a:claude-3", "q:llama3"):
+            assert f"<response>{model_string} recommends shipping." in ceo_prompt
+        assert ceo_prompt.count("tokens omitted ...]") == 2
+
+    def test_ceo_panel_decides_concurrently_and_merges(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that a CEO panel runs at the same time over one board, and the merge model combines its decisions."""
+        started = []
+        both_started = threading.Event()
+
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>\n    You are the chair"):
+                return f"# CEO Decision merged by {model_string}"
+            if text.lstrip().startswith("<purpose>"):
+                started.append(model_string)
+                if len(started) == 2:
+                    both_started.set()
+                # Each CEO waits for the other, so this only finishes if they run concurrently
+                assert both_started.wait(5)
+                return f"# CEO Decision by {model_string}"
+            return f"{model_string} says 42"
+
+        mock_models.side_effect = route
         result = ceo_and_board_prompt(
-            from_file=input_file,
-            output_dir=str(tmpdir)
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3", "o:gpt-4o"],
+            ceo_models=["o:o3", "a:claude-opus-4"],
+            merge_model="g:gemini",
         )
-        
-        # Assertions
-        mock_prompt_from_file_to_file.assert_called_once_with(
-            input_file,
-            None,
-            str(tmpdir)
+
+        assert result == str(tmp_path / "ceo_decision.md")
+        assert (tmp_path / "ceo_decision.md").read_text() == "# CEO Decision merged by g:gemini"
+        assert (tmp_path / "ceo_decision_o_o3.md").read_text() == "# CEO Decision by o:o3"
+        assert (tmp_path / "ceo_decision_a_claude-opus-4.md").read_text() == "# CEO Decision by a:claude-opus-4"
+        merge_prompt = (tmp_path / "ceo_merge_prompt.xml").read_text()
+        assert "<model-name>o:o3</model-name>\n    <decision># CEO Decision by o:o3</decision>" in merge_prompt
+
+        # The board was asked once for the whole panel
+        called_models = [c.args[0] for c in mock_models.call_args_list]
+        assert called_models.count("a:claude-3") == 1
+        assert called_models.count("o:gpt-4o") == 1
+
+    def test_ceo_panel_without_merge_model_lists_decisions(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that without a merge model the decisions are listed, leaving out CEOs that failed."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if model_string == "q:llama3":
+                raise ValueError("boom")
+            if text.lstrip().startswith("<purpose>"):
+                return f"# CEO Decision by {model_string}"
+            return f"{model_string} says 42"
+
+        mock_models.side_effect = route
+        ceo_and_board_prompt(
+            from_file=str(prompt_file),
+            output_dir=str(tmp_path),
+            models_prefixed_by_provider=["a:claude-3"],
+            ceo_models=["o:o3", "q:llama3", "g:gemini"],
         )
-        
-        # Check that the default CEO model was used
-        mock_prompt.assert_called_once()
-        assert mock_prompt.call_args[0][1] == [DEFAULT_CEO_MODEL]
-        
-        # Check that the CEO decision file was created correctly
-        expected_output_file = str(Path(tmpdir) / "ceo_decision.md")
-        assert result == expected_output_file
-        
-        # Verify that both prompt XML and decision files were created
-        assert mock_file.call_count >= 2  # Once for prompt XML and once for decision
-
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt_from_file_to_file")
-    @patch("just_prompt.molecules.ceo_and_board_prompt.prompt")
-    def test_ceo_and_board_prompt_file_not_found(self, mock_prompt, mock_prompt_from_file_to_file, mock_environment):
-        """Test error handling when input file is not found."""
-        non_existent_file = "non_existent_file.txt"
-        
-        # Mock file not found error
-        mock_open_instance = mock_open()
-        mock_open_instance.side_effect = FileNotFoundError(f"File not found: {non_existent_file}")
-        
-        with patch("builtins.open", mock_open_instance):
-            with pytest.raises(ValueError, match=f"Error reading file"):
-                ceo_and_board_prompt(from_file=non_existent_file)
\ No newline at end of file
+
+        assert (tmp_path / "ceo_decision.md").read_text() == (
+            "## Decision by o:o3\n\n# CEO Decision by o:o3\n\n---\n\n## Decision by g:gemini\n\n# CEO Decision by g:gemini"
+        )
+        assert (tmp_path / "ceo_decision_q_llama3.md").read_text() == "Error (q:llama3): boom"
+        assert not (tmp_path / "ceo_merge_prompt.xml").exists()
+
+    def test_ceo_panel_fails_when_every_ceo_fails(self, mock_models, mock_environment, prompt_file, tmp_path):
+        """Test that a panel without a single decision raises."""
+        def route(model_string, text, on_target=None, **kwargs):
+            if text.lstrip().startswith("<purpose>"):
+                raise ValueError("boom")
+            return "42"
+
+        mock_models.side_effect = route
+        with pytest.raises(ValueError, match="No CEO decision"):
+            ceo_and_board_prompt(
+                from_file=str(prompt_file),
+                output_dir=str(tmp_path),
+                models_prefixed_by_provider=["a:claude-3"],
+                ceo_models=["o:o3", "g:gemini"],
+            )
+
+
+def test_combine_ceo_decisions():
+    """Test that a single decision is returned as is."""
+    assert combine_ceo_decisions([("o:o3", "# CEO Decision")]) == "# CEO Decision"
+
+
+def test_build_merge_prompt():
+    """Test assembling the merge prompt from the panel's decisions."""
+    merge_prompt = build_merge_prompt("Ship it?", [("o:o3", "Ship"), ("g:gemini", "Wait")])
+
+    assert "<original-question>Ship it?</original-question>" in merge_prompt
+    assert merge_prompt.index("<decision>Ship</decision>") < merge_prompt.index("<decision>Wait</decision>")
+
+
+def test_build_ceo_prompt():
+    """Test assembling the CEO prompt from in-memory board responses."""
+    board_responses = [
+        BoardResponse("a:claude-3", "Yes", Path("a.md")),
+        BoardResponse("o:gpt-4o|l:llama3", "No", Path("b.md"), answered_by="l:llama3"),
+    ]
+    ceo_prompt = build_ceo_prompt("Ship it?", board_responses)
+
+    assert ceo_prompt.startswith(DEFAULT_CEO_DECISION_PROMPT.split("{original_prompt}")[0])
+    assert "<original-question>Ship it?</original-question>" in ceo_prompt
+    assert "<model-name>a:claude-3</model-name>\n    <response>Yes</response>" in ceo_prompt
+    assert "<model-name>l:llama3</model-name>\n    <response>No</response>" in ceo_prompt
@@ -3,6 +3,9 @@ Tests for list_providers functionality.
 """
 
 import pytest
+from unittest.mock import patch
+from just_prompt.atoms.shared.circuit_breaker import CircuitBreakers
+from just_prompt.molecules import list_providers as list_providers_module
 from just_prompt.molecules.list_providers import list_providers
 
 
@@ -49,3 +52,19 @@ def test_list_providers():
         elif provider["name"] == "OLLAMA":
             assert provider["full_name"] == "ollama"
             assert provider["short_name"] == "l"
+
+
+def test_list_providers_reports_circuit_state():
+    """Test that open provider and model circuits show up in the listing."""
+    breakers = CircuitBreakers(failure_threshold=1)
+    breakers.record("groq", "llama3", ConnectionError("connection reset"))
+    breakers.record("openai", "o3")
+
+    with patch.object(list_providers_module, "get_circuit_breakers", return_value=breakers):
+        providers = {p["full_name"]: p for p in list_providers()}
+
+    assert providers["groq"]["circuit"] == "open"
+    assert providers["groq"]["model_circuits"] == {"llama3": "open"}
+    assert providers["openai"]["circuit"] == "closed"
+    assert providers["openai"]["model_circuits"] == {}
+    assert providers["anthropic"]["circuit"] == "closed"
@@ -4,8 +4,12 @@ Tests for prompt functionality.
 
 import pytest
 import os
+import time
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 from dotenv import load_dotenv
-from just_prompt.molecules.prompt import prompt
+from just_prompt.atoms.shared.response_cache import CACHE_BYPASS
+from just_prompt.molecules.prompt import prompt, aprompt, prompt_as_completed
 
 # Load environment variables
 load_dotenv()
@@ -43,3 +47,144 @@ def test_prompt_multiple_models():
     # Check all responses contain Paris
     for r in response:
         assert "paris" in r.lower() or "Paris" in r
+
+
+def test_prompt_resolves_models_concurrently():
+    """Test that model resolution runs inside each model's task, not serially up front."""
+    def slow_correction(provider, model, correction_model):
+        time.sleep(0.2)
+        return model
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=slow_correction) as mock_correction, \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=lambda model_string, text, **kwargs: f"{model_string} ok"):
+        start = time.monotonic()
+        response = prompt("Hello", ["o:gpt-4o", "a:claude-3", "q:llama3", "g:gemini"])
+        elapsed = time.monotonic() - start
+
+    assert response == ["o:gpt-4o ok", "a:claude-3 ok", "q:llama3 ok", "g:gemini ok"]
+    assert elapsed < 0.6
+    # Correction receives the full provider name
+    called_providers = sorted(call.args[0] for call in mock_correction.call_args_list)
+    assert called_providers == ["anthropic", "gemini", "groq", "openai"]
+
+
+def test_prompt_corrects_and_reports_fallback_chains():
+    """Test that every target of a chain is corrected and the answering target is reported."""
+    def correct(provider, model, correction_model):
+        return "gpt-4o" if model == "gpt4o" else model
+
+    def route(model_string, text, on_target=None, **kwargs):
+        on_target(model_string.split("|")[-1])
+        return f"{model_string} ok"
+
+    answered_by = {}
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=correct), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=route):
+        response = prompt("Hello", ["a:claude-3|o:gpt4o"], on_target=answered_by.__setitem__)
+
+    assert response == ["a:claude-3|o:gpt-4o ok"]
+    assert answered_by == {"a:claude-3|o:gpt4o": "o:gpt-4o"}
+
+
+def test_aprompt_gathers_in_order():
+    """Test the async prompt path keeps the model order and reports errors per model."""
+    async def fake_route(model_string, text, **kwargs):
+        if model_string.startswith("q:"):
+            await asyncio.sleep(0.05)
+            raise ValueError("rate limited")
+        return f"{model_string} ok"
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.aroute_prompt", side_effect=fake_route):
+        response = asyncio.run(aprompt("Hello", ["q:llama3", "o:gpt-4o", "a:claude-3"]))
+
+    assert response == ["Error (q:llama3): rate limited", "o:gpt-4o ok", "a:claude-3 ok"]
+
+
+def test_concurrent_aprompt_calls_on_one_event_loop():
+    """Test that concurrent aprompt calls on one event loop overlap and share identical upstream calls."""
+    async def answer(text, model):
+        await asyncio.sleep(0.2)
+        return f"{model}: {text}"
+
+    provider_module = MagicMock()
+    provider_module.list_models.return_value = ["gpt-4o", "gpt-4o-mini"]
+    provider_module.aprompt = AsyncMock(side_effect=answer)
+
+    async def main():
+        return await asyncio.gather(
+            aprompt("Hello", ["o:gpt-4o", "o:gpt-4o-mini"], cache_mode=CACHE_BYPASS),
+            aprompt("Hello", ["o:gpt-4o"], cache_mode=CACHE_BYPASS),
+            aprompt("Bye", ["o:gpt-4o"], cache_mode=CACHE_BYPASS),
+        )
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.atoms.shared.model_router.importlib.import_module", return_value=provider_module):
+        start = time.monotonic()
+        responses = asyncio.run(main())
+        elapsed = time.monotonic() - start
+
+    assert responses == [["gpt-4o: Hello", "gpt-4o-mini: Hello"], ["gpt-4o: Hello"], ["gpt-4o: Bye"]]
+    # The two identical gpt-4o prompts are coalesced, and every call runs at once
+    assert provider_module.aprompt.await_count == 3
+    assert elapsed < 0.6
+
+
+def test_prompt_keeps_duplicate_models_distinct():
+    """Test that repeated model strings each get their own response, in order."""
+    calls = iter(range(100))
+
+    def fake_route(model_string, text, **kwargs):
+        return f"{model_string} #{next(calls)}"
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route):
+        response = prompt("Hello", ["o:gpt-4o", "o:gpt-4o", "o:gpt-4o"])
+
+    assert len(set(response)) == 3
+    assert all(r.startswith("o:gpt-4o #") for r in response)
+
+
+def test_prompt_large_model_sweep():
+    """Test that a wide sweep returns one response per model in input order."""
+    models = [f"l:model-{i}" for i in range(60)]
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=lambda model_string, text, **kwargs: model_string):
+        response = prompt("Hello", models)
+
+    assert response == models
+
+
+def test_prompt_as_completed_yields_fastest_first():
+    """Test that streaming callers see each response as soon as it finishes."""
+    def fake_route(model_string, text, **kwargs):
+        if model_string == "a:slow":
+            time.sleep(0.2)
+        return f"{model_string} ok"
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route):
+        results = list(prompt_as_completed("Hello", ["a:slow", "o:fast"]))
+
+    assert results == [(1, "o:fast", "o:fast ok"), (0, "a:slow", "a:slow ok")]
+
+
+def test_prompt_streams_chunks_tagged_by_model():
+    """Test that streamed chunks are reported with the model string they belong to."""
+    def fake_route(model_string, text, on_chunk=None, **kwargs):
+        for chunk in (model_string, " done"):
+            on_chunk(chunk)
+        return f"{model_string} done"
+
+    received = []
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: "gpt-4o"), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route):
+        response = prompt("Hello", ["o:4o", "a:claude-3"], on_chunk=lambda model, chunk: received.append((model, chunk)))
+
+    assert response == ["o:gpt-4o done", "a:gpt-4o done"]
+    # Chunks are tagged with the model string as requested, before correction
+    assert sorted(received) == sorted([
+        ("o:4o", "o:gpt-4o"), ("o:4o", " done"),
+        ("a:claude-3", "a:gpt-4o"), ("a:claude-3", " done"),
+    ])
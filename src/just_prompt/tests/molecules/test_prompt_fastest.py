@@ -0,0 +1,139 @@
+"""
+Tests for fastest-of-N prompt racing.
+"""
+
+import http.server
+import importlib
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from openai import OpenAI
+from just_prompt.atoms.shared.http_pool import HttpPool
+from just_prompt.atoms.shared.response_cache import CACHE_BYPASS
+from just_prompt.molecules.prompt_fastest import prompt_fastest, RaceCancelled
+
+
+def fake_route(delays, failures=(), cancelled=None):
+    """Build a route_prompt stand-in that streams per model after a delay."""
+    def route(model_string, text, on_chunk=None, **kwargs):
+        time.sleep(delays[model_string])
+        if model_string in failures:
+            raise ValueError(f"{model_string} is down")
+        try:
+            for _ in range(20):
+                on_chunk("word ")
+                time.sleep(0.01)
+        except RaceCancelled:
+            if cancelled is not None:
+                cancelled.add(model_string)
+            raise
+        return f"{model_string} answer"
+    return route
+
+
+@pytest.fixture
+def sse_server():
+    """Stream chat completions: model "fast" answers at once, model "slow" stalls after its first chunk."""
+    stop = threading.Event()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            self.send_chunk(body["model"], "Hello")
+            if body["model"] == "slow":
+                stop.wait(10)
+                return
+            self.send_chunk(body["model"], " world")
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def send_chunk(self, model, content):
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    stop.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_model_correction():
+    """Pass model names through unchanged."""
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction",
+               side_effect=lambda provider, model, correction_model: model):
+        yield
+
+
+def test_fastest_model_wins_and_losers_are_cancelled():
+    """Test that the first model to finish wins and the others stop streaming."""
+    cancelled = set()
+    delays = {"q:llama3": 0.0, "o:gpt-4o-mini": 0.1}
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route(delays, cancelled=cancelled)):
+        result = prompt_fastest("Hello", list(delays))
+        time.sleep(0.3)
+
+    assert result["model"] == "q:llama3"
+    assert result["response"] == "q:llama3 answer"
+    assert 0 < result["latency"] < 1
+    assert result["errors"] == []
+    assert cancelled == {"o:gpt-4o-mini"}
+
+
+def test_failed_models_are_skipped_and_reported():
+    """Test that a fast failure does not win and is listed in the result."""
+    delays = {"q:llama3": 0.0, "o:gpt-4o-mini": 0.05}
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route(delays, failures={"q:llama3"})):
+        result = prompt_fastest("Hello", list(delays))
+
+    assert result["model"] == "o:gpt-4o-mini"
+    assert result["errors"] == ["Error (q:llama3): q:llama3 is down"]
+
+
+def test_all_models_failing_raises():
+    """Test that a race with no successful model raises with every error."""
+    delays = {"q:llama3": 0.0, "o:gpt-4o-mini": 0.0}
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route(delays, failures=set(delays))):
+        with pytest.raises(ValueError, match="No model answered"):
+            prompt_fastest("Hello", list(delays))
+
+
+def test_losing_streams_release_their_connections(sse_server, monkeypatch):
+    """Test that a loser stalled mid-stream has its connection closed as soon as another model wins."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    openai_provider = importlib.import_module("just_prompt.atoms.llm_providers.openai")
+    pool = HttpPool(max_connections=4)
+    client = OpenAI(api_key="test", base_url=sse_server, http_client=pool.client(), max_retries=0)
+    monkeypatch.setattr(openai_provider, "client", client)
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.validate_and_correct_model",
+               side_effect=lambda provider, model: model):
+        result = prompt_fastest("Hello", ["o:slow", "o:fast"], cache_mode=CACHE_BYPASS)
+
+    assert result["model"] == "o:fast"
+    assert result["response"] == "Hello world"
+    # The slow stream never sends another chunk, so only cancelling its scope frees the connection
+    deadline = time.monotonic() + 2
+    while pool.stats()["active"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert pool.stats()["active"] == 0
@@ -6,6 +6,7 @@ import pytest
 import os
 import tempfile
 import shutil
+from unittest.mock import patch
 from dotenv import load_dotenv
 from just_prompt.molecules.prompt_from_file_to_file import prompt_from_file_to_file
 
@@ -50,4 +51,30 @@ def test_directory_creation_and_file_writing():
         os.unlink(input_path)
         # Remove the created directory and all its contents
         if os.path.exists(os.path.dirname(temp_dir)):
-            shutil.rmtree(os.path.dirname(temp_dir))
\ No newline at end of file
+            shutil.rmtree(os.path.dirname(temp_dir))
+
+
+def test_responses_stream_to_disk(tmp_path):
+    """Test that each response is streamed to a temp file and renamed into place when done."""
+    input_path = tmp_path / "question.txt"
+    input_path.write_text("What is the capital of France?")
+    output_dir = tmp_path / "out"
+
+    def fake_route(model_string, text, on_chunk=None, **kwargs):
+        if model_string == "a:broken":
+            on_chunk("partial ")
+            raise ValueError("connection reset")
+        for chunk in ("Paris ", "is the ", "capital."):
+            on_chunk(chunk)
+            # Nothing appears under the final name until the stream is complete
+            assert not (output_dir / "question_o_gpt-4o.md").exists()
+        return "Paris is the capital."
+
+    with patch("just_prompt.molecules.prompt.ModelRouter.magic_model_correction", side_effect=lambda p, m, c: m), \
+         patch("just_prompt.molecules.prompt.ModelRouter.route_prompt", side_effect=fake_route):
+        file_paths = prompt_from_file_to_file(str(input_path), ["o:gpt-4o", "a:broken"], str(output_dir))
+
+    assert file_paths == [str(output_dir / "question_o_gpt-4o.md"), str(output_dir / "question_a_broken.md")]
+    assert (output_dir / "question_o_gpt-4o.md").read_text() == "Paris is the capital."
+    assert (output_dir / "question_a_broken.md").read_text() == "Error (a:broken): connection reset"
+    assert sorted(p.name for p in output_dir.iterdir()) == ["question_a_broken.md", "question_o_gpt-4o.md"]